@@ -0,0 +1,50 @@
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from ..core.config import settings
+from ..core.i18n import reload_translations, get_version, get_available_languages
+from ..core.loop_monitor import loop_monitor
+from ..core.metrics import metrics
+from ..database.cache import cache
+
+
+async def require_admin(request: Request) -> None:
+    """Allow only requests carrying the admin API token"""
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404)
+
+    header = request.headers.get("Authorization", "")
+    token = header[7:] if header.startswith("Bearer ") else request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(token.encode(), settings.ADMIN_API_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+admin_router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@admin_router.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@admin_router.get("/admin/loop")
+async def loop_status():
+    """Event loop lag and slow callbacks."""
+    return loop_monitor.snapshot()
+
+
+@admin_router.post("/admin/i18n/reload")
+async def i18n_reload():
+    """Re-read locale files and propagate them to every worker."""
+    version = await reload_translations(cache.client)
+    return {"version": version, "languages": get_available_languages()}
+
+
+@admin_router.get("/admin/i18n")
+async def i18n_status():
+    """Loaded translations version."""
+    return {"version": get_version(), "languages": get_available_languages()}
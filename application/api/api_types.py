@@ -1,13 +1,31 @@
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, Union
 from enum import Enum
 import json
 
+from application.core import codec
+from application.core.config import settings
 from application.services.route_service import RouteService
 
+# Buyurtma vaqtlari ko'rsatiladigan mintaqa va format
+LOCAL_TZ = timezone(timedelta(hours=settings.TIMEZONE_OFFSET_HOURS))
+START_TIME_FORMAT = "%d.%m.%Y, %H:%M"
 
-@dataclass
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    """ISO 8601 string (``Z`` suffix ham) ni datetime ga aylantirish; noto'g'ri qiymat - None"""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        if value.endswith('Z'):
+            return datetime.fromisoformat(value[:-1] + '+00:00')
+        return datetime.fromisoformat(value)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
 class PassengerTypes:
     id: int
     telegram_id: int
@@ -55,10 +73,10 @@ class OrderStatus(str, Enum):
     REJECTED = "rejected"
 
 
-@dataclass
+@dataclass(slots=True)
 class ContentObjectTypes:
     price: Union[str, int]
-    route: Union[RouteService]
+    route_data: Dict[str, Any]
     from_location: Dict[str, Any]
     to_location: Dict[str, Any]
     cashback: int
@@ -68,6 +86,24 @@ class ContentObjectTypes:
     start_time: Optional[str] = None
     passenger: int = 1
     has_woman: bool = False
+    _route: Optional[RouteService] = field(default=None, init=False, repr=False, compare=False)
+    _start_time_local: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def route(self) -> RouteService:
+        """Route obyekti birinchi murojaatda yaratiladi"""
+        if self._route is None:
+            self._route = RouteService(**self.route_data)
+        return self._route
+
+    @property
+    def start_time_local(self) -> str:
+        """start_time LOCAL_TZ da formatlangan holda, bir marta hisoblanadi"""
+        if self._start_time_local is None:
+            start_time = _parse_datetime(self.start_time)
+            # Vaqt yo'q yoki noto'g'ri - hozirgi vaqt emas, bo'sh ko'rsatiladi
+            self._start_time_local = start_time.astimezone(LOCAL_TZ).strftime(START_TIME_FORMAT) if start_time else ""
+        return self._start_time_local
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ContentObjectTypes':
@@ -87,7 +123,7 @@ class ContentObjectTypes:
             to_location=data.get('to_location', {}),
             cashback=data.get('cashback', 0),
             created_at=created_at,
-            route=RouteService(**data.get("route", {})),
+            route_data=data.get("route") or {},
             tariff_id=data.get('tariff_id'),
             comment=data.get('comment'),
             start_time=start_time,
@@ -99,7 +135,8 @@ class ContentObjectTypes:
         """ContentObjectTypes obyektini dictionary ga aylantirish"""
         return {
             'price': self.price,
-            'route': self.route,
+            'route': self.route_data,
+            'tariff_id': self.tariff_id,
             'from_location': self.from_location,
             'to_location': self.to_location,
             'cashback': self.cashback,
@@ -111,7 +148,7 @@ class ContentObjectTypes:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderTypes:
     id: int
     user: int
@@ -188,12 +225,17 @@ class OrderTypes:
             'order_type': self.order_type
         }
 
+    @classmethod
+    def from_json(cls, raw: Union[bytes, str]) -> 'OrderTypes':
+        """Raw JSON dan bir o'tishda OrderTypes yaratish"""
+        return cls.from_dict(codec.loads(raw))
+
     def to_json(self) -> str:
         """OrderTypes obyektini JSON string formatiga o'tkazish"""
         return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
 
 
-@dataclass
+@dataclass(slots=True)
 class DriverInfo:
     id: int
     telegram_id: int
@@ -201,32 +243,37 @@ class DriverInfo:
     full_name: str
     language: str
     is_banned: bool
-    created_at: datetime
-    updated_at: datetime
+    created_at_raw: Union[str, datetime, None] = field(default=None, repr=False)
+    updated_at_raw: Union[str, datetime, None] = field(default=None, repr=False)
+    _created_at: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+    _updated_at: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """Datetime faqat kerak bo'lganda pars qilinadi"""
+        if self._created_at is None and self.created_at_raw is not None:
+            self._created_at = _parse_datetime(self.created_at_raw)
+        return self._created_at
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        if self._updated_at is None and self.updated_at_raw is not None:
+            self._updated_at = _parse_datetime(self.updated_at_raw)
+        return self._updated_at
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'DriverInfo':
         """Dictionary dan DriverInfo obyektini yaratish"""
-        data = data.copy()
-
-        # Datetime field'larini konvert qilish
-        for field_name in ['created_at', 'updated_at']:
-            if field_name in data:
-                value = data[field_name]
-                if isinstance(value, str):
-                    try:
-                        if value.endswith('Z'):
-                            data[field_name] = datetime.fromisoformat(
-                                value.replace('Z', '+00:00')
-                            )
-                        else:
-                            data[field_name] = datetime.fromisoformat(value)
-                    except ValueError:
-                        data[field_name] = datetime.now()
-                elif not isinstance(value, datetime):
-                    data[field_name] = datetime.now()
-
-        return cls(**data)
+        return cls(
+            id=data.get('id'),
+            telegram_id=data.get('telegram_id'),
+            username=data.get('username'),
+            full_name=data.get('full_name'),
+            language=data.get('language'),
+            is_banned=data.get('is_banned', False),
+            created_at_raw=data.get('created_at'),
+            updated_at_raw=data.get('updated_at'),
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         """DriverInfo obyektini dictionary ga aylantirish"""
@@ -243,7 +290,7 @@ class DriverInfo:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class LatestCar:
     car_class: str
     car_number: str
@@ -0,0 +1,389 @@
+# application/api/offers.py
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from telebot.asyncio_helper import ApiTelegramException
+
+from .open_orders import open_orders
+from .order_board import order_board
+from .push import push_hub, route_topic
+from ..core.async_cache import AsyncTTLCache
+from ..core.bot import bot
+from ..core.config import settings
+from ..core.i18n import t
+from ..core.log import logger
+from ..core.metrics import metrics
+from ..core.scheduler import scheduler
+from ..database.cache import cache
+
+CLOSED_KEY = "offer:closed:{}"  # order_id -> sabab (claimed, canceled, expired)
+CLOSED_CHANNEL = "offers:closed"
+EXPIRE_JOB = "offer-expire:{}"  # scheduler ishi: hech kim olmasa buyurtmani yopish
+MESSAGES_KEY = "offer:messages:{}"  # hash: chat_id -> "message_id:lang"
+RETRACT_KEY = "offers:retract"  # list: "order_id:reason"
+
+# Backend webhook'ida takliflarni yopadigan statuslar
+CLOSING_STATUSES = frozenset({"assigned", "canceled", "rejected", "ended"})
+
+# Taklifni yopadigan statuslar -> sabab ("claimed" - bot qabul qilgan, "expired" - scheduler).
+# Boshqalari (masalan "searched") buyurtmani yopmaydi
+_REASONS = {
+    "claimed": "claimed", "assigned": "claimed", "ended": "claimed",
+    "canceled": "canceled", "rejected": "canceled",
+    "expired": "expired",
+}
+
+offer_sends_total = metrics.counter("offer_sends_total", "Order offer sends by result (sent, retried, failed)")
+offer_sends_avoided_total = metrics.counter(
+    "offer_sends_avoided_total", "Queued offers dropped because the order was already closed, by reason"
+)
+offer_queue_size = metrics.gauge("offer_queue_size", "Offers waiting in the dispatcher queue")
+offer_retractions_total = metrics.counter(
+    "offer_retractions_total", "Stale offer messages edited after close, by result (edited, failed)"
+)
+
+
+@dataclass(slots=True)
+class MessageTask:
+    telegram_id: int
+    text: str
+    reply_markup: dict
+    retry_count: int = 0
+    order_id: Optional[int] = None
+    lang: str = "uz"
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Scheduler ishi uchun (klaviatura JSON string bo'lib saqlanadi, telebot uni o'zgartirmay yuboradi)"""
+        markup = self.reply_markup
+        return {"telegram_id": self.telegram_id, "text": self.text,
+                "reply_markup": markup.to_json() if hasattr(markup, "to_json") else markup,
+                "retry_count": self.retry_count, "order_id": self.order_id, "lang": self.lang}
+
+
+class OfferDispatcher:
+    """
+    Buyurtma takliflarini yuboruvchi umumiy navbat.
+
+    Barcha ``/driver`` so'rovlari bitta navbat va ``workers`` ta worker'dan
+    foydalanadi. Buyurtma yopilganda (kimdir qabul qildi, bekor qilindi)
+    ``close`` uni lokal belgilaydi, Redis ga yozadi va ``offers:closed``
+    kanaliga e'lon qiladi - shu buyurtmaning navbatdagi takliflari barcha
+    jarayonlarda yuborilmasdan tashlab yuboriladi.
+
+    Yuborilgan takliflar ``offer:messages:{order_id}`` da qayd etiladi.
+    Yopilgan (yoki ``expire_after`` soniyada hech kim olmagan - scheduler'dagi
+    ``offer.expire`` ishi) buyurtmalarning eski takliflari fon vazifasida
+    soniyasiga ``retract_rate`` tadan tahrirlanadi - "qabul qilish" tugmasi
+    olib tashlanadi. Yuborilmagan takliflar ``offer.resend`` ishi bilan
+    ``retry_after`` (yoki backoff) dan keyin qayta yuboriladi.
+    """
+
+    def __init__(self, workers: int = settings.OFFER_QUEUE_WORKERS, batch_size: int = settings.OFFER_QUEUE_BATCH_SIZE,
+                 closed_ttl: int = settings.OFFER_CLOSED_TTL, max_retries: int = 3,
+                 registry_ttl: int = settings.OFFER_REGISTRY_TTL, expire_after: int = settings.OFFER_EXPIRE_AFTER,
+                 retract_interval: float = settings.OFFER_RETRACT_INTERVAL,
+                 retract_rate: int = settings.OFFER_RETRACT_RATE):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.closed_ttl = closed_ttl
+        self.max_retries = max_retries
+        self.registry_ttl = registry_ttl
+        self.expire_after = expire_after
+        self.retract_interval = retract_interval
+        self.retract_rate = retract_rate
+        self.queue: "asyncio.Queue[MessageTask]" = asyncio.Queue()
+        self._closed = AsyncTTLCache("closed_offers", maxsize=10000, ttl=closed_ttl)
+        # Yakuniy yopilishi (lenta, scheduler) shu jarayonda tugatilgan buyurtmalar
+        self._finished = AsyncTTLCache("finished_offers", maxsize=10000, ttl=closed_ttl)
+        self._workers: List[asyncio.Task] = []
+        self._listener: Optional[asyncio.Task] = None
+        self._retractor: Optional[asyncio.Task] = None
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self, redis_client: Optional[redis.Redis] = None) -> None:
+        """Worker'lar va (berilgan bo'lsa) boshqa jarayonlardan yopilishlarni tinglash"""
+        self._start_workers()
+        if redis_client is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen(redis_client), name="offer-close-listener")
+            self._retractor = asyncio.create_task(self._retract_loop(), name="offer-retractor")
+        logger.info(f"✅ Offer dispatcher started with {self.workers} workers")
+
+    def _start_workers(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker(f"offer-worker-{i}"), name=f"offer-worker-{i}")
+                             for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks = self._workers + [task for task in (self._listener, self._retractor) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+        self._listener = self._retractor = None
+        if not self.queue.empty():
+            logger.warning(f"⚠️ {self.queue.qsize()} offers not sent on shutdown")
+
+    # ==================== API ====================
+
+    async def enqueue(self, task: MessageTask) -> None:
+        # Lifespan'siz ishga tushirilganda (skriptlar, benchmark) worker'lar shu yerda boshlanadi
+        self._start_workers()
+        await self.queue.put(task)
+        offer_queue_size.set(self.queue.qsize())
+
+    async def open(self, order_id: int) -> bool:
+        """Buyurtma takliflarini boshlash (muddati scheduler'da); takroriy chaqiruvda False"""
+        try:
+            return await scheduler.schedule("offer.expire", {"order_id": int(order_id)}, delay=self.expire_after,
+                                            key=EXPIRE_JOB.format(order_id), done_ttl=self.closed_ttl)
+        except Exception as e:
+            logger.warning(f"Offer expiry not scheduled for order {order_id}: {e}")
+            return True
+
+    async def close(self, order_id: int, reason: str = "claimed", keep_chat: Optional[int] = None) -> None:
+        """
+        Buyurtma takliflarini to'xtatish (barcha jarayonlarda) va eskilarini qaytarib olish.
+
+        ``reason`` - backend statusi (``_REASONS`` da bo'lmasa e'tiborsiz
+        qoldiriladi) yoki "expired"; ``keep_chat`` - xabari allaqachon
+        tahrirlangan haydovchi (masalan buyurtmani olgan).
+        """
+        order_id = int(order_id)
+        reason = _REASONS.get(reason)
+        if reason is None:
+            return
+        if keep_chat is not None:
+            try:
+                await cache.client.hdel(MESSAGES_KEY.format(order_id), keep_chat)
+            except Exception as e:
+                logger.warning(f"Offer registry cleanup failed for order {order_id}: {e}")
+        if order_id in self._finished:
+            return  # yakuniy sabab bilan allaqachon yopilgan
+        previous = self._closed.get(order_id)
+        try:
+            # Muddati o'tgan buyurtmani keyin olish/bekor qilish mumkin - yakuniy sabab yana tarqatiladi
+            if previous is None or (previous == "expired" and reason != "expired"):
+                self._closed.set(order_id, reason)
+                pipe = cache.client.pipeline(transaction=False)
+                pipe.set(CLOSED_KEY.format(order_id), reason, ex=self.closed_ttl)
+                pipe.publish(CLOSED_CHANNEL, f"{order_id}:{reason}")
+                pipe.rpush(RETRACT_KEY, f"{order_id}:{reason}")
+                await pipe.execute()
+            if reason != "expired":
+                # Muddati o'tgani lentada qoladi - buyurtma backendda hali ochiq.
+                # Pub/sub orqali allaqachon yopilgan bo'lsa ham lentadan olinadi
+                await scheduler.cancel(EXPIRE_JOB.format(order_id))
+                feed = await open_orders.remove(order_id)
+                if feed is not None:
+                    await push_hub.publish(route_topic(*feed), "order.closed", {"id": order_id, "reason": reason})
+                    if order_board.enabled:
+                        await order_board.publish(feed[0])
+                self._finished.set(order_id, reason)
+        except Exception as e:
+            logger.warning(f"Offer close broadcast failed for order {order_id}: {e}")
+
+    def is_closed(self, order_id: Optional[int]) -> bool:
+        return order_id is not None and order_id in self._closed
+
+    def closed_reason(self, order_id: int) -> Optional[str]:
+        """Bu jarayon bilgan yopilish sababi (Redis ga so'rovsiz)"""
+        return self._closed.get(order_id)
+
+    # ==================== WORKERS ====================
+
+    async def _worker(self, name: str) -> None:
+        while True:
+            try:
+                batch = [await self.queue.get()]
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                offer_queue_size.set(self.queue.qsize())
+
+                try:
+                    await self._process_batch(await self._open_only(batch))
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Offer worker {name} error: {e}")
+                await asyncio.sleep(1)
+
+    async def _open_only(self, batch: List[MessageTask]) -> List[MessageTask]:
+        """Yopilgan buyurtmalar takliflarini olib tashlash (lokal + bitta MGET)"""
+        unknown = list({task.order_id for task in batch
+                        if task.order_id is not None and task.order_id not in self._closed})
+        if unknown:
+            try:
+                reasons = await cache.client.mget([CLOSED_KEY.format(order_id) for order_id in unknown])
+            except Exception:
+                reasons = []
+            for order_id, reason in zip(unknown, reasons):
+                if reason:
+                    self._closed.set(order_id, reason)  # pub/sub dan oldin boshqa jarayon yopgan
+
+        open_tasks = []
+        for task in batch:
+            reason = self._closed.get(task.order_id) if task.order_id is not None else None
+            if reason is None:
+                open_tasks.append(task)
+            else:
+                offer_sends_avoided_total.inc(reason=reason)
+        return open_tasks
+
+    async def _process_batch(self, batch: List[MessageTask]) -> None:
+        results = await asyncio.gather(*(self._send(task) for task in batch), return_exceptions=True)
+
+        sent = []
+        for task, result in zip(batch, results):
+            if not isinstance(result, Exception):
+                if result is not None:
+                    sent.append((task, result))
+                continue
+            if task.retry_count < self.max_retries:
+                task.retry_count += 1
+                offer_sends_total.inc(result="retried")
+                await self._resend_later(task, result)
+            else:
+                offer_sends_total.inc(result="failed")
+                logger.warning(f"⚠️ Offer to {task.telegram_id} failed after {self.max_retries} attempts: {result}")
+
+        if sent:
+            await self._record(sent)
+
+    async def _send(self, task: MessageTask):
+        if self.is_closed(task.order_id):
+            # Batch tayyorlanayotganda yopilgan
+            offer_sends_avoided_total.inc(reason=self._closed.get(task.order_id))
+            return None
+        message = await bot.send_message(chat_id=task.telegram_id, text=task.text, reply_markup=task.reply_markup)
+        offer_sends_total.inc(result="sent")
+        return message
+
+    async def _resend_later(self, task: MessageTask, error: Exception) -> None:
+        """Telegram ``retry_after`` (yoki backoff) dan keyin qayta yuborish"""
+        delay = 2 ** task.retry_count
+        if isinstance(error, ApiTelegramException) and error.error_code == 429:
+            delay = (error.result_json.get("parameters") or {}).get("retry_after") or delay
+        if not scheduler.running:
+            # Scheduler'siz (skriptlarda) - darhol navbatga
+            return await self.queue.put(task)
+        try:
+            await scheduler.schedule("offer.resend", task.to_payload(), delay=delay)
+        except Exception as e:
+            logger.warning(f"Offer resend to {task.telegram_id} not scheduled: {e}")
+            await self.queue.put(task)
+
+    # ==================== REGISTRY ====================
+
+    async def _record(self, sent: List[Tuple[MessageTask, object]]) -> None:
+        """Yuborilgan takliflarni qayd etish (batch uchun bitta pipeline)"""
+        late = set()
+        pipe = cache.client.pipeline(transaction=False)
+        for task, message in sent:
+            if task.order_id is None:
+                continue
+            key = MESSAGES_KEY.format(task.order_id)
+            pipe.hset(key, task.telegram_id, f"{message.message_id}:{task.lang}")
+            pipe.expire(key, self.registry_ttl)
+            if self.is_closed(task.order_id):
+                late.add(task.order_id)  # yuborish paytida yopildi - qaytarish navbati o'tib ketgan
+        for order_id in late:
+            pipe.rpush(RETRACT_KEY, f"{order_id}:{self._closed.get(order_id)}")
+        try:
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Offer registry write failed: {e}")
+
+    async def _retract_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.retract_interval)
+            try:
+                await self.retract_pending()
+            except Exception as e:
+                logger.error(f"❌ Offer retraction failed: {e}")
+
+    async def retract_pending(self) -> int:
+        """Navbatdagi yopilgan buyurtmalarning takliflarini tahrirlash; tahrirlanganlar sonini qaytaradi"""
+        items = await cache.client.lpop(RETRACT_KEY, self.retract_rate)
+        if not items:
+            return 0
+
+        orders = [item.partition(":") for item in items]
+        pipe = cache.client.pipeline(transaction=True)  # o'qish va o'chirish birga - ikki jarayon ikki marta tahrirlamaydi
+        for order_id, _, _ in orders:
+            pipe.hgetall(MESSAGES_KEY.format(order_id))
+            pipe.delete(MESSAGES_KEY.format(order_id))
+        results = await pipe.execute()
+
+        edits = []
+        for (order_id, _, reason), messages in zip(orders, results[::2]):
+            for chat_id, value in messages.items():
+                message_id, _, lang = value.partition(":")
+                edits.append((int(order_id), reason, int(chat_id), int(message_id), lang or "uz"))
+
+        # Telegram limitlari: soniyasiga ko'pi bilan retract_rate ta tahrir
+        for i in range(0, len(edits), self.retract_rate):
+            started = time.monotonic()
+            await asyncio.gather(*(self._retract(*edit) for edit in edits[i:i + self.retract_rate]))
+            if i + self.retract_rate < len(edits):
+                await asyncio.sleep(max(0.0, 1.0 - (time.monotonic() - started)))
+        return len(edits)
+
+    async def _retract(self, order_id: int, reason: str, chat_id: int, message_id: int, lang: str) -> None:
+        text = t(f"offer_closed_{reason}", lang, order_id=order_id)
+        for attempt in range(2):
+            try:
+                await bot.edit_message_text(text, chat_id, message_id)
+                offer_retractions_total.inc(result="edited")
+                return
+            except ApiTelegramException as e:
+                retry_after = (e.result_json.get("parameters") or {}).get("retry_after")
+                if e.error_code == 429 and retry_after and attempt == 0:
+                    await asyncio.sleep(retry_after)
+                    continue
+                logger.debug(f"Offer {order_id} retraction skipped for {chat_id}: {e.description}")
+            except Exception as e:
+                logger.warning(f"Offer {order_id} retraction failed for {chat_id}: {e}")
+            offer_retractions_total.inc(result="failed")
+            return
+
+    # ==================== PUB/SUB ====================
+
+    async def _listen(self, redis_client: redis.Redis) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(CLOSED_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    order_id, _, reason = str(message["data"]).partition(":")
+                    self._closed.set(int(order_id), reason or "claimed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Offer close listener error: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
+
+
+# Singleton instance
+offer_dispatcher = OfferDispatcher()
+
+
+@scheduler.job("offer.expire")
+async def _expire_job(payload: Dict[str, Any]) -> None:
+    await offer_dispatcher.close(payload["order_id"], "expired")
+
+
+@scheduler.job("offer.resend")
+async def _resend_job(payload: Dict[str, Any]) -> None:
+    await offer_dispatcher.enqueue(MessageTask(**payload))
@@ -0,0 +1,184 @@
+# application/api/open_orders.py
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .api_types import OrderTypes, _parse_datetime
+from ..core import codec
+from ..core.async_cache import AsyncTTLCache
+from ..core.config import settings
+from ..core.log import logger
+from ..database.cache import cache
+
+FEED_KEY = "orders:open:{}:{}"  # zset: route_id, tariff_id -> order_id (score: start_time)
+ORDER_KEY = "orders:open:order:{}"  # hash: feed (zset kaliti), data (OpenOrder JSON)
+
+# Bu tarifdagi buyurtmalar hamma tarif haydovchilariga ko'rsatiladi (``_find_matching_drivers`` dagi kabi)
+ANY_TARIFF_ID = 4
+
+# Buyurtmani o'z lentasidan olib tashlash; lenta kalitini qaytaradi
+_REMOVE = """
+local feed = redis.call('hget', KEYS[1], 'feed')
+if feed then
+    redis.call('zrem', feed, ARGV[1])
+end
+redis.call('del', KEYS[1])
+return feed
+"""
+
+
+@dataclass(slots=True)
+class OpenOrder:
+    order_id: int
+    order_type: str
+    start_time: str  # LOCAL_TZ da formatlangan
+    price: int
+    passenger: int
+    has_woman: bool = False
+    from_name: Dict[str, str] = field(default_factory=dict)
+    to_name: Dict[str, str] = field(default_factory=dict)
+
+    def route(self, lang: str) -> str:
+        from_city = self.from_name.get(lang) or self.from_name.get("uz", "")
+        to_city = self.to_name.get(lang) or self.to_name.get("uz", "")
+        return f"{from_city} → {to_city}"
+
+    @classmethod
+    def from_order(cls, order: OrderTypes) -> 'OpenOrder':
+        content = order.content_object
+        route = content.route
+        passenger = int(content.passenger or 1)
+        price = int(content.price or 0)
+        return cls(
+            order_id=int(order.id),
+            order_type=order.order_type,
+            start_time=content.start_time_local,
+            price=price * passenger if order.order_type == "travel" else price,
+            passenger=passenger,
+            has_woman=bool(content.has_woman),
+            from_name=(route.from_city or {}).get("translate") or {},
+            to_name=(route.to_city or {}).get("translate") or {},
+        )
+
+    def to_compact(self) -> Dict[str, Any]:
+        return {"id": self.order_id, "t": self.order_type, "s": self.start_time, "p": self.price,
+                "n": self.passenger, "w": self.has_woman, "fn": self.from_name, "tn": self.to_name}
+
+    @classmethod
+    def from_compact(cls, data: Dict[str, Any]) -> 'OpenOrder':
+        return cls(order_id=data["id"], order_type=data.get("t", ""), start_time=data.get("s", ""),
+                   price=data.get("p", 0), passenger=data.get("n", 1), has_woman=data.get("w", False),
+                   from_name=data.get("fn") or {}, to_name=data.get("tn") or {})
+
+
+def _start_score(order: OrderTypes) -> float:
+    start_time = _parse_datetime(order.content_object.start_time)
+    return start_time.timestamp() if start_time else time.time()
+
+
+class OpenOrders:
+    """
+    Ochiq (CREATED) buyurtmalar lentasi - backendga so'rovsiz.
+
+    ``/driver`` webhook har bir yangi buyurtmani yo'nalish va tarif bo'yicha
+    ZSET ga (boshlanish vaqti bo'yicha) qo'shadi; qabul qilingan yoki bekor
+    qilingan buyurtma ``offer_dispatcher.close`` orqali olib tashlanadi.
+    Boshlanish vaqtidan ``start_grace`` soniya o'tganlari ko'rsatilmaydi.
+    Haydovchi o'z tarifi va "istalgan tarif" lentalarini birga ko'radi;
+    sahifalar ``cache_ttl`` soniya lokal keshlanadi.
+    """
+
+    def __init__(self, page_size: int = settings.OPEN_ORDERS_PAGE_SIZE, ttl: int = settings.OPEN_ORDERS_TTL,
+                 start_grace: int = settings.OPEN_ORDERS_START_GRACE, cache_ttl: float = settings.OPEN_ORDERS_CACHE_TTL):
+        self.page_size = page_size
+        self.ttl = ttl
+        self.start_grace = start_grace
+        self._pages = AsyncTTLCache("open_orders", maxsize=1024, ttl=cache_ttl)
+
+    # ==================== WRITE ====================
+
+    async def add(self, order: OrderTypes) -> None:
+        content = order.content_object
+        feed = FEED_KEY.format(content.route.route_id, content.tariff_id)
+        try:
+            pipe = cache.client.pipeline(transaction=False)
+            pipe.hset(ORDER_KEY.format(order.id),
+                      mapping={"feed": feed, "data": codec.dumps_str(OpenOrder.from_order(order).to_compact())})
+            pipe.expire(ORDER_KEY.format(order.id), self.ttl)
+            pipe.zadd(feed, {order.id: _start_score(order)})
+            pipe.zremrangebyscore(feed, "-inf", time.time() - self.start_grace)
+            pipe.expire(feed, self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Open order {order.id} not added to feed: {e}")
+        self._pages.clear()
+
+    async def remove(self, order_id: int) -> Optional[Tuple[str, str]]:
+        """Lentadan olib tashlash; buyurtma turgan (route_id, tariff_id) ni qaytaradi"""
+        try:
+            feed = await cache.client.eval(_REMOVE, 1, ORDER_KEY.format(order_id), order_id)
+        except Exception as e:
+            logger.warning(f"Open order {order_id} not removed from feed: {e}")
+            self._pages.clear()
+            return None
+        if not feed:
+            return None  # lentada yo'q (takroriy yopish) - sahifalar keshi o'zgarmaydi
+        self._pages.clear()
+        _, route_id, tariff_id = feed.rsplit(":", 2)
+        return route_id, tariff_id
+
+    # ==================== READ ====================
+
+    async def page(self, route_id: int, tariff_id: Optional[int], page: int = 0,
+                   size: Optional[int] = None) -> Tuple[List[OpenOrder], int]:
+        """Haydovchi lentasining ``page`` sahifasi (``size`` ta, standart ``page_size``) va jami buyurtmalar soni"""
+        size = size or self.page_size
+        return await self._pages.get_or_load((route_id, tariff_id, page, size),
+                                             lambda: self._load(route_id, tariff_id, page, size))
+
+    def pages(self, total: int) -> int:
+        return max(1, math.ceil(total / self.page_size))
+
+    async def _load(self, route_id: int, tariff_id: Optional[int], page: int,
+                    size: int) -> Tuple[List[OpenOrder], int]:
+        feeds = [FEED_KEY.format(route_id, ANY_TARIFF_ID)]
+        if tariff_id is not None and tariff_id != ANY_TARIFF_ID:
+            feeds.append(FEED_KEY.format(route_id, tariff_id))
+        since = time.time() - self.start_grace
+        end = (page + 1) * size
+
+        # Ikki lentani birlashtirish: har biridan ``end`` tagacha olib, vaqt bo'yicha saralash
+        pipe = cache.client.pipeline(transaction=False)
+        for feed in feeds:
+            pipe.zrangebyscore(feed, since, "+inf", start=0, num=end, withscores=True)
+            pipe.zcount(feed, since, "+inf")
+        results = await pipe.execute()
+        merged = sorted((score, int(order_id)) for members in results[::2] for order_id, score in members)
+        total = sum(results[1::2])
+        order_ids = [order_id for _, order_id in merged[page * size:end]]
+        if not order_ids:
+            return [], total
+
+        pipe = cache.client.pipeline(transaction=False)
+        for order_id in order_ids:
+            pipe.hget(ORDER_KEY.format(order_id), "data")
+        raws = await pipe.execute()
+
+        orders, stale = [], []
+        for order_id, raw in zip(order_ids, raws):
+            if raw:
+                orders.append(OpenOrder.from_compact(codec.loads(raw)))
+            else:
+                stale.append(order_id)  # ma'lumoti muddati o'tgan
+        if stale:
+            pipe = cache.client.pipeline(transaction=False)
+            for feed in feeds:
+                pipe.zrem(feed, *stale)
+            await pipe.execute()
+        return orders, total - len(stale)
+
+
+# Singleton instance
+open_orders = OpenOrders()
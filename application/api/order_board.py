@@ -0,0 +1,197 @@
+# application/api/order_board.py
+
+import hashlib
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from telebot.asyncio_helper import ApiTelegramException
+
+from .open_orders import open_orders
+from ..core.bot import bot
+from ..core.config import settings
+from ..core.i18n import t
+from ..core.log import logger
+from ..core.metrics import metrics
+from ..core.scheduler import scheduler
+from ..database.cache import cache
+from ..services import TelegramUserServiceAPI
+from ..services.driver_service import DriverServiceAPI
+from ..services.driver_status import status_writer
+
+BOARD_KEY = "order_board:{}"  # hash: telegram_id -> message_id, lang, route_id, digest, dirty
+ROUTE_KEY = "order_board:route:{}"  # set: route_id -> doskasi bor haydovchilar
+REFRESH_JOB = "order-board:{}"  # scheduler ishi: haydovchi uchun bittadan
+
+order_board_updates_total = metrics.counter(
+    "order_board_updates_total", "Order board refreshes by result (sent, edited, unchanged, removed, retried, failed)"
+)
+
+
+class OrderBoard:
+    """
+    Har bir online haydovchi uchun bitta qadalgan "buyurtmalar doskasi".
+
+    ``OFFER_DELIVERY = "board"`` bo'lsa yangi buyurtma har bir haydovchiga
+    alohida xabar bo'lib yuborilmaydi: yo'nalish lentasi (``open_orders``)
+    o'zgarganda shu yo'nalishdagi doskalar "eskirgan" (``dirty``) deb
+    belgilanadi va ``order_board.refresh`` ishi ``interval`` soniyadan keyin
+    xabarni joyida tahrirlaydi. Oraliqdagi barcha o'zgarishlar bitta
+    tahrirga birlashadi - haydovchiga ``interval`` da ko'pi bilan bitta
+    so'rov; matn o'zgarmagan bo'lsa Telegram umuman chaqirilmaydi.
+    Haydovchi offline bo'lsa doska o'chiriladi.
+    """
+
+    def __init__(self, size: int = settings.ORDER_BOARD_SIZE, interval: float = settings.ORDER_BOARD_INTERVAL,
+                 ttl: int = settings.ORDER_BOARD_TTL):
+        self.size = size
+        self.interval = interval
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return settings.OFFER_DELIVERY == "board"
+
+    # ==================== TRIGGERS ====================
+
+    async def touch(self, drivers: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """Haydovchilar doskasini yangilashni rejalashtirish; ``drivers`` - (telegram_id, lang yoki None)"""
+        drivers = dict(drivers)
+        if not drivers:
+            return
+        try:
+            pipe = cache.client.pipeline(transaction=False)
+            for telegram_id, lang in drivers.items():
+                key = BOARD_KEY.format(telegram_id)
+                pipe.hset(key, mapping={"dirty": 1, "lang": lang} if lang else {"dirty": 1})
+                pipe.expire(key, self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Order boards not marked for {len(drivers)} drivers: {e}")
+            return
+
+        for telegram_id in drivers:
+            if not scheduler.running:
+                # Scheduler'siz (skriptlarda) - darhol
+                await self.refresh(telegram_id)
+                continue
+            try:
+                # Kutilayotgan ish bo'lsa no-op: o'zgarishlar unga qo'shiladi
+                await scheduler.schedule("order_board.refresh", {"telegram_id": telegram_id}, delay=self.interval,
+                                         key=REFRESH_JOB.format(telegram_id))
+            except Exception as e:
+                logger.warning(f"Order board refresh not scheduled for {telegram_id}: {e}")
+
+    async def publish(self, route_id: int, drivers: Iterable[Tuple[int, Optional[str]]] = ()) -> None:
+        """Yo'nalish lentasi o'zgardi: doskasi bor haydovchilar va (yangi buyurtmada) mos haydovchilar"""
+        try:
+            members = await cache.client.smembers(ROUTE_KEY.format(route_id))
+        except Exception as e:
+            logger.warning(f"Order board members of route {route_id} not read: {e}")
+            members = ()
+        await self.touch([*((int(telegram_id), None) for telegram_id in members), *drivers])
+
+    # ==================== REFRESH ====================
+
+    async def refresh(self, telegram_id: int) -> Optional[float]:
+        """``order_board.refresh`` ishi; yangilash paytida yana o'zgargan bo'lsa kechikishni qaytaradi"""
+        from ..bot_app.keyboards.inline import order_board_inl  # bot_app handlerlari bu modulni import qiladi
+
+        key = BOARD_KEY.format(telegram_id)
+        pipe = cache.client.pipeline(transaction=True)
+        pipe.hgetall(key)
+        pipe.hdel(key, "dirty")
+        board, _ = await pipe.execute()
+        if not board:
+            return None
+
+        driver = await status_writer.overlay(await DriverServiceAPI().get_driver_by_telegram_id(telegram_id))
+        route_id = driver.route_id.route_id if driver and driver.route_id else None
+        if driver is None or driver.status != "online" or not route_id:
+            return await self._remove(telegram_id, board)
+
+        lang = board.get("lang") or await TelegramUserServiceAPI().get_lang(telegram_id) or "uz"
+        tariff = driver.cars[0].tariff if driver.cars else None
+        orders, total = await open_orders.page(route_id, tariff.id if tariff else None, 0, size=self.size)
+        if orders:
+            lines = "\n\n".join(
+                t("active_order_line", lang, order_id=order.order_id, route=order.route(lang),
+                  start_time=order.start_time, passenger=order.passenger, price=f"{order.price:,}")
+                for order in orders
+            )
+            text = t("order_board", lang, total=total, orders=lines)
+        else:
+            text = t("order_board_empty", lang)
+        reply_markup = order_board_inl(lang, orders)
+        digest = hashlib.sha1(f"{text}\n{reply_markup.to_json()}".encode()).hexdigest()[:16]
+
+        message_id = board.get("message_id")
+        if message_id and digest == board.get("digest"):
+            order_board_updates_total.inc(result="unchanged")
+        else:
+            try:
+                message_id = await self._show(telegram_id, message_id and int(message_id), text, reply_markup)
+            except ApiTelegramException as e:
+                retry_after = (e.result_json.get("parameters") or {}).get("retry_after")
+                if e.error_code == 429 and retry_after:
+                    order_board_updates_total.inc(result="retried")
+                    return retry_after
+                if e.error_code == 403:
+                    return await self._remove(telegram_id, board)  # bot bloklangan
+                order_board_updates_total.inc(result="failed")
+                logger.warning(f"Order board of {telegram_id} not updated: {e.description}")
+                return None
+
+        pipe = cache.client.pipeline(transaction=False)
+        pipe.hset(key, mapping={"message_id": message_id, "lang": lang, "route_id": route_id, "digest": digest})
+        pipe.expire(key, self.ttl)
+        if board.get("route_id") and board["route_id"] != str(route_id):
+            pipe.srem(ROUTE_KEY.format(board["route_id"]), telegram_id)
+        pipe.sadd(ROUTE_KEY.format(route_id), telegram_id)
+        pipe.expire(ROUTE_KEY.format(route_id), self.ttl)
+        pipe.hexists(key, "dirty")
+        *_, dirty = await pipe.execute()
+        return self.interval if dirty else None
+
+    async def _show(self, telegram_id: int, message_id: Optional[int], text: str, reply_markup) -> int:
+        """Doskani tahrirlash; xabar yo'q bo'lsa yangisini yuborib qadash"""
+        if message_id:
+            try:
+                await bot.edit_message_text(text, telegram_id, message_id, reply_markup=reply_markup)
+                order_board_updates_total.inc(result="edited")
+                return message_id
+            except ApiTelegramException as e:
+                if "message is not modified" in (e.description or ""):
+                    order_board_updates_total.inc(result="unchanged")
+                    return message_id
+                if e.error_code != 400:
+                    raise
+                # Haydovchi doskani o'chirgan - yangisi yuboriladi
+
+        message = await bot.send_message(telegram_id, text, reply_markup=reply_markup, disable_notification=True)
+        try:
+            await bot.pin_chat_message(telegram_id, message.message_id, disable_notification=True)
+        except ApiTelegramException as e:
+            logger.debug(f"Order board of {telegram_id} not pinned: {e.description}")
+        order_board_updates_total.inc(result="sent")
+        return message.message_id
+
+    async def _remove(self, telegram_id: int, board: Dict[str, Any]) -> None:
+        if board.get("message_id"):
+            try:
+                await bot.delete_message(telegram_id, int(board["message_id"]))
+            except ApiTelegramException as e:
+                logger.debug(f"Order board of {telegram_id} not deleted: {e.description}")
+        pipe = cache.client.pipeline(transaction=False)
+        pipe.delete(BOARD_KEY.format(telegram_id))
+        if board.get("route_id"):
+            pipe.srem(ROUTE_KEY.format(board["route_id"]), telegram_id)
+        await pipe.execute()
+        order_board_updates_total.inc(result="removed")
+
+
+# Singleton instance
+order_board = OrderBoard()
+
+
+@scheduler.job("order_board.refresh")
+async def _refresh_job(payload: Dict[str, Any]) -> Optional[float]:
+    return await order_board.refresh(payload["telegram_id"])
@@ -1,150 +1,34 @@
-import json
-import asyncio
-from datetime import datetime, timezone, timedelta
 from typing import List
-from dataclasses import dataclass
 
-from .api_types import OrderTypes, OrderStatus, PassengerTypes
+from .api_types import OrderTypes, OrderStatus, PassengerTypes, DriverInfo
+from .offers import CLOSING_STATUSES, offer_dispatcher, MessageTask
+from .open_orders import OpenOrder, open_orders
+from .order_board import order_board
+from .push import driver_topic, push_hub, route_topic
+from .waves import offer_waves
 from ..bot_app.keyboards.inline import confirm_order_inl, finish_inl
 from ..core.i18n import t
+from ..core import codec
 from ..core.bot import bot
 from ..services import TelegramUserServiceAPI
+from ..services.driver_cache import driver_cache
 from ..services.driver_service import DriverServiceAPI
-
-
-@dataclass
-class MessageTask:
-    telegram_id: int
-    text: str
-    reply_markup: dict
-    retry_count: int = 0
-
-
-class MessageQueue:
-    """Message queue manager"""
-
-    def __init__(self, max_workers: int = 5, batch_size: int = 10):
-        self.queue = asyncio.Queue()
-        self.max_workers = max_workers
-        self.batch_size = batch_size
-        self.is_running = False
-        self.workers = []
-
-    async def start(self):
-        """Queue ishga tushirish"""
-        if not self.is_running:
-            self.is_running = True
-            # Bir nechta workerlar yaratish
-            for i in range(self.max_workers):
-                worker = asyncio.create_task(self._worker(f"worker-{i}"))
-                self.workers.append(worker)
-            print(f"MessageQueue started with {self.max_workers} workers")
-
-    async def stop(self):
-        """Queue to'xtatish"""
-        self.is_running = False
-        # Wait for all workers to complete
-        for worker in self.workers:
-            worker.cancel()
-        await asyncio.gather(*self.workers, return_exceptions=True)
-        self.workers.clear()
-
-    async def add_message(self, message_task: MessageTask):
-        """Queuega message qo'shish"""
-        await self.queue.put(message_task)
-
-    async def _worker(self, name: str):
-        """Worker function"""
-        while self.is_running:
-            try:
-                # Batch olish
-                batch = []
-                for _ in range(self.batch_size):
-                    try:
-                        # Timeout bilan olish
-                        task = await asyncio.wait_for(self.queue.get(), timeout=1.0)
-                        batch.append(task)
-                    except asyncio.TimeoutError:
-                        break
-
-                if batch:
-                    # Batch message jo'natish
-                    await self._process_batch(batch)
-
-                    # Tasklarni queue dan chiqarish
-                    for task in batch:
-                        self.queue.task_done()
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"Worker {name} error: {e}")
-                await asyncio.sleep(1)
-
-    async def _process_batch(self, batch: List[MessageTask]):
-        """Batch message jo'natish"""
-        tasks = []
-        for message_task in batch:
-            task = self._send_single_message(
-                message_task.telegram_id,
-                message_task.text,
-                message_task.reply_markup,
-                message_task.retry_count
-            )
-            tasks.append(task)
-
-        # Barcha message lar parallel jo'natiladi
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Xatolarni qayta ishlash
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                message_task = batch[i]
-                if message_task.retry_count < 3:
-                    message_task.retry_count += 1
-                    await self.add_message(message_task)
-                    print(f"Retrying message to {message_task.telegram_id}, attempt {message_task.retry_count}")
-                else:
-                    print(f"Failed to send message to {message_task.telegram_id} after 3 attempts")
-
-    async def _send_single_message(self, telegram_id: int, text: str, reply_markup: dict, retry_count: int):
-        """Bitta message jo'natish"""
-        try:
-            await bot.send_message(
-                chat_id=telegram_id,
-                text=text,
-                reply_markup=reply_markup
-            )
-            print(f"Message sent to {telegram_id}")
-            return True
-        except Exception as e:
-            print(f"Error sending to {telegram_id}: {e}")
-            return e
+from ..services.driver_session import FINAL_STATUSES, driver_sessions
 
 
 class OrderResponse:
     def __init__(self, request):
         self.driver_api = DriverServiceAPI()
         self.request = request
-        self.message_queue = MessageQueue(max_workers=3, batch_size=5)
-        self._queue_started = False
-
-    async def _ensure_queue_started(self):
-        """Queue ishlashini ta'minlash"""
-        if not self._queue_started:
-            await self.message_queue.start()
-            self._queue_started = True
 
     async def _order(self) -> OrderTypes:
         """Buyurtma ma'lumotlarini olish"""
         try:
-            response = await self.request.body()
-            result = response.decode("utf-8")
-            data = json.loads(result)
+            data = codec.loads(await self.request.body())
             order = OrderTypes.from_dict(data)
             print(f"Order types received: {order}")
             return order
-        except json.JSONDecodeError as e:
+        except codec.JSONDecodeError as e:
             print(f"JSON decode error: {e}")
             return
         except Exception as e:
@@ -155,20 +39,45 @@ class OrderResponse:
         """Asosiy control funksiyasi"""
         try:
             order: OrderTypes = await self._order()
-            if order.status == OrderStatus.CREATED.value:
-                # Queue ishlashini ta'minlash
-                await self._ensure_queue_started()
 
+            # Buyurtma haydovchining holati/balansini o'zgartirgan bo'lishi mumkin
+            if order.driver_details and order.status != OrderStatus.CREATED.value:
+                telegram_id = order.driver_details.get("telegram_id")
+                await driver_cache.invalidate(telegram_id)
+                # Bekor qilingan / yakunlangan buyurtma sessiyadan chiqadi
+                if telegram_id:
+                    await driver_sessions.sync(telegram_id, order.id, order.status)
+                    await push_hub.publish(driver_topic(telegram_id), "order.status",
+                                           {"id": order.id, "status": order.status})
+            elif order.status in FINAL_STATUSES:
+                # Haydovchi ma'lumotisiz yakunlangan - sessiyadagi joy indeks orqali bo'shatiladi
+                await driver_sessions.release(order.id)
+
+            # Buyurtma endi ochiq emas - navbatdagi takliflari yuborilmaydi
+            if order.status in CLOSING_STATUSES:
+                # Buyurtmani olgan haydovchining xabari qaytarib olinmaydi
+                keep_chat = order.driver_details.get("telegram_id") if order.driver_details else None
+                await offer_dispatcher.close(order.id, order.status, keep_chat=keep_chat)
+
+            if order.status == OrderStatus.CREATED.value:
                 # Driverlarni topish
                 drivers = await self._find_matching_drivers(order)
                 print(f"Found {len(drivers)} drivers for order {order.id}")
 
-                # Message larni queue ga qo'shish
-                for driver in drivers:
-                    await self._passenger_create(driver, order)
+                # "Faol buyurtmalar" lentasi va web app ulanishlari
+                await open_orders.add(order)
+                await push_hub.publish(route_topic(order.content_object.route.route_id, order.content_object.tariff_id),
+                                       "order.created", OpenOrder.from_order(order).to_compact())
+
+                if order_board.enabled:
+                    # Alohida xabar o'rniga mos haydovchilar doskasi yangilanadi
+                    await order_board.publish(order.content_object.route.route_id,
+                                              [(d.telegram_id, d.language) for d in drivers if d.telegram_id])
+                else:
+                    # Message larni to'lqinlar bilan queue ga qo'shish
+                    await offer_waves.dispatch(order, drivers)
 
             if order.status == OrderStatus.STARTED.value:
-                await self._ensure_queue_started()
                 lang = await TelegramUserServiceAPI().get_lang(order.driver_details.get("telegram_id"))
                 return await bot.send_message(
                     order.driver_details.get("telegram_id"),
@@ -178,7 +87,8 @@ class OrderResponse:
         except Exception as e:
             print(f"Error in OrderResponse.control: {e}")
 
-    def _create_travel_message(self, order: OrderTypes, lang):
+    @staticmethod
+    def _create_travel_message(order: OrderTypes, lang):
         try:
             gender_icon = "👩" if order.content_object.has_woman else "👤"
             woman_note = t("woman_passenger_note", lang) if order.content_object.has_woman else ""
@@ -195,13 +105,14 @@ class OrderResponse:
                      passenger=order.content_object.passenger,
                      woman_note=woman_note,
                      comment=order.content_object.comment,
-                     start_time=datetime.fromisoformat(order.content_object.start_time.replace('Z', '+00:00')).astimezone(timezone(timedelta(hours=5))).strftime("%d.%m.%Y, %H:%M"),
+                     start_time=order.content_object.start_time_local,
                      price=price)
             return text
         except Exception as e:
             print(f"Error in OrderResponse._create_travel_message: {e}")
 
-    def _create_delivery_message(self, order: OrderTypes, lang):
+    @staticmethod
+    def _create_delivery_message(order: OrderTypes, lang):
 
 
         text = t("new_delivery_request", lang,
@@ -211,28 +122,28 @@ class OrderResponse:
                  from_city=order.content_object.route.from_city.get("translate").get("uz"),
                  to_city=order.content_object.route.to_city.get("translate").get("uz"),
                  comment=order.content_object.comment,
-                 start_time=datetime.fromisoformat(order.content_object.start_time.replace('Z', '+00:00')).astimezone(
-                     timezone(timedelta(hours=5))).strftime("%d.%m.%Y, %H:%M"),
+                 start_time=order.content_object.start_time_local,
                  price=order.content_object.price)
 
         return text
 
-    async def _passenger_create(self, driver: dict, order: OrderTypes):
+    @classmethod
+    async def send_offer(cls, driver_info: DriverInfo, order: OrderTypes):
+        """Haydovchiga taklifni navbatga qo'yish (to'lqin ishlari ham shu orqali)"""
         try:
-            driver_info = driver.get("driver_info", {})
-            telegram_id = driver_info.get("telegram_id")
+            telegram_id = driver_info.telegram_id
 
             if not telegram_id:
                 print("Driver has no telegram_id")
                 return
 
-            lang = driver_info.get("language", "uz")
+            lang = driver_info.language or "uz"
 
             if order.order_type == "travel":
-                text = self._create_travel_message(order, lang)
+                text = cls._create_travel_message(order, lang)
                 reply_markup = confirm_order_inl(lang, order.id)
             else:
-                text = self._create_delivery_message(order, lang)
+                text = cls._create_delivery_message(order, lang)
                 reply_markup = confirm_order_inl(lang, order.id, travel=False)
 
 
@@ -241,16 +152,18 @@ class OrderResponse:
             message_task = MessageTask(
                 telegram_id=telegram_id,
                 text=text,
-                reply_markup=reply_markup
+                reply_markup=reply_markup,
+                order_id=order.id,
+                lang=lang,
             )
 
-            await self.message_queue.add_message(message_task)
+            await offer_dispatcher.enqueue(message_task)
             print(f"Message queued for driver {telegram_id}")
 
         except Exception as e:
             print(f"Error preparing message for driver: {e}")
 
-    async def _find_matching_drivers(self, order: OrderTypes) -> List[dict]:
+    async def _find_matching_drivers(self, order: OrderTypes) -> List[DriverInfo]:
         """Mos keladigan haydovchilarni topish"""
         try:
             params = {
@@ -264,14 +177,7 @@ class OrderResponse:
             if order.content_object.tariff_id != 4:
                 params["tariff_id"] =  order.content_object.tariff_id
 
-            response = await self.driver_api.list_drivers(params)
-            return response.get("results", {})
+            return await self.driver_api.list_driver_infos(params, convert=DriverInfo.from_dict)
         except Exception as e:
             print(f"Error OrderResponse._find_matching_drivers {e}")
             return []
-
-    async def cleanup(self):
-        """Tozalash ishlari"""
-        if self._queue_started:
-            await self.message_queue.stop()
-            self._queue_started = False
\ No newline at end of file
@@ -0,0 +1,328 @@
+# application/api/push.py
+
+import asyncio
+import hashlib
+import hmac
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from urllib.parse import parse_qsl
+
+import redis.asyncio as redis
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.websockets import WebSocketState
+
+from .open_orders import ANY_TARIFF_ID
+from ..core import codec
+from ..core.async_cache import AsyncTTLCache
+from ..core.config import settings
+from ..core.log import logger
+from ..core.metrics import metrics
+from ..database.cache import cache
+from ..services.driver_service import DriverServiceAPI
+
+PUSH_CHANNEL = "push:events"  # barcha jarayonlar uchun bitta kanal: {"topic", "event", "data"}
+INIT_DATA_HEADER = "X-Telegram-Init-Data"
+WS_UNAUTHORIZED = 4401  # WebSocket close code (4000-4999 ilovaga ajratilgan)
+
+push_connections = metrics.gauge("push_connections", "Open web app push connections by transport (ws, sse)")
+push_events_total = metrics.counter(
+    "push_events_total", "Push events by result (delivered, dropped - client queue full)"
+)
+push_auth_total = metrics.counter("push_auth_total", "Web app initData checks by result (ok, cached, invalid)")
+
+
+def route_topic(route_id, tariff_id) -> str:
+    return f"route:{route_id}:{tariff_id}"
+
+
+def driver_topic(telegram_id) -> str:
+    return f"driver:{telegram_id}"
+
+
+# ==================== AUTH ====================
+
+@lru_cache(maxsize=1)
+def _secret_key(bot_token: str) -> bytes:
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
+
+def validate_init_data(init_data: str, bot_token: str, max_age: int) -> Optional[Dict[str, Any]]:
+    """Telegram WebApp ``initData`` imzosini tekshirish; to'g'ri bo'lsa ``user`` ni qaytaradi"""
+    fields = dict(parse_qsl(init_data, keep_blank_values=True))
+    received = fields.pop("hash", "")
+    if not received:
+        return None
+    check_string = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
+    expected = hmac.new(_secret_key(bot_token), check_string.encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, received):
+        return None
+    if max_age and time.time() - int(fields.get("auth_date") or 0) > max_age:
+        return None
+    try:
+        user = codec.loads(fields.get("user") or "null")
+    except codec.JSONDecodeError:
+        return None
+    return user if isinstance(user, dict) and user.get("id") else None
+
+
+class InitDataAuth:
+    """
+    ``initData`` tekshiruvi, sessiya bo'yicha keshlangan.
+
+    Web app qayta ulanganda (tarmoq uzilishi, SSE reconnect) bir xil
+    ``initData`` yuboradi - HMAC uning SHA-256 bo'yicha ``ttl`` soniyaga
+    keshlanadi va qayta hisoblanmaydi. Keshdagi sessiya ham
+    ``auth_date + max_age`` dan keyin qabul qilinmaydi.
+    """
+
+    def __init__(self, ttl: float = settings.PUSH_AUTH_CACHE_TTL, max_age: int = settings.PUSH_INIT_DATA_MAX_AGE):
+        self.max_age = max_age
+        self._sessions = AsyncTTLCache("push_sessions", maxsize=10000, ttl=ttl)
+
+    def user(self, init_data: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not init_data:
+            push_auth_total.inc(result="invalid")
+            return None
+        session = hashlib.sha256(init_data.encode()).hexdigest()
+        cached = self._sessions.get(session)
+        if cached is not None:
+            user, expires_at = cached
+            if expires_at is None or time.time() <= expires_at:
+                push_auth_total.inc(result="cached")
+                return user
+        user = validate_init_data(init_data, settings.BOT_TOKEN, self.max_age)
+        if user is None:
+            push_auth_total.inc(result="invalid")
+            return None
+        push_auth_total.inc(result="ok")
+        expires_at = None
+        if self.max_age:
+            expires_at = int(dict(parse_qsl(init_data)).get("auth_date") or 0) + self.max_age
+        self._sessions.set(session, (user, expires_at))
+        return user
+
+
+# ==================== HUB ====================
+
+@dataclass(slots=True)
+class PushEvent:
+    topic: str
+    event: str
+    raw: str  # Redis dan kelgan JSON - WebSocket'ga o'zgarishsiz yuboriladi
+    _sse: Optional[str] = None
+
+    @property
+    def sse(self) -> str:
+        """SSE kadri, birinchi SSE ulanish uchun bir marta yasaladi"""
+        if self._sse is None:
+            self._sse = f"event: {self.event}\ndata: {self.raw}\n\n"
+        return self._sse
+
+
+class PushConnection:
+    __slots__ = ("telegram_id", "topics", "queue")
+
+    def __init__(self, telegram_id: int, topics: List[str], queue_size: int):
+        self.telegram_id = telegram_id
+        self.topics = topics
+        self.queue: "asyncio.Queue[Optional[PushEvent]]" = asyncio.Queue(queue_size)
+
+
+class PushHub:
+    """
+    Web app ulanishlariga hodisalarni tarqatuvchi markaz.
+
+    ``publish`` hodisani Redis ``push:events`` kanaliga yozadi; har bir
+    jarayon uni bir marta oladi va shu mavzuga obuna bo'lgan lokal
+    ulanishlar navbatiga bitta obyektni qo'yadi - JSON qayta
+    serializatsiya qilinmaydi, Telegram API chaqirilmaydi. Navbati to'lgan
+    (sekin) ulanish uchun hodisa tashlab yuboriladi.
+    """
+
+    def __init__(self, queue_size: int = settings.PUSH_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[PushConnection]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self, redis_client: redis.Redis) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen(redis_client), name="push-hub-listener")
+            logger.info("✅ Push hub started")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        # Ochiq ulanishlarga yopilish belgisi (None); ular o'z handlerlarida yopiladi
+        for connection in {c for connections in self._topics.values() for c in connections}:
+            if connection.queue.full():
+                connection.queue.get_nowait()
+            connection.queue.put_nowait(None)
+
+    # ==================== SUBSCRIPTIONS ====================
+
+    def subscribe(self, telegram_id: int, topics: List[str]) -> PushConnection:
+        connection = PushConnection(telegram_id, topics, self.queue_size)
+        for topic in topics:
+            self._topics.setdefault(topic, set()).add(connection)
+        return connection
+
+    def unsubscribe(self, connection: PushConnection) -> None:
+        for topic in connection.topics:
+            connections = self._topics.get(topic)
+            if connections is not None:
+                connections.discard(connection)
+                if not connections:
+                    del self._topics[topic]
+
+    # ==================== EVENTS ====================
+
+    async def publish(self, topic: str, event: str, data: Any) -> None:
+        raw = codec.dumps_str({"topic": topic, "event": event, "data": data})
+        if self._listener is None:
+            # Lifespan'siz (skriptlarda) - faqat shu jarayon ulanishlariga
+            return self._deliver(PushEvent(topic, event, raw))
+        try:
+            await cache.client.publish(PUSH_CHANNEL, raw)
+        except Exception as e:
+            logger.warning(f"Push event {event} for {topic} not published: {e}")
+
+    def _deliver(self, event: PushEvent) -> None:
+        delivered = dropped = 0
+        for connection in self._topics.get(event.topic, ()):
+            try:
+                connection.queue.put_nowait(event)
+                delivered += 1
+            except asyncio.QueueFull:
+                dropped += 1
+        if delivered:
+            push_events_total.inc(delivered, result="delivered")
+        if dropped:
+            push_events_total.inc(dropped, result="dropped")
+
+    async def _listen(self, redis_client: redis.Redis) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(PUSH_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    raw = message["data"]
+                    header = codec.loads(raw)
+                    if header.get("topic") in self._topics:
+                        self._deliver(PushEvent(header["topic"], header.get("event", "message"), raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Push hub listener error: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
+
+
+# Singleton instance
+push_hub = PushHub()
+init_data_auth = InitDataAuth()
+
+
+# ==================== ENDPOINTS ====================
+
+push_router = APIRouter(prefix="/push")
+
+
+async def _driver_topics(telegram_id: int) -> List[str]:
+    """Haydovchi yo'nalishi va tarifi bo'yicha mavzular (driver keshidan)"""
+    topics = [driver_topic(telegram_id)]
+    driver = await DriverServiceAPI().get_driver_by_telegram_id(telegram_id)
+    route_id = driver.route_id.route_id if driver and driver.route_id else None
+    if route_id:
+        topics.append(route_topic(route_id, ANY_TARIFF_ID))
+        tariff = driver.cars[0].tariff if driver.cars else None
+        if tariff and tariff.id != ANY_TARIFF_ID:
+            topics.append(route_topic(route_id, tariff.id))
+    return topics
+
+
+@push_router.websocket("/ws")
+async def push_ws(websocket: WebSocket):
+    """Buyurtma hodisalari (WebSocket); ``initData`` - query parametri yoki header"""
+    user = init_data_auth.user(websocket.query_params.get("init_data") or websocket.headers.get(INIT_DATA_HEADER))
+    await websocket.accept()
+    if user is None:
+        # Brauzer handshake'dagi HTTP statusni ko'rmaydi - sabab close code'da
+        return await websocket.close(code=WS_UNAUTHORIZED)
+
+    connection = push_hub.subscribe(int(user["id"]), await _driver_topics(int(user["id"])))
+    push_connections.inc(transport="ws")
+    receiver = asyncio.create_task(_drain_client(websocket))
+    try:
+        await websocket.send_text(codec.dumps_str({"event": "hello", "data": {"topics": connection.topics}}))
+        while not receiver.done():
+            getter = asyncio.create_task(connection.queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, timeout=settings.PUSH_HEARTBEAT,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                if not done:
+                    await websocket.send_text('{"event":"ping"}')
+                continue
+            event = getter.result()
+            if event is None:
+                break
+            await websocket.send_text(event.raw)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+        push_hub.unsubscribe(connection)
+        push_connections.dec(transport="ws")
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close()
+
+
+async def _drain_client(websocket: WebSocket) -> None:
+    """Client xabarlarini o'qib tashlash (ping); uzilganda tugaydi"""
+    try:
+        while True:
+            await websocket.receive_text()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+
+
+@push_router.get("/sse")
+async def push_sse(request: Request):
+    """WebSocket ishlamaydigan tarmoqlar uchun o'sha hodisalar (Server-Sent Events)"""
+    user = init_data_auth.user(request.headers.get(INIT_DATA_HEADER) or request.query_params.get("init_data"))
+    if user is None:
+        return JSONResponse({"detail": "Unauthorized"}, status_code=401)
+    connection = push_hub.subscribe(int(user["id"]), await _driver_topics(int(user["id"])))
+    push_connections.inc(transport="sse")
+
+    async def stream() -> AsyncIterator[str]:
+        try:
+            yield f"retry: 3000\nevent: hello\ndata: {codec.dumps_str({'topics': connection.topics})}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(connection.queue.get(), timeout=settings.PUSH_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    break
+                yield event.sse
+        finally:
+            push_hub.unsubscribe(connection)
+            push_connections.dec(transport="sse")
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,17 +1,25 @@
 from fastapi import APIRouter
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 from telebot.types import Update
 
 from .order_service import OrderResponse
+from ..core import codec
 from ..core.bot import bot
 from ..core.config import settings
 from ..core.log import logger
+from ..core.loop_monitor import current_step
 from ..database.cache import cache
 from ..core.i18n import t
+from ..core.i18n_bundle import translation_bundles
+from ..core.metrics import metrics
 
 router = APIRouter()
 
+i18n_bundle_requests_total = metrics.counter(
+    "i18n_bundle_requests_total", "Translation bundle requests by result (ok, not_modified)"
+)
+
 
 @router.get("/")
 async def root():
@@ -39,10 +47,29 @@ async def health():
         }, 503
 
 
+@router.get("/translate/bundle/{lang}")
+async def translate_bundle(lang: str, request: Request, prefix: str = ""):
+    """All translations of a language (optionally only keys starting with ``prefix``)."""
+    bundle = translation_bundles.get(lang, prefix)
+    if bundle is None:
+        # Noma'lum til yoki hech bir kalitga mos kelmagan prefix
+        return JSONResponse({"detail": "Translations not found"}, status_code=404)
+
+    headers = {"ETag": bundle.etag, "Cache-Control": "public, no-cache", "Vary": "Accept-Encoding"}
+    if bundle.matches(request.headers.get("If-None-Match")):
+        i18n_bundle_requests_total.inc(result="not_modified")
+        return Response(status_code=304, headers=headers)
+
+    i18n_bundle_requests_total.inc(result="ok")
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        return Response(bundle.gzipped, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(bundle.body, media_type="application/json", headers=headers)
+
+
 @router.get("/translate/{key}")
 async def translate(key: str, lang: str = "en"):
     """Get translation."""
-    logger.info(f"Translating:  {key}")
+    logger.debug(f"Translating:  {key}")
     return {
         "key": key,
         "lang": lang,
@@ -53,9 +80,10 @@ async def translate(key: str, lang: str = "en"):
 @router.post("/webhook")
 async def webhook(request: Request):
     """ webhook endpoint."""
+    current_step.set("webhook")
     try:
         update = await request.body()
-        await bot.process_new_updates([Update.de_json(update.decode("utf-8"))])
+        await bot.process_new_updates([Update.de_json(codec.loads(update))])
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
@@ -73,6 +101,7 @@ async def set_webhook(request: Request):
 
 @router.post("/driver")
 async def travel_started(request: Request):
+    current_step.set("OrderResponse.control")
     return await OrderResponse(request).control()
 
 
@@ -0,0 +1,124 @@
+# application/api/waves.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+from .api_types import DriverInfo, OrderTypes
+from .offers import CLOSED_KEY, offer_dispatcher
+from ..core.config import settings
+from ..core.log import logger
+from ..core.metrics import metrics
+from ..core.scheduler import scheduler
+from ..database.cache import cache
+
+WAVE_JOB = "offer-wave:{}:{}"  # order_id, to'lqin raqami (idempotency kaliti)
+
+offer_waves_total = metrics.counter("offer_waves_total", "Offer waves sent, by wave number")
+offer_wave_drivers_skipped_total = metrics.counter(
+    "offer_wave_drivers_skipped_total", "Matched drivers never offered because the order closed before their wave"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class WavePlan:
+    size: int  # bitta to'lqindagi haydovchilar (0 - hammasi birdan)
+    interval: float  # to'lqinlar orasidagi soniya
+    max_waves: int  # oxirgi to'lqin qolgan hamma haydovchilarga yuboriladi
+
+    def split(self, drivers: Sequence[DriverInfo]) -> List[List[DriverInfo]]:
+        drivers = list(drivers)
+        if not drivers:
+            return []
+        if self.size <= 0 or self.max_waves <= 1:
+            return [drivers]
+        waves = []
+        while drivers and len(waves) < self.max_waves - 1:
+            waves.append(drivers[:self.size])
+            drivers = drivers[self.size:]
+        if drivers:
+            waves.append(drivers)
+        return waves
+
+
+def wave_plan(tariff_id) -> WavePlan:
+    """``OFFER_WAVES`` dan tarif sozlamasi (bo'lmasa "default")"""
+    config = settings.OFFER_WAVES.get(str(tariff_id)) or settings.OFFER_WAVES.get("default") or {}
+    return WavePlan(
+        size=int(config.get("size", 0)),
+        interval=float(config.get("interval", 0)),
+        max_waves=int(config.get("max_waves", 1)),
+    )
+
+
+class OfferWaves:
+    """
+    Takliflarni to'lqinlar bilan yuborish.
+
+    Birinchi to'lqin reyting bo'yicha eng yuqori ``size`` ta haydovchiga
+    darhol ketadi. ``interval`` soniyada hech kim olmasa keyingi ``size`` ta
+    haydovchiga, va hokazo; oxirgi to'lqin qolganlarning hammasiga.
+    Keyingi to'lqinlar ``offer.wave`` ishi sifatida scheduler'da turadi,
+    shuning uchun restartdan keyin ham yuboriladi. Buyurtma yopilgan bo'lsa
+    (lokal yoki Redis dagi belgi) ular yuborilmaydi.
+    """
+
+    async def dispatch(self, order: OrderTypes, drivers: Sequence[DriverInfo]) -> None:
+        if offer_dispatcher.is_closed(order.id) or not await offer_dispatcher.open(order.id):
+            return  # takroriy "created" hodisasi yoki allaqachon yopilgan
+        plan = wave_plan(order.content_object.tariff_id)
+        waves = plan.split(drivers)
+        if not waves:
+            return
+
+        await self._send_wave(order, waves[0], 1)
+        if len(waves) > 1:
+            await self._schedule(order.to_dict(), [[(d.telegram_id, d.language) for d in w] for w in waves[1:]],
+                                 2, plan.interval)
+
+    async def run_wave(self, payload: Dict[str, Any]) -> None:
+        """``offer.wave`` ishi: navbatdagi to'lqinni yuborish va keyingisini rejalashtirish"""
+        order = OrderTypes.from_dict(payload["order"])
+        waves, number = payload["waves"], payload["number"]
+        if await self._closed(order.id):
+            offer_wave_drivers_skipped_total.inc(sum(len(w) for w in waves))
+            return
+
+        drivers = [DriverInfo(id=None, telegram_id=telegram_id, username=None, full_name=None,
+                              language=lang, is_banned=False) for telegram_id, lang in waves[0]]
+        await self._send_wave(order, drivers, number)
+        if len(waves) > 1:
+            await self._schedule(payload["order"], waves[1:], number + 1, payload["interval"])
+
+    @staticmethod
+    async def _schedule(order: Dict[str, Any], waves: List[List[Any]], number: int, interval: float) -> None:
+        await scheduler.schedule(
+            "offer.wave", {"order": order, "waves": waves, "number": number, "interval": interval},
+            delay=interval, key=WAVE_JOB.format(order["id"], number), done_ttl=settings.OFFER_CLOSED_TTL,
+        )
+
+    @staticmethod
+    async def _send_wave(order: OrderTypes, wave: List[DriverInfo], number: int) -> None:
+        from .order_service import OrderResponse  # order_service bu modulni import qiladi
+
+        offer_waves_total.inc(wave=str(number))
+        logger.debug(f"Order {order.id}: wave {number} to {len(wave)} drivers")
+        for driver in wave:
+            await OrderResponse.send_offer(driver, order)
+
+    @staticmethod
+    async def _closed(order_id: int) -> bool:
+        if offer_dispatcher.is_closed(order_id):
+            return True
+        try:
+            return bool(await cache.client.exists(CLOSED_KEY.format(order_id)))
+        except Exception:
+            return False
+
+
+# Singleton instance
+offer_waves = OfferWaves()
+
+
+@scheduler.job("offer.wave")
+async def _wave_job(payload: Dict[str, Any]) -> None:
+    await offer_waves.run_wave(payload)
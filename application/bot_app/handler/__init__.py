@@ -10,7 +10,7 @@ from .decorator import (
     HandlerMaster,
     BotStates,
     cmd, cb, msg, state, err,
-    throttle, error_handler, async_lru_cache
+    throttle, error_handler
 )
 
 # Import all handler modules
@@ -32,5 +32,5 @@ __all__ = [
     'BotStates',
     'cmd', 'cb', 'msg', 'state', 'err',
     'setup_handlers',
-    'throttle', 'error_handler', 'async_lru_cache'
+    'throttle', 'error_handler'
 ]
\ No newline at end of file
@@ -1,5 +1,4 @@
 import time
-from datetime import timezone, timedelta, datetime
 
 from telebot import types
 from telebot.states.asyncio import StateContext
@@ -7,12 +6,15 @@ from telebot.states.asyncio import StateContext
 from ..handler.functions import main_menu
 from ..handler.decorator import cb, UltraHandler, BalanceState
 from ..keyboards.inline import balance_inl, choice_balance_inl, settings_inl, chat_inl, back_inl, picked_up_inl, \
-    finish_inl, delete_inl
+    finish_inl, delete_inl, bulk_inl, active_orders_inl
 from ...api.api_types import OrderTypes
+from ...api.offers import offer_dispatcher
+from ...api.open_orders import open_orders
 
 from ...core.i18n import t
 from ...services.city_service import CityServiceAPI
 from ...services.driver_service import DriverServiceAPI
+from ...services.driver_session import driver_sessions, split_by_city, SessionOrder, TRANSITIONS
 from ...services.order_service import OrderServiceAPI
 from ...services.types import DriverService
 
@@ -38,7 +40,7 @@ async def balance_callback(
     h = UltraHandler(call, state)
     lang = await h.lang()
 
-    balance: DriverService = await DriverServiceAPI().get_driver_by_telegram_id(call.message.chat.id)
+    balance: DriverService = await h.get_driver()
 
     return await h.edit(
         "account_balance_info",
@@ -99,12 +101,18 @@ async def settings_callback(
 
 @cb("accept_")
 async def accept_order_callback(
-        call: types.CallbackQuery, state: StateContext
+        call: types.CallbackQuery, state: StateContext, send=False
 ):
     h = UltraHandler(call, state)
     lang = await h.lang()
-
-    data, order_type, order_id = call.data.split('_')
+    func = h.send if send else h.edit
+
+    order_type, order_id = call.data.split('_')[-2:]
+    # Yopilgani ma'lum buyurtma - backendga so'rov yubormasdan
+    # (muddati o'tgani backendda hali ochiq bo'lishi mumkin - tekshiriladi)
+    closed = offer_dispatcher.closed_reason(int(order_id))
+    if closed is not None and closed != "expired":
+        return await func(f"offer_closed_{closed}", reply_markup=delete_inl(lang), order_id=order_id)
     try:
         order_api = OrderServiceAPI()
         order = await order_api.get_order(int(order_id))
@@ -117,9 +125,22 @@ async def accept_order_callback(
             text = _create_text(lang, order_info, use_phone=order_info.creator.phone)
 
         if order_info.status == "created" and order_info.driver_details is None:
-
-            assigned = await order_api.add_new_driver(order_id, call.from_user.id)
-            if assigned.get("status") == "assigned":
+            # Joy sessiyada oldindan band qilinadi, shunda parallel qabullar limitdan oshmaydi
+            if not await driver_sessions.add(call.from_user.id, SessionOrder.from_order(order_info)):
+                limit = await h._("orders_limit_reached", limit=driver_sessions.max_orders)
+                return await h.answer(limit, show_alert=True, translate=False)
+
+            assigned = None
+            try:
+                assigned = await order_api.add_new_driver(order_id, call.from_user.id, driver=await h.get_driver())
+            finally:
+                # Buyurtma olinmadi (yoki xato) - band qilingan joy bo'shatiladi
+                if not (assigned and assigned.get("status") == "assigned"):
+                    await driver_sessions.remove(call.from_user.id, int(order_id))
+
+            if assigned and assigned.get("status") == "assigned":
+                # Qolgan haydovchilarga navbatdagi takliflar endi yuborilmaydi
+                await offer_dispatcher.close(order_id, "claimed", keep_chat=call.from_user.id)
                 location = order_info.content_object.from_location.get("location")
                 if location:
                     if location.get("latitude", None) and location.get("longitude", None):
@@ -127,13 +148,26 @@ async def accept_order_callback(
                             location.get("latitude"),
                             location.get("longitude")
                         )
-                return await h.edit(text, reply_markup=chat_inl(lang, order_id), translate=False)
+                together = await driver_sessions.group(call.from_user.id, int(order_id), "arrived")
+                reply_markup = chat_inl(lang, order_id, bulk=_bulk_hint(lang, together, "arrived"))
+                return await func(text, reply_markup=reply_markup, translate=False)
 
-        return await h.edit("order_taken_by_other", reply_markup=delete_inl(lang))
+        else:
+            # Boshqa haydovchi olgan yoki bekor qilingan (bu jarayon bilmagan bo'lishi mumkin)
+            await offer_dispatcher.close(order_id, order_info.status, keep_chat=call.from_user.id)
+        return await func("order_taken_by_other", reply_markup=delete_inl(lang))
     except Exception as e:
         print(e)
 
 
+@cb("board_accept_")
+async def board_accept_callback(
+        call: types.CallbackQuery, state: StateContext
+):
+    """Doskadan qabul qilish: javob alohida xabarda, doska o'z joyida qoladi"""
+    return await accept_order_callback(call, state, send=True)
+
+
 def _create_message_text(lang, order: OrderTypes, use_phone) -> str:
     # Gender belgisi
     gender_icon = "👩" if order.content_object.has_woman else "👤"
@@ -159,7 +193,7 @@ def _create_message_text(lang, order: OrderTypes, use_phone) -> str:
              woman_note=woman_note,
              price=formatted_price,  # Endi formatlangan
              phone=use_phone,
-             time=datetime.fromisoformat(order.content_object.start_time.replace('Z', '+00:00')).astimezone(timezone(timedelta(hours=5))).strftime("%d.%m.%Y, %H:%M"),
+             time=order.content_object.start_time_local,
              comment=order.content_object.comment,
              )
 
@@ -180,7 +214,7 @@ def _create_text(lang, order: OrderTypes, use_phone) -> str:
              price=formatted_price,
              phone=use_phone,
              comment=order.content_object.comment,
-             time=datetime.fromisoformat(order.content_object.start_time.replace('Z', '+00:00')).astimezone(timezone(timedelta(hours=5))).strftime("%d.%m.%Y, %H:%M"),
+             time=order.content_object.start_time_local,
              )
 
 
@@ -193,53 +227,91 @@ async def chat_callback(call: types.CallbackQuery, state: StateContext):
 
 @cb("arrived_")
 async def arrived_callback(call: types.CallbackQuery, state: StateContext):
-    h = UltraHandler(call, state)
-    lang = await h.lang()
     data, order_id = call.data.split('_')
-    order_api = OrderServiceAPI()
-    await order_api.update_status(int(order_id), "arrived")
-    return await h.send(
-        "send_arrived_info",
-        reply_markup=picked_up_inl(lang, order_id)
-    )
+    return await _advance_orders(call, state, "arrived", int(order_id))
 
 
 @cb("picked")
 async def picked_up_callback(call: types.CallbackQuery, state: StateContext):
-    h = UltraHandler(call, state)
+    data, order_id = call.data.split('_')
+    return await _advance_orders(call, state, "picked", int(order_id))
 
-    lang = await h.lang()
 
+@cb("finished")
+async def finish_callback(call: types.CallbackQuery, state: StateContext):
     data, order_id = call.data.split('_')
+    return await _advance_orders(call, state, "finished", int(order_id))
 
-    order_api = OrderServiceAPI()
-    await order_api.update_status(int(order_id), "started")
 
-    return await h.edit(
-        "safe_trip",
-        reply_markup=finish_inl(lang, order_id)
-    )
+@cb("bulk_")
+async def bulk_callback(call: types.CallbackQuery, state: StateContext):
+    """Shu shahardagi barcha buyurtmalar uchun arrived / picked / finished"""
+    data, action, order_id = call.data.split('_')
+    return await _advance_orders(call, state, action, int(order_id), bulk=True)
 
 
-@cb("finished")
-async def finish_callback(call: types.CallbackQuery, state: StateContext):
+# action -> (keyingi action, bitta buyurtma xabari, bitta buyurtma keyboard'i)
+_NEXT_STEP = {
+    "arrived": ("picked", "send_arrived_info", picked_up_inl),
+    "picked": ("finished", "safe_trip", finish_inl),
+    "finished": (None, "great", None),
+}
+
+
+async def _advance_orders(call: types.CallbackQuery, state: StateContext, action: str, order_id: int,
+                          bulk: bool = False):
     h = UltraHandler(call, state)
-    data, order_id = call.data.split('_')
-    order_api = OrderServiceAPI()
-    await order_api.update_status(int(order_id), "ended")
+    lang = await h.lang()
+    telegram_id = call.from_user.id
 
-    return await h.edit(
-        "great"
-    )
+    order_ids = [order_id]
+    if bulk:
+        order_ids = [o.order_id for o in await driver_sessions.group(telegram_id, order_id, action)] or order_ids
+
+    done, failed = await driver_sessions.advance(telegram_id, order_ids, action, bulk=bulk)
+    if not done:
+        return await h.answer("order_update_failed", show_alert=True)
+
+    next_action, text, keyboard = _NEXT_STEP[action]
+    # "arrived" yangi xabar yuboradi (buyurtma tafsilotlari qoladi), qolganlari tahrirlaydi
+    func = h.send if action == "arrived" else h.edit
+
+    if not bulk:
+        if keyboard is None:
+            return await func(text)
+        together = await driver_sessions.group(telegram_id, order_id, next_action)
+        return await func(text, reply_markup=keyboard(lang, order_id, bulk=_bulk_hint(lang, together, next_action)))
+
+    text = t(f"bulk_{action}_done", lang, count=len(done), orders=_order_lines(lang, done))
+    if failed:
+        text += "\n\n" + t("bulk_failed", lang, orders=_order_lines(lang, failed))
+
+    reply_markup = None
+    if next_action is not None:
+        # Keyingi qadam shaharlari farq qilishi mumkin (masalan har xil manzillar)
+        side = TRANSITIONS[next_action][2]
+        groups = [(g[0].order_id, len(g), g[0].city_name(side, lang)) for g in split_by_city(done, next_action)]
+        reply_markup = bulk_inl(lang, next_action, groups)
+    return await func(text, reply_markup=reply_markup, translate=False)
+
+
+def _bulk_hint(lang, together, action):
+    """Bulk tugma uchun (soni, shahar) - bir nechta buyurtma bo'lsagina"""
+    if len(together) < 2:
+        return None
+    return len(together), together[0].city_name(TRANSITIONS[action][2], lang)
+
+
+def _order_lines(lang, orders) -> str:
+    return "\n".join(t("session_order_line", lang, order_id=o.order_id, route=o.route(lang)) for o in orders)
 
 
 @cb("direction")
 async def direction_callback(call: types.CallbackQuery, state: StateContext):
     h = UltraHandler(call, state)
-    driver_api = DriverServiceAPI()
-    driver_data = await driver_api.get_driver_by_telegram_id(call.from_user.id)
+    driver_data = await h.get_driver()
     try:
-        await driver_api.change_direction(driver_data.id, driver_data.route_id.route_id)
+        h.ctx.set_driver(await DriverServiceAPI().change_direction(driver_data.id, driver_data.route_id.route_id))
         await h.answer("change_direction")
         await main_menu(call, state)
     except Exception as e:
@@ -267,43 +339,37 @@ async def delete_callback(call: types.CallbackQuery, state: StateContext):
     h = UltraHandler(call, state)
     await h.delete()
 
-# def create_active_order(orders, lang) -> str:
-#     print(orders)
-#     for order in orders.get("results", []):
-#
-#         order_price = t("order_price", lang, order_price=order.get("price", 0))
-#         order_type = t("order_type", lang, order_type=order.get("order_type", ""))
-#         if order.get("order_type", "") != "delivery":
-#             order_passenger = t("order_passenger", lang, )
-#
-#     return ""
-#
-# @cb("active_orders")
-# async def active_orders_callback(call: types.CallbackQuery, state: StateContext):
-#     h = UltraHandler(call, state)
-#     lang = await h.lang()
-#     driver = await h.get_driver()
-#     order_api = OrderServiceAPI()
-#     orders = await order_api.get_active_orders(
-#         {
-#             "from_location": driver.from_location,
-#             "to_location": driver.to_location,
-#             "status": "created",
-#             'travel_class': driver.car_class,
-#         }
-#     )
-#
-#     order_count = orders.get("count", 0)
-#
-#     if order_count == 0 or order_count < 0:
-#         return await h.answer("no_active_orders")
-#
-#     text = create_active_order(orders, lang)
-#
-#     return await h.send(
-#         text,
-#         translate=True,
-#
-#     )
-#
-#
+
+@cb("active_orders")
+async def active_orders_callback(call: types.CallbackQuery, state: StateContext):
+    """Haydovchi yo'nalishidagi ochiq buyurtmalar (Redis lentasidan, backendga so'rovsiz)"""
+    h = UltraHandler(call, state)
+    lang = await h.lang()
+    driver = await h.get_driver()
+
+    route_id = driver.route_id.route_id if driver and driver.route_id else None
+    if not route_id:
+        return await h.answer("no_active_orders", show_alert=True)
+    tariff = driver.cars[0].tariff if driver.cars else None
+
+    _, _, page = call.data.partition("active_orders_")
+    page = int(page) if page.isdigit() else 0
+    orders, total = await open_orders.page(route_id, tariff.id if tariff else None, page)
+    if not orders and page > 0:
+        # Sahifa bo'shab qolgan (buyurtmalar olingan) - birinchisiga qaytish
+        page = 0
+        orders, total = await open_orders.page(route_id, tariff.id if tariff else None, page)
+    if not orders:
+        return await h.answer("no_active_orders", show_alert=True)
+
+    pages = open_orders.pages(total)
+    lines = "\n\n".join(
+        t("active_order_line", lang, order_id=order.order_id, route=order.route(lang), start_time=order.start_time,
+          passenger=order.passenger, price=f"{order.price:,}")
+        for order in orders
+    )
+    return await h.edit(
+        "active_orders_page",
+        reply_markup=active_orders_inl(lang, orders, page, pages),
+        total=total, orders=lines, page=page + 1, pages=pages,
+    )
@@ -0,0 +1,99 @@
+# application/bot_app/handler/context.py
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ...core.log import logger
+from ...services import TelegramUserServiceAPI
+from ...services.driver_service import DriverServiceAPI
+from ...services.types import DriverService
+from ...services.user_service import UserService
+
+_current: ContextVar[Optional['UpdateContext']] = ContextVar('update_context', default=None)
+
+
+class UpdateContext:
+    """
+    Bitta update uchun umumiy ma'lumotlar.
+
+    User va driver birinchi so'ralganda bir marta yuklanadi va middleware,
+    handler hamda yordamchi funksiyalar o'rtasida bo'lishiladi. PATCH
+    javoblari ``set_driver`` orqali qaytarib yoziladi, qayta GET kerak emas.
+    Har bir update telebot'da alohida task'da ishlaydi, shuning uchun
+    kontekst ContextVar da saqlanadi.
+    """
+    __slots__ = ('telegram_id', '_loaded', '_loading')
+
+    def __init__(self, telegram_id: int):
+        self.telegram_id = telegram_id
+        self._loaded: Dict[str, Any] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    @classmethod
+    def current(cls) -> Optional['UpdateContext']:
+        return _current.get()
+
+    @classmethod
+    def for_user(cls, telegram_id: int) -> 'UpdateContext':
+        """Joriy update konteksti, boshqa foydalanuvchi uchun bo'lsa yangisi"""
+        ctx = _current.get()
+        if ctx is None or ctx.telegram_id != telegram_id:
+            ctx = cls(telegram_id)
+            _current.set(ctx)
+        return ctx
+
+    async def _once(self, name: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if name in self._loaded:
+            return self._loaded[name]
+        future = self._loading.get(name)
+        if future is None:
+            future = self._loading[name] = asyncio.ensure_future(loader())
+        try:
+            value = await future
+        finally:
+            if self._loading.get(name) is future:
+                del self._loading[name]
+        if value is None:
+            return None  # topilmadi - keyingi so'rov qayta tekshiradi (masalan /start dan keyin)
+        return self._loaded.setdefault(name, value)
+
+    # ==================== USER ====================
+
+    async def user(self, fresh: bool = False) -> Optional[UserService]:
+        """``fresh=True`` - keshsiz, backenddan (ban tekshiruvi uchun)"""
+        if fresh:
+            user = await TelegramUserServiceAPI().get_user(self.telegram_id, fresh=True)
+            if user is None:
+                self._loaded.pop('user', None)
+            else:
+                self._loaded['user'] = user
+            return user
+        return await self._once('user', lambda: TelegramUserServiceAPI().get_user(self.telegram_id))
+
+    # ==================== DRIVER ====================
+
+    async def driver(self, fresh: bool = False) -> Optional[DriverService]:
+        """``fresh=True`` - keshsiz, backenddan (balans tekshiruvlari uchun)"""
+        if fresh:
+            driver = await self._load_driver(fresh=True)
+            self.set_driver(driver)
+            return driver
+        return await self._once('driver', self._load_driver)
+
+    async def _load_driver(self, fresh: bool = False) -> Optional[DriverService]:
+        try:
+            return await DriverServiceAPI().get_driver_by_telegram_id(self.telegram_id, fresh=fresh)
+        except Exception as e:
+            logger.error(f"Error getting driver: {e}")
+            return None
+
+    def set_driver(self, driver: Optional[DriverService]) -> None:
+        """PATCH javobini kontekstga yozish; None bo'lsa keyingi so'rov qayta yuklaydi"""
+        if driver is None:
+            self.invalidate_driver()
+        else:
+            self._loaded['driver'] = driver
+
+    def invalidate_driver(self) -> None:
+        self._loaded.pop('driver', None)
@@ -3,6 +3,7 @@
 from typing import Any, Optional, Union, Callable, List, Dict
 from functools import wraps, lru_cache
 
+from telebot.asyncio_helper import ApiTelegramException
 from telebot.states.asyncio import StateContext
 from telebot.types import Message, CallbackQuery, InlineKeyboardMarkup, ReplyKeyboardMarkup, LabeledPrice
 from telebot.handler_backends import State, StatesGroup
@@ -10,13 +11,35 @@ from ...core.bot import bot
 from ...core.config import settings
 from ...core.i18n import t
 from ...core.log import logger
-from ...services import TelegramUserServiceAPI
-from ...services.driver_service import DriverServiceAPI
+from ...core.loop_monitor import current_step
+from ...core.metrics import metrics
+from ...core.tracing import span
+from ...services.types import DriverService
 from ...services.user_service import UserService
+from .context import UpdateContext
+from .router import CallbackRouter, RegexRouter
 
 # Admin IDs - environment variables dan olish kerak
 ADMINS: List[int] = []
 
+message_edits_total = metrics.counter(
+    "message_edits_total", "UltraHandler.edit calls by result (edited, skipped - same content, not_modified, failed)"
+)
+
+
+def _unchanged(message: Optional[Message], text: str, reply_markup) -> bool:
+    """Telegram yuborgan xabarda (``call.message``) allaqachon shu matn va klaviatura bor"""
+    if message is None or message.text is None:
+        return False
+    if text != message.html_text and (message.entities or text != message.text):
+        return False
+    current = message.reply_markup.to_dict() if message.reply_markup is not None else None
+    return current == (reply_markup.to_dict() if reply_markup is not None else None)
+
+
+def _not_modified(error: Exception) -> bool:
+    return isinstance(error, ApiTelegramException) and "message is not modified" in (error.description or "")
+
 
 # ==================== STATE CLASSES ====================
 
@@ -37,25 +60,6 @@ class BotNumber(StatesGroup):
 
 # ==================== PERFORMANCE DECORATORS ====================
 
-def async_lru_cache(maxsize: int = 128):
-    """Async funksiyalar uchun cache decorator"""
-
-    def decorator(func):
-        cache = {}
-
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            key = str(args) + str(kwargs)
-            if key not in cache:
-                cache[key] = await func(*args, **kwargs)
-            return cache[key]
-
-        wrapper.cache_clear = lambda: cache.clear()
-        return wrapper
-
-    return decorator
-
-
 def throttle(seconds: int = 1):
     """Rate limiting decorator"""
     last_called = {}
@@ -107,7 +111,7 @@ def error_handler(send_to_user: bool = True):
 # ==================== ULTRA HANDLER ====================
 
 class UltraHandler:
-    __slots__ = ('msg', 'context', '_user_cache', '_lang_cache', 'chat_id', 'user_id')
+    __slots__ = ('msg', 'context', 'ctx', '_user_cache', '_lang_cache', 'chat_id', 'user_id')
 
     def __init__(self, message: Union[Message, CallbackQuery], context: Optional[StateContext] = None):
         self.msg = message
@@ -117,21 +121,16 @@ class UltraHandler:
 
         self.user_id = message.from_user.id
         self.chat_id = message.chat.id if isinstance(message, Message) else message.message.chat.id
+        self.ctx = UpdateContext.for_user(self.user_id)
 
-    @async_lru_cache(maxsize=256)
     async def get_user(self) -> UserService:
         if not self._user_cache:
-            self._user_cache = await TelegramUserServiceAPI().get_user(self.user_id)
+            self._user_cache = await self.ctx.user()
         return self._user_cache
 
-    async def get_driver(self) -> Optional[DriverServiceAPI]:
-        """Get passenger or return None if not exists"""
-        try:
-            driver_api = DriverServiceAPI()
-            return await driver_api.get_driver_by_telegram_id(self.user_id)
-        except Exception as e:
-            logger.error(f"Error getting passenger: {e}")
-            return None
+    async def get_driver(self, fresh: bool = False) -> Optional[DriverService]:
+        """Get driver (update davomida bir marta yuklanadi) or return None if not exists"""
+        return await self.ctx.driver(fresh=fresh)
 
     async def lang(self) -> str:
         if not self._lang_cache:
@@ -165,7 +164,7 @@ class UltraHandler:
                 parse_mode="MarkdownV2",
             )
         except Exception as e:
-            print(e)
+            logger.debug(f"MarkdownV2 send failed, sending as plain text: {e}")
             return await bot.send_message(
                 self.chat_id,
                 final_text,
@@ -205,10 +204,14 @@ class UltraHandler:
     ) -> Optional[Message]:
         final_text = await self._(text, **kwargs) if translate else text
         message_id = self._get_message_id()
+        # Bir xil mazmun (back/settings/balance qayta bosilgan) - Telegramga so'rovsiz
+        if isinstance(self.msg, CallbackQuery) and _unchanged(self.msg.message, final_text, reply_markup):
+            message_edits_total.inc(result="skipped")
+            return None
         try:
             try:
 
-                return await bot.edit_message_text(
+                result = await bot.edit_message_text(
                     final_text,
                     self.chat_id,
                     message_id,
@@ -216,14 +219,24 @@ class UltraHandler:
                     parse_mode="MarkdownV2",
                 )
             except Exception as e:
-                print(e)
-                return await bot.edit_message_text(
+                if _not_modified(e):
+                    raise
+                logger.debug(f"MarkdownV2 edit failed, editing as plain text: {e}")
+                result = await bot.edit_message_text(
                     final_text,
                     self.chat_id,
                     message_id,
                     reply_markup=reply_markup,
                 )
+            if isinstance(self.msg, CallbackQuery) and isinstance(result, Message):
+                self.msg.message = result  # handler ichidagi keyingi tahrir yangi holat bilan solishtiriladi
+            message_edits_total.inc(result="edited")
+            return result
         except Exception as e:
+            if _not_modified(e):
+                message_edits_total.inc(result="not_modified")
+                return None
+            message_edits_total.inc(result="failed")
             logger.error(f"Error editing message: {e}")
             return None
 
@@ -336,6 +349,7 @@ class HandlerMaster:
     _messages: Dict[str, Dict] = {}
     _states: Dict[State, Callable] = {}
     _error_handlers: List[Callable] = []
+    callback_router = CallbackRouter()
 
     # ==================== DECORATORS ====================
 
@@ -426,7 +440,9 @@ class HandlerMaster:
             @bot.message_handler(commands=[cmd_name], state=config['state'])
             @throttle(seconds=0)
             @error_handler()
-            async def cmd_handler(message: Message, state: StateContext, cfg=config):
+            async def cmd_handler(message: Message, state: StateContext, cfg=config, name=cmd_name):
+
+                current_step.set(cfg['func'].__name__)
 
                 # Admin check
                 if cfg['admin'] and not await cls.is_admin(message.from_user.id):
@@ -435,60 +451,84 @@ class HandlerMaster:
                     return
 
                 try:
-                    await cfg['func'](message, state)
+                    # Xabar matni (argumentlar) span'ga yozilmaydi - faqat command nomi
+                    with span(f"handler {cfg['func'].__name__}", command=name):
+                        await cfg['func'](message, state)
                 except Exception as e:
                     await cls.handle_error(message, e)
 
         # 2. CALLBACK HANDLERS
         for key, config in cls._callbacks.items():
-            pattern = config['pattern']
-            state = config['state']
 
-            @bot.callback_query_handler(
-                func=lambda c, p=pattern: c.data.startswith(p) if p else True,
-                state=state
-            )
             @error_handler()
             @throttle(seconds=1)
             async def cb_handler(call: CallbackQuery, state: StateContext, cfg=config):
+                current_step.set(cfg['func'].__name__)
                 try:
-                    await cfg['func'](call, state)
+                    with span(f"handler {cfg['func'].__name__}", callback=str(cfg['pattern'])):
+                        await cfg['func'](call, state)
                 except Exception as e:
                     await cls.handle_error(call, e)
 
+            cls.callback_router.add(config['pattern'], cb_handler, config['state'])
+
         # 3. STATE HANDLERS
         for state, func in cls._states.items():
 
             @bot.message_handler(content_types=["location", "text"], state=state)
-            @bot.callback_query_handler(func=lambda call: call.data, state=state)
             @error_handler()
             async def state_msg_handler(message: Message, state: StateContext, f=func):
+                current_step.set(f.__name__)
                 try:
-                    await f(message, state)
+                    with span(f"handler {f.__name__}"):
+                        await f(message, state)
                 except Exception as e:
                     await cls.handle_error(message, e)
 
+            cls.callback_router.add_state(state, state_msg_handler)
+
+        # Barcha callbacklar uchun bitta handler
+        @bot.callback_query_handler(func=lambda call: True)
+        async def callback_dispatch(call: CallbackQuery, state: StateContext):
+            handler = await cls.callback_router.resolve(call.data, state.get)
+            if handler is not None:
+                await handler(call, state)
+
         # 4. MESSAGE HANDLERS
+        regex_routers: Dict[tuple, RegexRouter] = {}
         for name, config in cls._messages.items():
 
-            @bot.message_handler(
-                content_types=config['content_types'],
-                state=config['state']
-            )
             @error_handler()
             async def msg_handler(message: Message, state: StateContext, cfg=config):
-
-                # Regex check
-                if cfg['regex'] and message.text:
-                    import re
-                    if not re.match(cfg['regex'], message.text):
-                        return
-
+                current_step.set(cfg['func'].__name__)
                 try:
-                    await cfg['func'](message, state)
+                    with span(f"handler {cfg['func'].__name__}"):
+                        await cfg['func'](message, state)
                 except Exception as e:
                     await cls.handle_error(message, e)
 
+            if not config['regex']:
+                bot.message_handler(content_types=config['content_types'], state=config['state'])(msg_handler)
+                continue
+
+            # Bir xil content_types/state dagi regex handlerlar bitta handlerga yig'iladi
+            group = (tuple(config['content_types']), config['state'])
+            router = regex_routers.get(group)
+            if router is None:
+                router = regex_routers[group] = RegexRouter()
+
+                @bot.message_handler(
+                    content_types=config['content_types'],
+                    state=config['state'],
+                    func=lambda m, r=router: r.match(m.text) is not None
+                )
+                async def regex_dispatch(message: Message, state: StateContext, r=router):
+                    handler = r.match(message.text)
+                    if handler is not None:
+                        await handler(message, state)
+
+            router.add(config['regex'], msg_handler)
+
         logger.info(
             f"✅ Registered: {len(cls._commands)} commands, "
             f"{len(cls._callbacks)} callbacks, "
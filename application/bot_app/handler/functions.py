@@ -5,8 +5,9 @@ from telebot.states.asyncio import StateContext
 
 from ..handler import UltraHandler
 from ..keyboards.inline import main_menu_inl, register_driver_inl, balance_inl
+from ...api.order_board import order_board
 from ...core import t
-from ...services.driver_service import DriverServiceAPI
+from ...services.driver_status import status_writer
 from ...services.types import DriverService
 
 
@@ -20,16 +21,24 @@ async def main_menu(
 
     h = UltraHandler(msg, state)
     lang = await h.lang()
-    driver_api = DriverServiceAPI()
-    driver: Union[DriverService] = await h.get_driver()
+    # Online bo'lishda balans keshdan emas, backenddan tekshiriladi
+    going_online = status == "online"
+    driver: Union[DriverService] = await h.get_driver(fresh=going_online)
 
     if not driver:
         return await h.send(
             "not_driver",
             reply_markup=register_driver_inl(lang))
 
+    if 15000 > driver.amount and not going_online:
+        # Keshdagi balans kam - offline qilishdan oldin aniq qiymatni olish
+        driver = await h.get_driver(fresh=True) or driver
+    driver = await status_writer.overlay(driver)
+
     if 15000 > driver.amount:
-        await driver_api.update_driver(driver.id, {"status": "offline"})
+        await status_writer.set_status(driver.id, "offline", current=driver.status)
+        if order_board.enabled:
+            await order_board.touch([(h.chat_id, lang)])
         if isinstance(msg, types.Message):
             func = h.send
         else:
@@ -41,8 +50,11 @@ async def main_menu(
         )
 
     if status:
-        await driver_api.update_driver(driver.id, {"status": status})
-        driver_status = status
+        await status_writer.set_status(driver.id, status, current=driver.status)
+        driver.status = driver_status = status
+        if order_board.enabled:
+            # Online - doska yuboriladi, offline - o'chiriladi
+            await order_board.touch([(h.chat_id, lang)])
     else:
         driver_status = driver.status
 
@@ -5,7 +5,8 @@ from typing import Dict, Any, Union
 from telebot.asyncio_handler_backends import BaseMiddleware, CancelUpdate
 from telebot.types import Message, CallbackQuery
 from application.core import bot, logger
-from application.services import TelegramUserServiceAPI
+from application.core.tracing import span
+from application.bot_app.handler.context import UpdateContext
 
 
 class AllInOneMiddleware(BaseMiddleware):
@@ -21,7 +22,10 @@ class AllInOneMiddleware(BaseMiddleware):
 
     async def pre_process(self, message: Message, data: Any):
         """Barcha pre-processing vazifalari"""
+        with span("middleware.pre_process"):
+            return await self._pre_process(message, data)
 
+    async def _pre_process(self, message: Message, data: Any):
         # 1. Logging
         await self._log_request(message)
 
@@ -93,8 +97,10 @@ class AllInOneMiddleware(BaseMiddleware):
         try:
             user_id = message.from_user.id
 
-            # Ban check
-            if await TelegramUserServiceAPI().is_ban_user(user_id):
+            # Ban check - keshsiz (ban admin paneldan darhol ishlashi kerak);
+            # natija update kontekstiga yoziladi, handler uni qayta yuklamaydi
+            user = await UpdateContext.for_user(user_id).user(fresh=True)
+            if user is not None and user.is_banned:
                 await bot.send_message(message.chat.id, "🚫 You are banned.")
                 return False
 
@@ -1,6 +1,9 @@
+import asyncio
+
 from application.bot_app.handler import UltraHandler
 from application.bot_app.keyboards.inline import back_inl
 from application.core import bot, t, logger
+from application.core.config import settings
 from application.services.driver_service import DriverServiceAPI
 
 
@@ -18,6 +21,14 @@ async def checkout(pre_checkout_query):
                                                 " try to pay again in a few minutes, we need a small rest.")
 
 
+async def _alert_admins(text: str) -> None:
+    for admin_id in settings.ADMINS:
+        try:
+            await bot.send_message(admin_id, text, parse_mode=None)
+        except Exception as e:
+            logger.error(f"Failed to alert admin {admin_id}: {str(e)}")
+
+
 @bot.message_handler(content_types=['successful_payment'])
 async def got_payment(message):
     h = UltraHandler(message)
@@ -45,39 +56,50 @@ async def got_payment(message):
                 result = await driver_service.add_balance_by_telegram_id(
                     telegram_id=driver_telegram_id,
                     amount=amount,
-                    reason=f"Telegram payment: {payment_info.telegram_payment_charge_id}"
+                    reason=f"Telegram payment: {payment_info.telegram_payment_charge_id}",
+                    idempotency_key=payment_info.telegram_payment_charge_id
                 )
 
+                if result and result.get('duplicate'):
+                    # Telegram update'ni qayta yubordi - balans va xabarlar allaqachon bajarilgan
+                    return
+
                 if result:
-                    # Muvaffaqiyatli xabar
-                    await bot.send_message(
-                        message.from_user.id,
-                        text=t("payment_success_with_balance", lang=lang).format(
-                            amount=amount,
-                            new_balance=result['driver'].get('amount', 0)
+                    # To'lovchi va haydovchiga xabarlar bir vaqtda yuboriladi
+                    payer_notice, driver_notice = await asyncio.gather(
+                        bot.send_message(
+                            message.from_user.id,
+                            text=t("payment_success_with_balance", lang=lang).format(
+                                amount=amount,
+                                new_balance=result['driver'].get('amount', 0)
+                            ),
+                            reply_markup=back_inl(lang)
                         ),
-                        reply_markup=back_inl(lang)
-                    )
-
-                    # Haydovchiga ham xabar yuborish
-                    try:
-                        await bot.send_message(
+                        bot.send_message(
                             driver_telegram_id,
                             text=t("driver_balance_added", lang=lang).format(
                                 amount=amount,
                                 total_balance=result['driver'].get('amount', 0),
                                 payment_id=payment_info.telegram_payment_charge_id
                             )
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to notify driver: {str(e)}")
+                        ),
+                        return_exceptions=True,
+                    )
+                    if isinstance(payer_notice, Exception):
+                        logger.error(f"Failed to notify payer: {str(payer_notice)}")
+                    if isinstance(driver_notice, Exception):
+                        logger.error(f"Failed to notify driver: {str(driver_notice)}")
                 else:
-                    # Balans qo'shishda xatolik
+                    # Balans qo'shishda xatolik - to'lov payment:failed da, adminlar qo'lda tekshiradi
                     await bot.send_message(
                         message.from_user.id,
                         text=t("payment_success_but_balance_error", lang=lang),
                         reply_markup=back_inl(lang)
                     )
+                    await _alert_admins(
+                        f"⚠️ Payment {payment_info.telegram_payment_charge_id} not credited: "
+                        f"driver {driver_telegram_id}, amount {amount}, payer {message.from_user.id}"
+                    )
             else:
                 # Invalid payload
                 await bot.send_message(
@@ -0,0 +1,203 @@
+# application/bot_app/handler/router.py
+
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern, Union
+
+from telebot.handler_backends import State
+
+StateGetter = Callable[[], Awaitable[Optional[str]]]
+
+_MISSING = object()
+
+
+def _state_name(state: Union[State, str, None]) -> Optional[str]:
+    return state.name if isinstance(state, State) else state
+
+
+class CallbackRoute:
+    """Bitta ``@cb(pattern, state)`` yozuvi"""
+    __slots__ = ('index', 'pattern', 'state', 'handler')
+
+    def __init__(self, index: int, pattern: str, state: Optional[str], handler: Callable):
+        self.index = index
+        self.pattern = pattern
+        self.state = state
+        self.handler = handler
+
+    def __repr__(self) -> str:
+        return f"CallbackRoute({self.pattern!r}, state={self.state!r})"
+
+
+class _Node:
+    __slots__ = ('children', 'routes')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.routes: List[CallbackRoute] = []
+
+
+class CallbackRouter:
+    """
+    callback_data -> handler.
+
+    Patternlar prefix trie da saqlanadi: ``call.data`` bir marta yuriladi va
+    unga prefix bo'lgan barcha patternlar topiladi. Avvalgi
+    ``startswith`` filterlari kabi, birinchi ro'yxatdan o'tgan mos pattern
+    yutadi. Foydalanuvchi state'i faqat kerak bo'lganda va bir marta o'qiladi;
+    hech bir pattern mos kelmasa, state handler (agar bo'lsa) chaqiriladi.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._states: Dict[str, Callable] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, pattern: str, handler: Callable, state: Union[State, str, None] = None) -> CallbackRoute:
+        node = self._root
+        for char in pattern:
+            node = node.children.setdefault(char, _Node())
+        route = CallbackRoute(self._count, pattern, _state_name(state), handler)
+        node.routes.append(route)
+        self._count += 1
+        return route
+
+    def add_state(self, state: Union[State, str], handler: Callable) -> None:
+        """State ichida hech bir pattern mos kelmagan callbacklar uchun"""
+        self._states[_state_name(state)] = handler
+
+    def candidates(self, data: str) -> List[CallbackRoute]:
+        """``data`` ga prefix bo'lgan patternlar, ro'yxatdan o'tish tartibida"""
+        node = self._root
+        found = list(node.routes)
+        for char in data:
+            node = node.children.get(char)
+            if node is None:
+                break
+            found.extend(node.routes)
+        if len(found) > 1:
+            found.sort(key=lambda route: route.index)
+        return found
+
+    async def resolve(self, data: Optional[str], get_state: StateGetter) -> Optional[Callable]:
+        """Mos handlerni qaytarish; ``get_state`` ko'pi bilan bir marta chaqiriladi"""
+        data = data or ""
+        user_state: Any = _MISSING
+
+        for route in self.candidates(data):
+            if route.state is None:
+                return route.handler
+            if user_state is _MISSING:
+                user_state = await get_state()
+            if route.state == user_state:
+                return route.handler
+
+        if not data or not self._states:
+            return None
+        if user_state is _MISSING:
+            user_state = await get_state()
+        return self._states.get(user_state)
+
+
+# ==================== MESSAGE REGEX ROUTER ====================
+
+_REGEX_SPECIAL = set(".^$*+?{}[]|()")
+_BACKREF = re.compile(r'\\\d|\(\?P=')
+_GLOBAL_FLAGS = re.compile(r'\(\?[aiLmsux]+\)')
+
+
+def _literal(pattern: str) -> Optional[str]:
+    """``^/help$`` kabi to'liq literal pattern bo'lsa, matnini qaytarish"""
+    if not pattern.endswith('$') or pattern.endswith('\\$'):
+        return None
+    body = pattern[1:-1] if pattern.startswith('^') else pattern[:-1]
+    chars = []
+    escaped = False
+    for char in body:
+        if escaped:
+            if char.isalnum():
+                return None
+            chars.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char in _REGEX_SPECIAL:
+            return None
+        else:
+            chars.append(char)
+    return None if escaped else ''.join(chars)
+
+
+def _combinable(pattern: str, compiled: Pattern) -> bool:
+    """Nomli guruh, backreference va global flag'siz patternlar birlashtiriladi"""
+    return not (compiled.groupindex or _GLOBAL_FLAGS.match(pattern) or _BACKREF.search(pattern))
+
+
+class RegexRouter:
+    """
+    Matn -> handler, ``re.match`` semantikasi bilan.
+
+    Patternlar ro'yxatdan o'tganda kompilyatsiya qilinadi va ketma-ket
+    kelganlari ``(?P<h0>...)|(?P<h1>...)`` ko'rinishida bitta regexga
+    birlashtiriladi: bitta ``match`` qaysi handler ekanini ``lastgroup``
+    orqali beradi. ``^/help$`` kabi literal patternlar dict orqali topiladi.
+    Birinchi ro'yxatdan o'tgan mos pattern yutadi.
+    """
+
+    def __init__(self):
+        self._entries: List[tuple] = []
+        self._literals: Dict[str, tuple] = {}
+        self._first_regex = None
+        self._steps: Optional[List[tuple]] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, pattern: str, handler: Callable) -> None:
+        compiled = re.compile(pattern)
+        index = len(self._entries)
+        self._entries.append((pattern, compiled, handler))
+
+        literal = _literal(pattern)
+        if literal is not None:
+            self._literals.setdefault(literal, (index, handler))
+        elif self._first_regex is None:
+            self._first_regex = index
+        self._steps = None
+
+    def _build(self) -> List[tuple]:
+        """(regex, {group: handler}) yoki (regex, handler) qadamlari"""
+        steps, group = [], []
+
+        def flush():
+            if group:
+                combined = '|'.join(f'(?P<h{i}>{p})' for i, p, _ in group)
+                steps.append((re.compile(combined), {f'h{i}': h for i, _, h in group}))
+                group.clear()
+
+        for index, (pattern, compiled, handler) in enumerate(self._entries):
+            if _combinable(pattern, compiled):
+                group.append((index, pattern, handler))
+            else:
+                flush()
+                steps.append((compiled, handler))
+        flush()
+        return steps
+
+    def match(self, text: Optional[str]) -> Optional[Callable]:
+        if not text:
+            return None
+
+        hit = self._literals.get(text)
+        if hit is not None and (self._first_regex is None or hit[0] < self._first_regex):
+            return hit[1]
+
+        if self._steps is None:
+            self._steps = self._build()
+        for regex, target in self._steps:
+            found = regex.match(text)
+            if found is not None:
+                return target[found.lastgroup] if isinstance(target, dict) else target
+        return None
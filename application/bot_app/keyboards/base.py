@@ -1,10 +1,11 @@
 from typing import Optional, List, Union
 from dataclasses import dataclass
+from functools import lru_cache
 from telebot.types import (
     InlineKeyboardMarkup, ReplyKeyboardMarkup,
     InlineKeyboardButton, KeyboardButton, ReplyKeyboardRemove, WebAppInfo
 )
-from ...core.i18n import t as _
+from ...core.i18n import t as _, on_reload
 
 
 @dataclass
@@ -15,6 +16,7 @@ class InlineButton:
     url: Optional[str] = None
     web_app: WebAppInfo = None
     pay: bool = False
+    params: Optional[dict] = None  # tarjima matnidagi {placeholder} lar
 
 
 @dataclass
@@ -46,9 +48,10 @@ class SimpleKeyboard:
         """URL tugma"""
         return self.ib(text, url=url)
 
-    def data(self, text: str, data: str) -> 'SimpleKeyboard':
-        """Callback data tugma"""
-        return self.ib(text, data=data)
+    def data(self, text: str, data: str, **params) -> 'SimpleKeyboard':
+        """Callback data tugma (``params`` - tarjimaga qo'yiladigan qiymatlar)"""
+        self._current_inline_row.append(InlineButton(text, callback_data=data, params=params or None))
+        return self
 
     def web_app(self, text: str, web_app_url) -> 'SimpleKeyboard':
         """Web app tugma"""
@@ -114,7 +117,7 @@ class SimpleKeyboard:
         for row in self._inline_rows:
             buttons = []
             for btn in row:
-                text = _(btn.text, self.lang)
+                text = _(btn.text, self.lang, **(btn.params or {}))
 
                 if btn.callback_data:
                     buttons.append(InlineKeyboardButton(text, callback_data=btn.callback_data))
@@ -218,4 +221,20 @@ def quick_inline(buttons: List[List[tuple]], lang: str = "uz",
             else:
                 keyboard.data(text, data)
         keyboard.row()
-    return keyboard.inline(row_width=row_width)
\ No newline at end of file
+    return keyboard.inline(row_width=row_width)
+
+
+def cached_keyboard(maxsize: int = 128):
+    """
+    Faqat tilga va oddiy argumentlarga bog'liq keyboardlarni keshlash.
+
+    Markup yuborilganda o'zgartirilmaydi, shuning uchun bitta obyekt qayta
+    ishlatiladi; tarjimalar qayta yuklanganda kesh tozalanadi.
+    """
+
+    def decorator(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+        on_reload(cached.cache_clear)
+        return cached
+
+    return decorator
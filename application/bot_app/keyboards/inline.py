@@ -1,7 +1,8 @@
-from ..keyboards.base import kb
+from ..keyboards.base import kb, cached_keyboard
 from ...core.config import settings
 
 
+@cached_keyboard()
 def main_menu_inl(lang, status="online"):
     keyword = kb(lang)
 
@@ -9,10 +10,11 @@ def main_menu_inl(lang, status="online"):
     keyword.data("settings", "settings")
     keyword.data("balance", "balance").row()
     keyword.data("help", "help").row()
-    # if status == "online":
-    #     keyword.data("active_orders", "active_orders").row()
+    if status == "online":
+        keyword.data("active_orders", "active_orders").row()
     return keyword.inline()
 
+@cached_keyboard()
 def balance_inl(lang, balance=True):
     keyword = kb(lang)
     keyword.data("top_up_balance", "top_up_balance").row()
@@ -21,11 +23,13 @@ def balance_inl(lang, balance=True):
     return keyword.inline()
 
 
+@cached_keyboard()
 def register_driver_inl(lang):
     keyword = kb(lang)
     keyword.url("register", "https://t.me/gozdekyurbot").row()
     return keyword.inline()
 
+@cached_keyboard()
 def choice_balance_inl(lang):
     keyword = kb(lang)
     keyword.data("70,000", "sum_70")
@@ -36,12 +40,14 @@ def choice_balance_inl(lang):
     return keyword.inline()
 
 
+@cached_keyboard()
 def payment_inl(lang):
     keyword = kb(lang)
     keyword.pay("pay").row()
     keyword.data("back", "back_top").row()
     return keyword.inline()
 
+@cached_keyboard()
 def settings_inl(lang):
     keyword = kb(lang)
     keyword.data("direction", "direction").row()
@@ -49,6 +55,7 @@ def settings_inl(lang):
     keyword.data("back", "back").row()
     return keyword.inline()
 
+@cached_keyboard(maxsize=512)
 def confirm_order_inl(lang, order_id, travel=True):
     keyword = kb(lang)
     order_type = "travel" if travel else "delivery"
@@ -56,36 +63,87 @@ def confirm_order_inl(lang, order_id, travel=True):
     keyword.data("cancel", "cancel")
     return keyword.inline()
 
-def chat_inl(lang, order_id):
+def chat_inl(lang, order_id, bulk=None):
     keyword = kb(lang)
     frontend_url = settings.FRONTEND_URL
     url = f"{frontend_url}/chat/{order_id}/"
     # keyword.data("chat", "chat").row()
-    keyword.data("arrived", f"arrived_{order_id}")
+    keyword.data("arrived", f"arrived_{order_id}").row()
+    if bulk:
+        _bulk_button(keyword, "arrived", order_id, *bulk)
     return keyword.inline()
 
 
+@cached_keyboard()
 def back_inl(lang):
     keyword = kb(lang)
     keyword.data("back", "back").row()
     return keyword.inline()
 
+@cached_keyboard()
 def delete_inl(lang):
     keyword = kb(lang)
     keyword.data("delete_message", "delete").row()
     return keyword.inline()
 
-def picked_up_inl(lang, order_id):
+def picked_up_inl(lang, order_id, bulk=None):
     keyword = kb(lang)
     keyword.data("picked_up", f"picked_{order_id}").row()
+    if bulk:
+        _bulk_button(keyword, "picked", order_id, *bulk)
     return keyword.inline()
 
 
-def finish_inl(lang, order_id):
+def finish_inl(lang, order_id, bulk=None):
     keyword = kb(lang)
     keyword.data("finish", f"finished_{order_id}").row()
+    if bulk:
+        _bulk_button(keyword, "finished", order_id, *bulk)
     return keyword.inline()
 
+
+BULK_BUTTONS = {"arrived": "arrived_all", "picked": "picked_up_all", "finished": "finish_all"}
+
+
+def _bulk_button(keyword, action, order_id, count, city):
+    keyword.data(BULK_BUTTONS[action], f"bulk_{action}_{order_id}", count=count, city=city).row()
+
+
+def bulk_inl(lang, action, groups):
+    """Bir nechta buyurtma uchun keyingi qadam: har bir shahar guruhiga bitta tugma
+
+    ``groups`` - ``(order_id, count, city)`` ro'yxati
+    """
+    keyword = kb(lang)
+    for order_id, count, city in groups:
+        _bulk_button(keyword, action, order_id, count, city)
+    return keyword.inline()
+
+
+def active_orders_inl(lang, orders, page, pages):
+    """Lenta sahifasi: har bir buyurtmaga qabul qilish tugmasi va sahifalash"""
+    keyword = kb(lang)
+    for order in orders:
+        keyword.data("active_order_accept", f"accept_{order.order_type or 'travel'}_{order.order_id}",
+                     order_id=order.order_id, start_time=order.start_time).row()
+    if page > 0:
+        keyword.data("page_prev", f"active_orders_{page - 1}")
+    if page + 1 < pages:
+        keyword.data("page_next", f"active_orders_{page + 1}")
+    keyword.row()
+    keyword.data("back", "back").row()
+    return keyword.inline()
+
+
+def order_board_inl(lang, orders):
+    """Buyurtmalar doskasi: har bir buyurtmaga qabul qilish tugmasi (doska xabari tahrirlanmaydi)"""
+    keyword = kb(lang)
+    for order in orders:
+        keyword.data("active_order_accept", f"board_accept_{order.order_type or 'travel'}_{order.order_id}",
+                     order_id=order.order_id, start_time=order.start_time).row()
+    return keyword.inline()
+
+
 def phone_number_rb(lang: str):
     keyboard = kb(lang)
     keyboard.contact("get_phone_number")
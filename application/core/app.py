@@ -7,8 +7,15 @@ from contextlib import asynccontextmanager
 from application.core.config import settings
 from application.core.log import logger
 from application.database.cache import cache
-from application.core.i18n import init_translations
+from application.core.i18n import init_translations, translation_watcher
+from application.core.loop_monitor import loop_monitor
+from application.core.tracing import tracer, TracingMiddleware, instrument_bot_api, instrument_redis
 from application.api.routes import router
+from application.api.admin import admin_router
+from application.services.driver_status import status_writer
+from application.api.offers import offer_dispatcher
+from application.api.push import push_hub, push_router
+from application.core.scheduler import scheduler
 
 
 @asynccontextmanager
@@ -18,15 +25,35 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting application...")
 
     try:
+        # Event loop monitoring
+        if settings.LOOP_MONITOR_ENABLED:
+            await loop_monitor.start()
+
         # Connect to Redis
         await cache.connect()
 
+        # Tracing
+        if tracer.enabled:
+            instrument_bot_api()
+            instrument_redis(cache.client)
+            await tracer.start()
+
         # Initialize translations
         await init_translations(cache.client)
+        await translation_watcher.start(cache.client)
 
         # Setup bot handlers
         from application.bot_app.handler import setup_handlers
         await setup_handlers()
+
+        # Order offer fan-out
+        await offer_dispatcher.start(cache.client)
+
+        # Web app push connections
+        await push_hub.start(cache.client)
+
+        # Delayed jobs: offer waves/expiry/resends, driver status flushes
+        await scheduler.start()
         logger.info("✅ Application started successfully")
 
         yield
@@ -39,9 +66,19 @@ async def lifespan(app: FastAPI):
         # Shutdown
         logger.info("🛑 Shutting down application...")
 
+        # Drain running jobs, then flush pending driver statuses while Redis is still connected
+        await scheduler.stop()
+        await status_writer.stop()
+        await offer_dispatcher.stop()
+        await push_hub.stop()
+        await translation_watcher.stop()
+
         # Disconnect Redis
         await cache.disconnect()
 
+        await loop_monitor.stop()
+        await tracer.stop()
+
         logger.info("✅ Application stopped")
 
 
@@ -66,6 +103,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
 
 
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
+app.include_router(admin_router)
+app.include_router(push_router)
\ No newline at end of file
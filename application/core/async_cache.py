@@ -0,0 +1,131 @@
+# application/core/async_cache.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from application.core.metrics import metrics
+
+cache_requests_total = metrics.counter(
+    "async_cache_requests_total", "Async cache lookups by cache and result (hit, miss, shared)"
+)
+cache_evictions_total = metrics.counter("async_cache_evictions_total", "Entries evicted by the size bound")
+cache_size = metrics.gauge("async_cache_size", "Entries currently held")
+
+_MISSING = object()
+_KWARGS = object()  # positional va keyword argumentlarni ajratuvchi
+
+
+def make_key(args: Tuple, kwargs: Dict[str, Any]) -> Hashable:
+    """String formatlashsiz hashable kalit"""
+    if not kwargs:
+        return args
+    return args + (_KWARGS,) + tuple(sorted(kwargs.items()))
+
+
+class AsyncTTLCache:
+    """
+    LRU + TTL async cache.
+
+    ``maxsize`` dan oshganda eng eski ishlatilgan yozuv chiqariladi, har bir
+    yozuv ``ttl`` soniyadan keyin eskiradi. Bir kalit uchun bir vaqtdagi
+    miss'lar bitta loader chaqiruvini kutadi; loader xatosi keshlanmaydi.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: Optional[float] = None,
+                 cache_if: Optional[Callable[[Any], bool]] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache_if = cache_if
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires and expires < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl if ttl else 0.0, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            cache_evictions_total.inc(cache=self.name)
+        cache_size.set(len(self._data), cache=self.name)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Yozuvni va davom etayotgan yuklashni unutish"""
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._inflight.clear()
+        cache_size.set(0, cache=self.name)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            cache_requests_total.inc(cache=self.name, result="hit")
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            cache_requests_total.inc(cache=self.name, result="shared")
+        else:
+            cache_requests_total.inc(cache=self.name, result="miss")
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._loaded(k, t))
+        # Bitta chaqiruvchi bekor qilinsa ham yuklash boshqalar uchun davom etadi
+        return await asyncio.shield(task)
+
+    def _loaded(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is not task:
+            return  # invalidate() yuklash paytida chaqirilgan
+        del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        value = task.result()
+        if self.cache_if is None or self.cache_if(value):
+            self.set(key, value)
+
+
+def async_cached(maxsize: int = 1024, ttl: Optional[float] = None, key: Optional[Callable[..., Hashable]] = None,
+                 cache_if: Optional[Callable[[Any], bool]] = None, name: Optional[str] = None):
+    """
+    Async funksiya natijasini ``AsyncTTLCache`` da saqlash.
+
+    ``key`` argumentlardan kalit yasaydi (masalan metodlarda ``self`` ni
+    tashlab yuborish uchun); berilmasa barcha argumentlar ishlatiladi.
+    """
+
+    def decorator(func):
+        cache = AsyncTTLCache(name or func.__qualname__, maxsize=maxsize, ttl=ttl, cache_if=cache_if)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else make_key(args, kwargs)
+            return await cache.get_or_load(cache_key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,68 @@
+# application/core/codec.py
+
+import json
+from typing import Any, Callable, Optional, Union
+
+from application.core.config import settings
+from application.core.log import logger
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+JSONInput = Union[bytes, bytearray, memoryview, str]
+
+
+class StdlibCodec:
+    """json module codec; decodes bytes without a str round trip"""
+    name = "json"
+
+    @staticmethod
+    def loads(data: JSONInput) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any, default: Optional[Callable] = None) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+
+    @staticmethod
+    def dumps_str(obj: Any, default: Optional[Callable] = None) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+class OrjsonCodec:
+    """orjson codec, used when the package is installed"""
+    name = "orjson"
+
+    @staticmethod
+    def loads(data: JSONInput) -> Any:
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any, default: Optional[Callable] = None) -> bytes:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+    @staticmethod
+    def dumps_str(obj: Any, default: Optional[Callable] = None) -> str:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def get_codec(name: str = "auto"):
+    """Pick a codec by name: auto, orjson or json"""
+    if name in ("auto", "orjson") and orjson is not None:
+        return OrjsonCodec
+    if name == "orjson":
+        logger.warning("⚠️ JSON_CODEC=orjson but orjson is not installed, using json")
+    return StdlibCodec
+
+
+codec = get_codec(settings.JSON_CODEC)
+
+# Module level shortcuts
+loads = codec.loads
+dumps = codec.dumps
+dumps_str = codec.dumps_str
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError subclasses it
@@ -2,7 +2,7 @@
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -27,12 +27,15 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL_DEMO: str = "redis://localhost:6379/0"
     REDIS_URL_PROD: str = "redis://localhost:6379/1"
-    REDIS_MAX_CONNECTIONS: int = 10
+    REDIS_MAX_CONNECTIONS: int = 10  # handlerlar uchun; fon vazifalari ulanishlari REDIS_POOL_SIZE ga qo'shiladi
+    REDIS_POOL_TIMEOUT: float = 10.0  # pool to'lganda bo'sh ulanishni kutish
 
     # Localization
     LOCALES_PATH: str = "./locales"
     DEFAULT_LANGUAGE: str = "en"
     SUPPORTED_LANGUAGES: str = "en,uz,ru"
+    I18N_WATCH_FILES: bool = False
+    I18N_WATCH_INTERVAL: float = 2.0
     API_VERSION: str = "api/v1"
     AUTH_TOKEN: str
     API_HOST: str
@@ -41,6 +44,89 @@ class Settings(BaseSettings):
 
     # Admin
     ADMIN_IDS: str = ""
+    ADMIN_API_TOKEN: str = ""
+
+    # Serialization
+    JSON_CODEC: str = "auto"  # auto | orjson | json
+
+    # Time zone used when showing order times (UTC+5, Tashkent)
+    TIMEZONE_OFFSET_HOURS: float = 5
+
+    # Caches
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 60
+    CITY_CACHE_TTL: float = 300
+    DRIVER_CACHE_TTL: int = 300
+    DRIVER_LOCAL_CACHE_TTL: float = 5
+    DRIVER_LOCAL_CACHE_SIZE: int = 5000
+
+    # Driver status write-behind
+    STATUS_FLUSH_DELAY: float = 0.5
+    STATUS_FLUSH_RETRIES: int = 5
+    STATUS_PENDING_TTL: int = 60
+
+    # Driver session (bir vaqtda bir nechta buyurtma)
+    DRIVER_MAX_ACTIVE_ORDERS: int = 4
+    DRIVER_SESSION_TTL: int = 60 * 60 * 24
+
+    # Payments
+    PAYMENT_IDEMPOTENCY_TTL: int = 60 * 60 * 24 * 90  # Telegram redelivery'dan uzoqroq
+    PAYMENT_STALE_AFTER: int = 10 * 60  # shundan eski pending/posted - jarayon o'lgan, xato deb yoziladi
+    BALANCE_LOCK_TIMEOUT: int = 30  # har bir backend so'rovidan oldin yangilanadi
+    BALANCE_REQUEST_TIMEOUT: float = 10.0  # BALANCE_LOCK_TIMEOUT dan kichik - lock so'rov ichida tugamaydi
+
+    # Order offers
+    OFFER_QUEUE_WORKERS: int = 3
+    OFFER_QUEUE_BATCH_SIZE: int = 5
+    OFFER_CLOSED_TTL: int = 60 * 60  # yopilgan buyurtma belgisi qancha saqlanadi
+    OFFER_REGISTRY_TTL: int = 60 * 60 * 24
+    OFFER_EXPIRE_AFTER: int = 60 * 30  # shuncha vaqt hech kim olmasa takliflar qaytarib olinadi
+    OFFER_RETRACT_INTERVAL: float = 0.5
+    OFFER_RETRACT_RATE: int = 20  # soniyasiga tahrirlar (Telegram limiti ~30)
+    # Tarif bo'yicha to'lqinlar: {"<tariff_id>" | "default": {"size", "interval", "max_waves"}}
+    OFFER_WAVES: Dict[str, Dict[str, float]] = {"default": {"size": 20, "interval": 10, "max_waves": 4}}
+    # "messages" - har bir buyurtma alohida xabar; "board" - haydovchiga bitta qadalgan doska
+    OFFER_DELIVERY: str = "messages"
+
+    # Buyurtmalar doskasi (OFFER_DELIVERY = "board")
+    ORDER_BOARD_SIZE: int = 5
+    ORDER_BOARD_INTERVAL: float = 5.0  # haydovchiga shu vaqtda ko'pi bilan bitta tahrir; OPEN_ORDERS_CACHE_TTL dan katta
+    ORDER_BOARD_TTL: int = 60 * 60 * 24
+
+    # Ochiq buyurtmalar lentasi ("Faol buyurtmalar")
+    OPEN_ORDERS_PAGE_SIZE: int = 5
+    OPEN_ORDERS_TTL: int = 60 * 60 * 24
+    OPEN_ORDERS_START_GRACE: int = 60 * 60  # boshlanish vaqtidan shuncha o'tgach ko'rsatilmaydi
+    OPEN_ORDERS_CACHE_TTL: float = 3.0
+
+    # Web app push (WebSocket / SSE)
+    PUSH_QUEUE_SIZE: int = 100  # ulanish navbati; to'lsa hodisalar tashlab yuboriladi
+    PUSH_HEARTBEAT: float = 25.0
+    PUSH_AUTH_CACHE_TTL: float = 60 * 60
+    PUSH_INIT_DATA_MAX_AGE: int = 60 * 60 * 24
+
+    # Delayed jobs (Redis ZSET + timing wheel)
+    SCHEDULER_POLL_INTERVAL: float = 1.0  # boshqa jarayonlar qo'shgan ishlarni tekshirish
+    SCHEDULER_BATCH_SIZE: int = 50
+    SCHEDULER_LEASE: float = 30.0  # shu vaqtda tugamagan ish qayta olinadi
+    SCHEDULER_CONCURRENCY: int = 20
+    SCHEDULER_MAX_ATTEMPTS: int = 5
+    SCHEDULER_DRAIN_TIMEOUT: float = 10.0
+    SCHEDULER_WHEEL_TICK: float = 0.05
+    SCHEDULER_WHEEL_SLOTS: int = 512
+
+    # Monitoring
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL: float = 0.5
+    SLOW_CALLBACK_THRESHOLD: float = 0.1
+
+    # Tracing
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "file"  # file | otlp
+    TRACING_FILE_PATH: str = "./traces/spans.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318"
+    TRACING_SAMPLE_RATE: float = 1.0
+    TRACING_SERVICE_NAME: str = "driver-bot"
 
     WEBHOOK_URL_DEMO: str = "http://127.0.0.1:8000"
     WEBHOOK_URL_PROD: str = "http://127.0.0.1:8000"
@@ -68,6 +154,12 @@ class Settings(BaseSettings):
             return []
         return [int(uid.strip()) for uid in self.ADMIN_IDS.split(',') if uid.strip()]
 
+    @property
+    def REDIS_POOL_SIZE(self) -> int:
+        """Redis pool: pub/sub tinglovchilar (offers, push, i18n) + scheduler + offer worker'lari + handlerlar"""
+        return (3 + self.SCHEDULER_CONCURRENCY + 1 + self.OFFER_QUEUE_WORKERS * self.OFFER_QUEUE_BATCH_SIZE
+                + self.REDIS_MAX_CONNECTIONS)
+
     @property
     def WEBHOOK_URL(self) -> str:
         """Get webhook url based on DEBUG mode"""
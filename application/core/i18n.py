@@ -1,8 +1,9 @@
 # application/core/i18n.py
 
+import asyncio
 import json
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 import redis.asyncio as redis
 from application.core.config import settings
 from application.core.log import logger
@@ -13,77 +14,229 @@ _translations: Dict[str, Dict[str, str]] = {}
 # Reverse lookup cache for slug detection
 _reverse_lookup: Dict[str, Dict[str, str]] = {}
 
+# Redis keys for cross-worker reloads
+VERSION_KEY = "i18n:version"
+RELOAD_CHANNEL = "i18n:reload"
+
+# Local translations version (Redis ``i18n:version`` bilan solishtiriladi)
+_version: int = 0
+
+# Reloaddan keyin chaqiriladigan funksiyalar (keshlangan keyboardlar va h.k.)
+_reload_listeners: List[Callable[[], None]] = []
+
+
+def _read_locale_files() -> Dict[str, Dict[str, str]]:
+    """Read and flatten ``locales/*.json`` (blocking, run in a thread on reload)"""
+    locales_path = Path(settings.LOCALES_PATH)
+
+    if not locales_path.exists():
+        logger.warning(f"⚠️ Locales path not found: {locales_path}")
+        return {}
+
+    # Get all JSON files
+    json_files = list(locales_path.glob("*.json"))
+
+    if not json_files:
+        logger.warning(f"⚠️ No translation files found in {locales_path}")
+        return {}
+
+    loaded = {}
+    for file in json_files:
+        lang = file.stem
+
+        # Skip unsupported languages
+        if lang not in settings.SUPPORTED_LANGS:
+            logger.debug(f"Skipping unsupported language: {lang}")
+            continue
+
+        try:
+            # Load translations from file
+            with open(file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if not data:
+                logger.warning(f"⚠️ Empty translation file: {file}")
+                continue
+
+            # Flatten nested dict for Redis
+            loaded[lang] = _flatten_dict(data)
+            logger.info(f"📦 Loaded {len(loaded[lang])} translations for '{lang}'")
+
+        except json.JSONDecodeError as e:
+            logger.error(f"❌ Invalid JSON in {file}: {e}")
+        except Exception as e:
+            logger.error(f"❌ Error loading {file}: {e}")
+
+    return loaded
+
+
+def _swap(loaded: Dict[str, Dict[str, str]], version: Optional[int] = None) -> None:
+    """Replace the in-memory tables in one step and notify listeners"""
+    global _translations, _reverse_lookup, _version
+
+    if not loaded:
+        return
+
+    # Yangi lug'atlar to'liq tayyorlanadi, keyin bir vaqtda almashtiriladi
+    translations = {**_translations, **loaded}
+    reverse_lookup = {lang: {v: k for k, v in data.items()} for lang, data in translations.items()}
+    _translations, _reverse_lookup = translations, reverse_lookup
+    if version is not None:
+        _version = version
+
+    for listener in list(_reload_listeners):
+        try:
+            listener()
+        except Exception as e:
+            logger.error(f"❌ Translation reload listener failed: {e}")
+
+
+def on_reload(func: Callable[[], None]) -> Callable[[], None]:
+    """Register a callback run after every translation swap"""
+    _reload_listeners.append(func)
+    return func
+
+
+def _store_pipeline(redis_client: redis.Redis, loaded: Dict[str, Dict[str, str]]):
+    pipe = redis_client.pipeline()
+    for lang, flat_data in loaded.items():
+        redis_key = f"i18n:{lang}"
+        pipe.delete(redis_key)
+        pipe.hset(redis_key, mapping=flat_data)
+    return pipe
+
+
 async def init_translations(redis_client: redis.Redis) -> None:
     """
     Initialize translations from JSON files to cache and Redis
     Args:
         redis_client: Redis client instance
     """
-    global _translations, _reverse_lookup
-
     try:
-        locales_path = Path(settings.LOCALES_PATH)
-
-        if not locales_path.exists():
-            logger.warning(f"⚠️ Locales path not found: {locales_path}")
+        loaded = _read_locale_files()
+        if not loaded:
             return
 
-        # Get all JSON files
-        json_files = list(locales_path.glob("*.json"))
+        # Store in memory cache (primary)
+        _swap(loaded, version=int(await redis_client.get(VERSION_KEY) or 0))
 
-        if not json_files:
-            logger.warning(f"⚠️ No translation files found in {locales_path}")
-            return
+        # Store in Redis (backup/sync)
+        await _store_pipeline(redis_client, loaded).execute()
+
+        logger.info(f"✅ Initialized {len(_translations)} languages: {list(_translations.keys())}")
+
+    except Exception as e:
+        logger.error(f"❌ Critical error initializing translations: {e}")
+        raise
 
-        # Use pipeline for batch Redis operations
-        pipe = redis_client.pipeline()
 
-        for file in json_files:
-            lang = file.stem
+async def reload_translations(redis_client: redis.Redis) -> int:
+    """
+    Re-read locale files, swap them in and tell other workers.
 
-            # Skip unsupported languages
-            if lang not in settings.SUPPORTED_LANGS:
-                logger.debug(f"Skipping unsupported language: {lang}")
-                continue
+    Fayllar thread'da o'qiladi, Redis hashlar yangilanadi, ``i18n:version``
+    oshiriladi va pub/sub orqali e'lon qilinadi. Yangi versiyani qaytaradi.
+    """
+    loaded = await asyncio.to_thread(_read_locale_files)
+    if not loaded:
+        logger.warning("⚠️ Translation reload skipped: nothing loaded")
+        return _version
 
-            try:
-                # Load translations from file
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+    pipe = _store_pipeline(redis_client, loaded)
+    pipe.incr(VERSION_KEY)
+    version = (await pipe.execute())[-1]
+
+    _swap(loaded, version=version)
+    await redis_client.publish(RELOAD_CHANNEL, version)
+    logger.info(f"🔄 Translations reloaded, version {version}")
+    return version
 
-                if not data:
-                    logger.warning(f"⚠️ Empty translation file: {file}")
-                    continue
 
-                # Flatten nested dict for Redis
-                flat_data = _flatten_dict(data)
+async def pull_translations(redis_client: redis.Redis) -> int:
+    """Load the ``i18n:{lang}`` hashes published by another worker"""
+    langs = list(settings.SUPPORTED_LANGS)
+    pipe = redis_client.pipeline()
+    pipe.get(VERSION_KEY)
+    for lang in langs:
+        pipe.hgetall(f"i18n:{lang}")
+    version, *hashes = await pipe.execute()
 
-                # Store in memory cache (primary)
-                _translations[lang] = flat_data
+    _swap({lang: data for lang, data in zip(langs, hashes) if data}, version=int(version or 0))
+    logger.info(f"🔄 Translations pulled from Redis, version {_version}")
+    return _version
 
-                # Build reverse lookup for this language
-                _reverse_lookup[lang] = {v: k for k, v in flat_data.items()}
 
-                # Store in Redis (backup/sync)
-                redis_key = f"i18n:{lang}"
-                pipe.delete(redis_key)
-                pipe.hset(redis_key, mapping=flat_data)
+def get_version() -> int:
+    return _version
 
-                logger.info(f"📦 Loaded {len(flat_data)} translations for '{lang}'")
 
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ Invalid JSON in {file}: {e}")
+class TranslationWatcher:
+    """
+    Background reloads.
+
+    Redis ``i18n:reload`` kanalini tinglaydi (boshqa worker yangilasa hashlarni
+    tortib oladi) va ``I18N_WATCH_FILES`` yoqilgan bo'lsa locale fayllarning
+    mtime'ini kuzatib, o'zgarganda ``reload_translations`` ni chaqiradi.
+    """
+
+    def __init__(self, watch_files: bool = settings.I18N_WATCH_FILES,
+                 interval: float = settings.I18N_WATCH_INTERVAL):
+        self.watch_files = watch_files
+        self.interval = interval
+        self._tasks: List[asyncio.Task] = []
+        self._mtimes: Dict[str, float] = {}
+
+    async def start(self, redis_client: redis.Redis) -> None:
+        if self._tasks:
+            return
+        self._mtimes = self._scan()
+        self._tasks.append(asyncio.create_task(self._listen(redis_client), name="i18n-listener"))
+        if self.watch_files:
+            self._tasks.append(asyncio.create_task(self._poll(redis_client), name="i18n-file-watcher"))
+        logger.info(f"✅ Translation watcher started (files: {self.watch_files})")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def _scan(self) -> Dict[str, float]:
+        return {str(f): f.stat().st_mtime for f in Path(settings.LOCALES_PATH).glob("*.json")}
+
+    async def _poll(self, redis_client: redis.Redis) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                mtimes = await asyncio.to_thread(self._scan)
+                if mtimes != self._mtimes:
+                    self._mtimes = mtimes
+                    await reload_translations(redis_client)
             except Exception as e:
-                logger.error(f"❌ Error loading {file}: {e}")
+                logger.error(f"❌ Translation file watch failed: {e}")
 
-        # Execute all Redis operations
-        await pipe.execute()
+    async def _listen(self, redis_client: redis.Redis) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(RELOAD_CHANNEL)
+                # Obuna bo'lguncha o'tkazib yuborilgan versiyani ham olish
+                if int(await redis_client.get(VERSION_KEY) or 0) > _version:
+                    await pull_translations(redis_client)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message" and int(message["data"]) > _version:
+                        await pull_translations(redis_client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Translation reload listener error: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
 
-        logger.info(f"✅ Initialized {len(_translations)} languages: {list(_translations.keys())}")
 
-    except Exception as e:
-        logger.error(f"❌ Critical error initializing translations: {e}")
-        raise
+# Singleton instance
+translation_watcher = TranslationWatcher()
 
 
 def detect_slug(text: str, lang: Optional[str] = None, threshold: float = 0.8) -> Optional[str]:
@@ -0,0 +1,92 @@
+# application/core/i18n_bundle.py
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from application.core import codec
+from application.core.i18n import get_available_languages, get_slugs_by_pattern, get_version, on_reload
+from application.core.log import logger
+
+
+@dataclass(frozen=True, slots=True)
+class Bundle:
+    body: bytes  # JSON
+    gzipped: bytes
+    etag: str
+
+    @classmethod
+    def build(cls, lang: str, prefix: str = "") -> Optional['Bundle']:
+        """``prefix`` ga mos kalit bo'lmasa None"""
+        translations = get_slugs_by_pattern("", lang)
+        if prefix:
+            translations = {key: value for key, value in translations.items() if key.startswith(prefix)}
+            if not translations:
+                return None
+        body = codec.dumps({"lang": lang, "version": get_version(), "translations": translations})
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        # To'liq bundle reloadda bir marta siqiladi; prefix'lilari so'rov ichida - arzonroq daraja
+        gzipped = gzip.compress(body, compresslevel=6 if prefix else 9, mtime=0)
+        return cls(body=body, gzipped=gzipped, etag=f'W/"{digest}"')
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """``If-None-Match``: vergul bilan ajratilgan ETag ro'yxati yoki ``*`` (kuchsiz taqqoslash)"""
+        if not if_none_match:
+            return False
+        opaque = self.etag.removeprefix("W/")
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or candidate.removeprefix("W/") == opaque:
+                return True
+        return False
+
+
+class TranslationBundles:
+    """
+    Web app uchun butun til bo'yicha tarjimalar.
+
+    To'liq bundle'lar faqat tarjimalar yuklanganda (``on_reload`` ->
+    ``rebuild``) bir marta JSON va gzip ko'rinishida tayyorlanadi va alohida
+    saqlanadi. ``prefix`` bilan so'ralganlari birinchi so'rovda yasalib,
+    keyingi reloadgacha o'z LRU'sida turadi (ko'pi bilan ``maxsize`` ta) -
+    ular to'liq bundle'larni siqib chiqarmaydi. Hech bir kalitga mos
+    kelmagan prefix keshlanmaydi.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._full: Dict[str, Bundle] = {}
+        self._prefixed: "OrderedDict[Tuple[str, str], Bundle]" = OrderedDict()
+
+    def get(self, lang: str, prefix: str = "") -> Optional[Bundle]:
+        if not prefix:
+            return self._full.get(lang)
+
+        key = (lang, prefix)
+        bundle = self._prefixed.get(key)
+        if bundle is not None:
+            self._prefixed.move_to_end(key)
+            return bundle
+        if lang not in self._full:
+            return None
+        bundle = Bundle.build(lang, prefix)
+        if bundle is None:
+            return None
+        self._prefixed[key] = bundle
+        while len(self._prefixed) > self.maxsize:
+            self._prefixed.popitem(last=False)
+        return bundle
+
+    def rebuild(self) -> None:
+        """Eski bundle'larni tashlab, to'liqlarini qayta tayyorlash"""
+        self._prefixed.clear()
+        self._full = {lang: Bundle.build(lang) for lang in get_available_languages()}
+        logger.debug(f"Translation bundles rebuilt, version {get_version()}")
+
+
+# Singleton instance
+translation_bundles = TranslationBundles()
+on_reload(translation_bundles.rebuild)
+translation_bundles.rebuild()  # tarjimalar bu moduldan oldin yuklangan bo'lsa
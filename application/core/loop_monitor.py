@@ -0,0 +1,148 @@
+# application/core/loop_monitor.py
+
+import asyncio
+import asyncio.events
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Optional
+
+from application.core.config import settings
+from application.core.log import logger
+from application.core.metrics import metrics
+
+# Name of the handler currently running in this task (set by HandlerMaster)
+current_step: ContextVar[Optional[str]] = ContextVar("current_step", default=None)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+loop_lag_seconds = metrics.gauge("event_loop_lag_seconds", "Last measured event loop lag")
+loop_lag_histogram = metrics.histogram("event_loop_lag", "Event loop lag distribution", buckets=LAG_BUCKETS)
+slow_callbacks_total = metrics.counter("event_loop_slow_callbacks_total", "Callbacks that blocked the loop")
+slow_callback_seconds = metrics.histogram(
+    "event_loop_slow_callback_seconds", "Duration of slow callbacks", buckets=LAG_BUCKETS
+)
+
+
+def describe_handle(handle: asyncio.Handle) -> str:
+    """Human readable name of what a loop handle runs"""
+    callback = handle._callback
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return getattr(coro, "__qualname__", None) or repr(coro)
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class LoopMonitor:
+    """
+    Event loop lag sampler and slow callback detector.
+
+    The lag sampler sleeps for a fixed interval and measures how late it
+    wakes up. The slow callback detector times every ``Handle._run`` and
+    records the coroutine and handler name when a single step exceeds
+    the threshold. Only the default asyncio loop is instrumented.
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1, history: int = 100):
+        self.interval = interval
+        self.threshold = threshold
+        self.slow_callbacks: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.last_lag: float = 0.0
+        self.max_lag: float = 0.0
+        self.samples: int = 0
+        self._task: Optional[asyncio.Task] = None
+        self._original_run = None
+
+    async def start(self) -> None:
+        """Start the lag sampler and install the slow callback hook"""
+        if self._task is not None:
+            return
+        self._install_hook()
+        self._task = asyncio.create_task(self._sample_lag(), name="loop-lag-sampler")
+        logger.info(
+            f"📈 Loop monitor started (interval={self.interval}s, threshold={self.threshold}s)"
+        )
+
+    async def stop(self) -> None:
+        """Stop sampling and restore the original handle runner"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._uninstall_hook()
+
+    async def _sample_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.samples += 1
+            loop_lag_seconds.set(lag)
+            loop_lag_histogram.observe(lag)
+            if lag >= self.threshold:
+                logger.warning(f"🐢 Event loop lag {lag * 1000:.1f}ms")
+
+    def _install_hook(self) -> None:
+        if self._original_run is not None:
+            return
+
+        original_run = asyncio.events.Handle._run
+        monitor = self
+
+        def _run(handle: asyncio.Handle):
+            started = time.perf_counter()
+            try:
+                return original_run(handle)
+            finally:
+                duration = time.perf_counter() - started
+                if duration >= monitor.threshold:
+                    monitor._record_slow(handle, duration)
+
+        self._original_run = original_run
+        asyncio.events.Handle._run = _run
+
+    def _uninstall_hook(self) -> None:
+        if self._original_run is not None:
+            asyncio.events.Handle._run = self._original_run
+            self._original_run = None
+
+    def _record_slow(self, handle: asyncio.Handle, duration: float) -> None:
+        try:
+            name = describe_handle(handle)
+            context = getattr(handle, "_context", None)
+            step = context.get(current_step) if context is not None else None
+        except Exception:
+            name, step = "<unknown>", None
+
+        self.slow_callbacks.append({
+            "name": name,
+            "step": step,
+            "duration_ms": round(duration * 1000, 2),
+            "at": time.time(),
+        })
+        slow_callbacks_total.inc(name=step or name)
+        slow_callback_seconds.observe(duration, name=step or name)
+        logger.warning(f"🐢 Slow callback {name} (step={step}) took {duration * 1000:.1f}ms")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state for the admin endpoint"""
+        return {
+            "running": self._task is not None,
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "samples": self.samples,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "slow_callbacks": list(self.slow_callbacks),
+        }
+
+
+# Singleton instance
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_LAG_INTERVAL,
+    threshold=settings.SLOW_CALLBACK_THRESHOLD,
+)
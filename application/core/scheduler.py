@@ -0,0 +1,354 @@
+# application/core/scheduler.py
+
+import asyncio
+import math
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from application.core import codec
+from application.core.config import settings
+from application.core.log import logger
+from application.core.metrics import metrics
+from application.database.cache import cache
+
+DUE_KEY = "scheduler:due"  # zset: job_id -> run_at (epoch seconds)
+JOBS_KEY = "scheduler:jobs"  # hash: job_id -> job JSON
+DONE_KEY = "scheduler:done:{}"  # completed idempotency keys (only with done_ttl)
+
+# KEYS: due, jobs, done; ARGV: id, job, run_at, replace
+_SCHEDULE = """
+if ARGV[4] ~= '1' then
+    if redis.call('exists', KEYS[3]) == 1 or redis.call('hexists', KEYS[2], ARGV[1]) == 1 then
+        return 0
+    end
+end
+redis.call('hset', KEYS[2], ARGV[1], ARGV[2])
+redis.call('zadd', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+# KEYS: due, jobs; ARGV: now, limit, lease_until
+# Due jobs are pushed forward by the lease instead of removed: a worker that
+# dies mid-job leaves it to be claimed again (at-least-once).
+_CLAIM = """
+local ids = redis.call('zrangebyscore', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local claimed = {}
+for _, id in ipairs(ids) do
+    local job = redis.call('hget', KEYS[2], id)
+    if job then
+        redis.call('zadd', KEYS[1], ARGV[3], id)
+        table.insert(claimed, id)
+        table.insert(claimed, job)
+    else
+        redis.call('zrem', KEYS[1], id)
+    end
+end
+return claimed
+"""
+
+# KEYS: due, jobs, done; ARGV: id, claimed job, done_ttl
+# Only if the job was not replaced while it ran.
+_COMPLETE = """
+if redis.call('hget', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('hdel', KEYS[2], ARGV[1])
+redis.call('zrem', KEYS[1], ARGV[1])
+if tonumber(ARGV[3]) > 0 then
+    redis.call('set', KEYS[3], 1, 'EX', ARGV[3])
+end
+return 1
+"""
+
+# KEYS: due, jobs; ARGV: id, claimed job, new job, run_at
+_RESCHEDULE = """
+if redis.call('hget', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('hset', KEYS[2], ARGV[1], ARGV[3])
+redis.call('zadd', KEYS[1], ARGV[4], ARGV[1])
+return 1
+"""
+
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+scheduler_jobs_total = metrics.counter(
+    "scheduler_jobs_total", "Scheduled jobs by name and result (ok, rescheduled, retried, failed, unknown)"
+)
+scheduler_lag_seconds = metrics.histogram(
+    "scheduler_lag_seconds", "Delay between a job's due time and its start", buckets=LAG_BUCKETS
+)
+scheduler_inflight = metrics.gauge("scheduler_inflight", "Jobs currently running in this process")
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[float]]]
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel.
+
+    ``add`` and ``discard`` are O(1): an item goes into the slot its deadline
+    falls in, with a round counter for deadlines further away than one
+    revolution (``tick * slots`` seconds). ``advance`` walks the slots that
+    passed since the last call and returns the items that became due.
+    """
+
+    def __init__(self, tick: float = 0.05, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._position = 0
+        # Tick n ends at origin + n * tick: counted, not summed, so float error doesn't build up
+        self._origin = time.monotonic()
+        self._ticks = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def _tick_at(self, moment: float) -> float:
+        return (moment - self._origin) / self.tick
+
+    def add(self, delay: float, item: Hashable) -> None:
+        self.discard(item)
+        # Relative to the wheel's clock, which lags behind while the wheel sits idle
+        due = math.ceil(self._tick_at(time.monotonic() + max(0.0, delay)) - 1e-9)
+        ticks = max(1, due - self._ticks)
+        slot = (self._position + ticks) % self.slots
+        self._wheel[slot][item] = (ticks - 1) // self.slots
+        self._slot_of[item] = slot
+
+    def discard(self, item: Hashable) -> None:
+        slot = self._slot_of.pop(item, None)
+        if slot is not None:
+            self._wheel[slot].pop(item, None)
+
+    def advance(self, now: Optional[float] = None) -> List[Hashable]:
+        now = time.monotonic() if now is None else now
+        target = math.floor(self._tick_at(now) + 1e-9)
+        due = []
+        if not self._slot_of:
+            # Nothing to walk: jump straight to the present
+            self._ticks = max(self._ticks, target)
+            return due
+        while self._ticks < target:
+            self._ticks += 1
+            self._position = (self._position + 1) % self.slots
+            bucket = self._wheel[self._position]
+            for item, rounds in list(bucket.items()):
+                if rounds == 0:
+                    del bucket[item]
+                    del self._slot_of[item]
+                    due.append(item)
+                else:
+                    bucket[item] = rounds - 1
+        return due
+
+    def next_delay(self) -> Optional[float]:
+        """Seconds until the next slot that holds an item due this revolution"""
+        if not self._slot_of:
+            return None
+        for step in range(1, self.slots + 1):
+            bucket = self._wheel[(self._position + step) % self.slots]
+            if any(rounds == 0 for rounds in bucket.values()):
+                return max(0.0, self._origin + (self._ticks + step) * self.tick - time.monotonic())
+        return self.tick * self.slots
+
+
+class Scheduler:
+    """
+    Delayed jobs that survive restarts and run on any worker.
+
+    Jobs live in Redis: a ZSET orders them by due time and a hash holds
+    their JSON. ``schedule`` takes an idempotency ``key``: while a job with
+    that key is pending, scheduling it again is a no-op (``replace=True``
+    moves it instead), and with ``done_ttl`` a completed key is remembered
+    for that long. Workers claim due jobs atomically in Lua, which pushes
+    them forward by ``lease`` seconds; a job is removed only after its
+    handler returns, so a crash means it runs again (at-least-once).
+    Handlers must therefore be idempotent. A handler may return a delay
+    in seconds to run again later; an exception retries with backoff.
+
+    Jobs scheduled from this process also go into an in-process timing
+    wheel, so they are claimed on time instead of on the next poll.
+    """
+
+    def __init__(self, poll_interval: float = settings.SCHEDULER_POLL_INTERVAL,
+                 batch_size: int = settings.SCHEDULER_BATCH_SIZE, lease: float = settings.SCHEDULER_LEASE,
+                 concurrency: int = settings.SCHEDULER_CONCURRENCY, max_attempts: int = settings.SCHEDULER_MAX_ATTEMPTS,
+                 drain_timeout: float = settings.SCHEDULER_DRAIN_TIMEOUT,
+                 tick: float = settings.SCHEDULER_WHEEL_TICK, slots: int = settings.SCHEDULER_WHEEL_SLOTS):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.drain_timeout = drain_timeout
+        self.wheel = TimingWheel(tick, slots)
+        self._handlers: Dict[str, JobHandler] = {}
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._running: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._due_now = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # ==================== REGISTRATION ====================
+
+    def job(self, name: str):
+        """Register the handler for jobs called ``name``"""
+
+        def decorator(func: JobHandler) -> JobHandler:
+            self._handlers[name] = func
+            return func
+
+        return decorator
+
+    # ==================== SCHEDULING ====================
+
+    async def schedule(self, name: str, payload: Dict[str, Any], delay: float = 0.0, key: Optional[str] = None,
+                       replace: bool = False, done_ttl: int = 0) -> bool:
+        """Schedule ``name(payload)`` in ``delay`` seconds; False if ``key`` is already pending or done"""
+        job_id = key or uuid.uuid4().hex
+        run_at = time.time() + delay
+        job = codec.dumps_str({"name": name, "payload": payload, "attempts": 0, "done_ttl": done_ttl,
+                               "run_at": run_at, "token": uuid.uuid4().hex})
+        added = await cache.client.eval(
+            _SCHEDULE, 3, DUE_KEY, JOBS_KEY, DONE_KEY.format(job_id),
+            job_id, job, run_at, "1" if replace else "0",
+        )
+        if added:
+            if delay <= 0:
+                self._due_now = True
+            else:
+                self.wheel.add(delay, job_id)
+            self._wake.set()  # the loop may be sleeping past this deadline
+        return bool(added)
+
+    async def cancel(self, key: str) -> None:
+        self.wheel.discard(key)
+        pipe = cache.client.pipeline(transaction=True)
+        pipe.zrem(DUE_KEY, key)
+        pipe.hdel(JOBS_KEY, key)
+        await pipe.execute()
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="scheduler")
+            logger.info(f"⏰ Scheduler started ({len(self._handlers)} job types)")
+
+    async def stop(self) -> None:
+        """Stop claiming and give running jobs ``drain_timeout`` seconds to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._running:
+            done, pending = await asyncio.wait(set(self._running), timeout=self.drain_timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                # Their leases expire and another worker picks them up
+                logger.warning(f"⚠️ Scheduler stopped with {len(pending)} jobs unfinished")
+
+    async def _run(self) -> None:
+        next_poll = 0.0
+        while True:
+            now = time.monotonic()
+            woke = self.wheel.advance(now)
+            self._wake.clear()
+            if woke or now >= next_poll or self._due_now:
+                self._due_now = False
+                next_poll = now + self.poll_interval
+                try:
+                    while await self._claim_batch() >= self.batch_size:
+                        pass  # backlog: keep claiming
+                except Exception as e:
+                    logger.error(f"❌ Scheduler claim failed: {e}")
+
+            delay = next_poll - time.monotonic()
+            wheel_delay = self.wheel.next_delay()
+            if wheel_delay is not None:
+                delay = min(delay, wheel_delay)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, delay))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim_batch(self) -> int:
+        # Claim no more than we can start right away, the rest stays for other workers
+        limit = min(self.batch_size, max(1, self.concurrency - len(self._running)))
+        claimed = await cache.client.eval(_CLAIM, 2, DUE_KEY, JOBS_KEY, time.time(), limit, time.time() + self.lease)
+        for job_id, raw in zip(claimed[::2], claimed[1::2]):
+            self.wheel.discard(job_id)
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._execute(job_id, raw), name=f"job-{job_id}")
+            self._running.add(task)
+            scheduler_inflight.set(len(self._running))
+            task.add_done_callback(self._finished)
+        return len(claimed) // 2
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._semaphore.release()
+        scheduler_inflight.set(len(self._running))
+
+    # ==================== EXECUTION ====================
+
+    async def _execute(self, job_id: str, raw: str) -> None:
+        job = codec.loads(raw)
+        name = job["name"]
+        scheduler_lag_seconds.observe(max(0.0, time.time() - job.get("run_at", time.time())))
+        handler = self._handlers.get(name)
+        if handler is None:
+            # Another release may know it; try again later instead of dropping
+            scheduler_jobs_total.inc(name=name, result="unknown")
+            logger.warning(f"⚠️ No handler for job '{name}' ({job_id})")
+            await self._reschedule(job_id, raw, job, self.lease)
+            return
+
+        try:
+            again = await handler(job["payload"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job["attempts"] += 1
+            if job["attempts"] >= self.max_attempts:
+                scheduler_jobs_total.inc(name=name, result="failed")
+                logger.error(f"❌ Job '{name}' ({job_id}) dropped after {job['attempts']} attempts: {e}")
+                await self._complete(job_id, raw, job)
+            else:
+                scheduler_jobs_total.inc(name=name, result="retried")
+                logger.warning(f"⚠️ Job '{name}' ({job_id}) failed, retrying: {e}")
+                await self._reschedule(job_id, raw, job, min(60.0, 2 ** job["attempts"]))
+            return
+
+        if again is not None:
+            scheduler_jobs_total.inc(name=name, result="rescheduled")
+            job["attempts"] = 0
+            await self._reschedule(job_id, raw, job, float(again))
+        else:
+            scheduler_jobs_total.inc(name=name, result="ok")
+            await self._complete(job_id, raw, job)
+
+    async def _complete(self, job_id: str, raw: str, job: Dict[str, Any]) -> None:
+        await cache.client.eval(_COMPLETE, 3, DUE_KEY, JOBS_KEY, DONE_KEY.format(job_id),
+                                job_id, raw, job.get("done_ttl", 0))
+
+    async def _reschedule(self, job_id: str, raw: str, job: Dict[str, Any], delay: float) -> None:
+        job["token"] = uuid.uuid4().hex
+        job["run_at"] = time.time() + delay
+        await cache.client.eval(_RESCHEDULE, 2, DUE_KEY, JOBS_KEY, job_id, raw, codec.dumps_str(job), job["run_at"])
+        self.wheel.add(delay, job_id)
+        self._wake.set()
+
+
+# Singleton instance
+scheduler = Scheduler()
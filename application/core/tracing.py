@@ -0,0 +1,366 @@
+# application/core/tracing.py
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Deque, Dict, List, Optional
+
+from application.core.config import settings
+from application.core.log import logger
+from application.core.metrics import metrics
+
+spans_dropped_total = metrics.counter("tracing_spans_dropped_total", "Spans dropped because the buffer was full")
+spans_exported_total = metrics.counter("tracing_spans_exported_total", "Spans handed to the exporter")
+
+
+class Span:
+    """Single timed operation inside a trace"""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns",
+                 "attributes", "error", "sampled", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool,
+                 kind: int = 1, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _random_hex(16)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc_val is not None and not isinstance(exc_val, asyncio.CancelledError):
+            self.error = f"{exc_type.__name__}: {exc_val}"
+        _current_span.reset(self._token)
+        if self.sampled:
+            tracer.record(self)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        return data
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled"""
+    __slots__ = ()
+
+    trace_id = None
+    traceparent = None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+_NOOP = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+
+
+def _random_hex(length: int) -> str:
+    return f"{random.getrandbits(length * 4):0{length}x}"
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the update or request being processed"""
+    active = _current_span.get()
+    return active.trace_id if active else None
+
+
+def span(name: str, kind: int = INTERNAL, traceparent: Optional[str] = None, **attributes):
+    """
+    Start a child span of the current one (or a new trace).
+
+    Usage:
+        with span("backend GET", url=url) as s:
+            ...
+    """
+    if not tracer.enabled:
+        return _NOOP
+
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, parent.sampled, kind, attributes)
+
+    if traceparent:
+        parsed = _parse_traceparent(traceparent)
+        if parsed:
+            trace_id, parent_id, sampled = parsed
+            return Span(name, trace_id, parent_id, sampled, kind, attributes)
+
+    sampled = random.random() < settings.TRACING_SAMPLE_RATE
+    return Span(name, _random_hex(32), None, sampled, kind, attributes)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping a coroutine function in a span"""
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _parse_traceparent(value: str):
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2], parts[3] == "01"
+
+
+# ==================== EXPORTERS ====================
+
+class FileSpanExporter:
+    """Writes OTLP/JSON export requests, one per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def export(self, payload: Dict[str, Any]) -> None:
+        line = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        await asyncio.to_thread(self._write, line)
+
+    def _write(self, line: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def close(self) -> None:
+        pass
+
+
+class OTLPHttpExporter:
+    """Sends OTLP/JSON export requests to a collector over HTTP"""
+
+    def __init__(self, endpoint: str):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self._session = None
+
+    async def export(self, payload: Dict[str, Any]) -> None:
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+        async with self._session.post(self.url, json=payload) as response:
+            if response.status >= 300:
+                logger.warning(f"OTLP export failed: HTTP {response.status}")
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+
+class Tracer:
+    """Buffers finished spans and exports them in batches"""
+
+    def __init__(self, enabled: bool, max_buffer: int = 10000, batch_size: int = 512, flush_interval: float = 2.0):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: Deque[Span] = deque()
+        self._max_buffer = max_buffer
+        self._exporter = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, finished: Span) -> None:
+        if len(self._buffer) >= self._max_buffer:
+            spans_dropped_total.inc()
+            return
+        self._buffer.append(finished)
+
+    async def start(self) -> None:
+        """Create the exporter and start the flush loop"""
+        if not self.enabled or self._task is not None:
+            return
+
+        if settings.TRACING_EXPORTER == "otlp":
+            self._exporter = OTLPHttpExporter(settings.TRACING_OTLP_ENDPOINT)
+        else:
+            self._exporter = FileSpanExporter(settings.TRACING_FILE_PATH)
+
+        self._task = asyncio.create_task(self._flush_loop(), name="tracing-flush")
+        logger.info(f"🔭 Tracing started ({settings.TRACING_EXPORTER} exporter)")
+
+    async def stop(self) -> None:
+        """Flush pending spans and stop"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+        await self._exporter.close()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Tracing flush failed: {e}")
+
+    async def flush(self) -> None:
+        while self._buffer and self._exporter is not None:
+            batch: List[Span] = []
+            while self._buffer and len(batch) < self.batch_size:
+                batch.append(self._buffer.popleft())
+            await self._exporter.export(self._payload(batch))
+            spans_exported_total.inc(len(batch))
+
+    @staticmethod
+    def _payload(batch: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    _otlp_attribute("service.name", settings.TRACING_SERVICE_NAME),
+                    _otlp_attribute("process.pid", os.getpid()),
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "application"},
+                    "spans": [item.to_otlp() for item in batch],
+                }],
+            }]
+        }
+
+
+# Singleton instance
+tracer = Tracer(enabled=settings.TRACING_ENABLED)
+
+
+# ==================== INSTRUMENTATION ====================
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            return await self.app(scope, receive, send)
+
+        traceparent = None
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with span(f"{scope['method']} {scope['path']}", kind=SERVER, traceparent=traceparent,
+                  **{"http.method": scope["method"], "http.target": scope["path"]}) as s:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    s.set("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+def instrument_bot_api() -> None:
+    """Wrap every Telegram Bot API call in a client span"""
+    from telebot import asyncio_helper
+
+    original = asyncio_helper._process_request
+    if getattr(original, "__traced__", False):
+        return
+
+    @wraps(original)
+    async def _process_request(token, url, method="get", params=None, files=None, **kwargs):
+        with span(f"telegram {url}", kind=CLIENT, **{"telegram.method": url}):
+            return await original(token, url, method=method, params=params, files=files, **kwargs)
+
+    _process_request.__traced__ = True
+    asyncio_helper._process_request = _process_request
+
+
+def instrument_redis(client) -> None:
+    """Wrap commands and pipelines of a redis.asyncio client in client spans"""
+    if getattr(client, "__traced__", False):
+        return
+
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def traced_execute_command(*args, **options):
+        with span(f"redis {args[0]}", kind=CLIENT, **{"db.system": "redis"}):
+            return await execute_command(*args, **options)
+
+    def traced_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def traced_execute(*a, **kw):
+            with span("redis PIPELINE", kind=CLIENT, **{"db.system": "redis",
+                                                        "redis.commands": len(pipe.command_stack)}):
+                return await execute(*a, **kw)
+
+        pipe.execute = traced_execute
+        return pipe
+
+    client.execute_command = traced_execute_command
+    client.pipeline = traced_pipeline
+    client.__traced__ = True
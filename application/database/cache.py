@@ -14,18 +14,21 @@ class RedisClient:
     async def connect(self) -> None:
         """Connect to Redis with connection pool"""
         try:
-            self._client = redis.from_url(
+            # Pool fon vazifalari soniga qarab: to'lib qolsa xato emas, bo'shagan ulanish kutiladi
+            pool = redis.BlockingConnectionPool.from_url(
                 settings.REDIS_URL,
                 decode_responses=True,
-                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                max_connections=settings.REDIS_POOL_SIZE,
+                timeout=settings.REDIS_POOL_TIMEOUT,
                 socket_connect_timeout=5,
                 socket_keepalive=True,
                 health_check_interval=30,
             )
+            self._client = redis.Redis.from_pool(pool)
 
             # Test connection
             await self._client.ping()
-            logger.info(f"✅ Redis connected: {settings.REDIS_URL}")
+            logger.info(f"✅ Redis connected: {settings.REDIS_URL} (pool: {settings.REDIS_POOL_SIZE})")
 
         except redis.ConnectionError as e:
             logger.error(f"❌ Redis connection failed: {e}")
@@ -1,18 +1,23 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, TypeVar
 
 import aiohttp
 
-from application.core import logger
+from application.core import logger, codec
 from application.core.config import settings
+from application.core.tracing import span, CLIENT
+
+T = TypeVar('T')
 
 
 class BaseService:
     """User service for API communication"""
 
-    def __init__(self):
+    def __init__(self, timeout: Optional[float] = None):
         self.base_url = f'{settings.MAIN_URL}/{settings.API_VERSION}'
         self.token = settings.AUTH_TOKEN
         self.session: Optional[aiohttp.ClientSession] = None
+        # Berilmasa aiohttp standarti (300 s)
+        self.timeout: Optional[aiohttp.ClientTimeout] = aiohttp.ClientTimeout(total=timeout) if timeout else None
 
     async def __aenter__(self):
         await self.create_session()
@@ -28,7 +33,8 @@ class BaseService:
             if self.token:
                 headers['Authorization'] = f'Token {self.token}'
 
-            self.session = aiohttp.ClientSession(headers=headers)
+            options = {'timeout': self.timeout} if self.timeout is not None else {}
+            self.session = aiohttp.ClientSession(headers=headers, json_serialize=codec.dumps_str, **options)
 
     async def close_session(self):
         """Close aiohttp session"""
@@ -41,42 +47,59 @@ class BaseService:
 
         url = f"{self.base_url}{endpoint}"
 
-        try:
-            async with self.session.request(method, url, **kwargs) as response:
-                # Check content type before trying to parse JSON
-                content_type = response.headers.get('Content-Type', '').lower()
-
-                if response.status == 204:  # No content
-                    return {}
-
-                # Agar HTML qaytsa, JSON deb pars qilmaslik
-                if 'text/html' in content_type:
-                    text_response = await response.text()
-                    logger.warning(f"HTML response received for {url}: {text_response[:200]}")
-
-                    if response.status == 404:
-                        return {'detail': 'Not found'}
-                    else:
-                        return {'error': f'Unexpected HTML response: {response.status}'}
-
-                # JSON responseni pars qilish
-                try:
-                    data = await response.json()
-                except:
-                    # Agar JSON pars qilib bo'lmasa
-                    text_response = await response.text()
-                    logger.warning(f"Non-JSON response for {url}: {text_response[:200]}")
-                    return {'error': f'Non-JSON response: {text_response[:100]}'}
-
-                if not 200 <= response.status < 300:
-                    error_msg = data.get('detail') or data.get('error') or f'HTTP {response.status}'
-                    raise Exception(f"API Error: {error_msg}")
-
-                return data
-
-        except aiohttp.ClientError as e:
-            raise Exception(f"Network error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Request error: {str(e)}")
-        finally:
-            await self.close_session()
+        with span(f"backend {method} {endpoint}", kind=CLIENT, **{"http.method": method, "http.url": url}) as s:
+            if s.traceparent:
+                # Chaqiruvchining headers dict'i o'zgartirilmaydi
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), 'traceparent': s.traceparent}
+
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    s.set('http.status_code', response.status)
+                    # Check content type before trying to parse JSON
+                    content_type = response.headers.get('Content-Type', '').lower()
+
+                    if response.status == 204:  # No content
+                        return {}
+
+                    # Agar HTML qaytsa, JSON deb pars qilmaslik
+                    if 'text/html' in content_type:
+                        text_response = await response.text()
+                        logger.warning(f"HTML response received for {url}: {text_response[:200]}")
+
+                        if response.status == 404:
+                            return {'detail': 'Not found'}
+                        else:
+                            return {'error': f'Unexpected HTML response: {response.status}'}
+
+                    # JSON responseni pars qilish
+                    try:
+                        data = codec.loads(await response.read())
+                    except:
+                        # Agar JSON pars qilib bo'lmasa
+                        text_response = await response.text()
+                        logger.warning(f"Non-JSON response for {url}: {text_response[:200]}")
+                        return {'error': f'Non-JSON response: {text_response[:100]}'}
+
+                    if not 200 <= response.status < 300:
+                        error_msg = data.get('detail') or data.get('error') or f'HTTP {response.status}'
+                        raise Exception(f"API Error: {error_msg}")
+
+                    return data
+
+            except aiohttp.ClientError as e:
+                raise Exception(f"Network error: {str(e)}")
+            except Exception as e:
+                raise Exception(f"Request error: {str(e)}")
+            finally:
+                await self.close_session()
+
+    async def _request_list(self, method: str, endpoint: str, convert: Callable[[Dict[str, Any]], T],
+                            key: str = 'results', **kwargs) -> List[T]:
+        """
+        Request a list endpoint and convert every item in the same pass.
+
+        Works with DRF paginated bodies (items under ``key``) and bare lists.
+        """
+        data = await self._request(method, endpoint, **kwargs)
+        items = data.get(key, []) if isinstance(data, dict) else data
+        return [convert(item) for item in items]
@@ -1,8 +1,16 @@
 from typing import Dict, Any, List, Optional
 from .base import BaseService
+from ..core.async_cache import async_cached
+from ..core.config import settings
+
+
+def _is_city_page(data: Any) -> bool:
+    return isinstance(data, dict) and 'results' in data
 
 
 class CityServiceAPI(BaseService):
+    @async_cached(maxsize=32, ttl=settings.CITY_CACHE_TTL, name="cities",
+                  key=lambda self, page=1, page_size=100: (page, page_size), cache_if=_is_city_page)
     async def get(self, page: int = 1, page_size: int = 100) -> Dict[str, Any]:
         """Get all cities with pagination"""
         return await self._request(
@@ -20,6 +28,8 @@ class CityServiceAPI(BaseService):
         except Exception as e:
             raise e
 
+    @async_cached(maxsize=32, ttl=settings.CITY_CACHE_TTL, name="cities_all",
+                  key=lambda self, page=1, page_size=100: (page, page_size), cache_if=_is_city_page)
     async def get_all_cities(self, page: int = 1, page_size: int = 100) -> Dict[str, Any]:
         """Get all cities with pagination"""
         return await self._request(
@@ -0,0 +1,97 @@
+# application/services/driver_cache.py
+
+import copy
+from typing import Optional
+
+from ..core import codec
+from ..core.async_cache import AsyncTTLCache
+from ..core.config import settings
+from ..core.log import logger
+from ..core.metrics import metrics
+from ..database.cache import cache
+from .types import DriverService
+
+DRIVER_KEY = "driver:tg:{}"
+DRIVER_ID_KEY = "driver:id:{}"  # driver.id -> telegram_id
+
+driver_cache_total = metrics.counter("driver_cache_total", "Driver profile cache lookups by tier and result")
+
+
+class DriverCache:
+    """
+    Haydovchi profili keshi (telegram_id bo'yicha).
+
+    Redis da ``DriverService.to_compact()`` JSON ko'rinishida ``ttl`` bilan
+    saqlanadi, oldida esa qisqa TTL li lokal LRU turadi (boshqa jarayonlardagi
+    o'zgarishlar ko'pi bilan ``local_ttl`` soniyada ko'rinadi). O'zimizning
+    PATCH javoblarimiz keshga yoziladi, ``/driver`` hodisalari esa o'chiradi.
+    Chaqiruvchilar nusxa oladi, shuning uchun obyektni o'zgartirish keshga ta'sir qilmaydi.
+    """
+
+    def __init__(self, ttl: int = settings.DRIVER_CACHE_TTL, local_ttl: float = settings.DRIVER_LOCAL_CACHE_TTL,
+                 local_size: int = settings.DRIVER_LOCAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.local = AsyncTTLCache("drivers", maxsize=local_size, ttl=local_ttl)
+        self._telegram_ids = AsyncTTLCache("driver_ids", maxsize=local_size, ttl=ttl)
+
+    async def get(self, telegram_id: int) -> Optional[DriverService]:
+        driver = self.local.get(telegram_id)
+        if driver is not None:
+            driver_cache_total.inc(tier="local", result="hit")
+            return copy.copy(driver)
+
+        try:
+            raw = await cache.client.get(DRIVER_KEY.format(telegram_id))
+        except Exception as e:
+            logger.warning(f"Driver cache read failed for {telegram_id}: {e}")
+            raw = None
+        if raw is None:
+            driver_cache_total.inc(tier="redis", result="miss")
+            return None
+
+        driver_cache_total.inc(tier="redis", result="hit")
+        driver = DriverService.from_compact(codec.loads(raw))
+        self._remember(driver)
+        return copy.copy(driver)
+
+    async def set(self, driver: Optional[DriverService]) -> None:
+        if driver is None or driver.telegram_id is None:
+            return
+        self._remember(driver)
+        try:
+            pipe = cache.client.pipeline(transaction=False)
+            pipe.set(DRIVER_KEY.format(driver.telegram_id), codec.dumps(driver.to_compact()), ex=self.ttl)
+            if driver.id is not None:
+                pipe.set(DRIVER_ID_KEY.format(driver.id), driver.telegram_id, ex=self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Driver cache write failed for {driver.telegram_id}: {e}")
+
+    async def invalidate(self, telegram_id: Optional[int]) -> None:
+        if telegram_id is None:
+            return
+        self.local.invalidate(telegram_id)
+        try:
+            await cache.client.delete(DRIVER_KEY.format(telegram_id))
+        except Exception as e:
+            logger.warning(f"Driver cache invalidation failed for {telegram_id}: {e}")
+
+    async def invalidate_id(self, driver_id: int) -> None:
+        """driver.id bo'yicha o'chirish (PATCH xato bo'lib javobda driver bo'lmaganda)"""
+        telegram_id = self._telegram_ids.get(driver_id)
+        if telegram_id is None:
+            try:
+                telegram_id = await cache.client.get(DRIVER_ID_KEY.format(driver_id))
+            except Exception:
+                telegram_id = None
+        if telegram_id is not None:
+            await self.invalidate(int(telegram_id))
+
+    def _remember(self, driver: DriverService) -> None:
+        self.local.set(driver.telegram_id, copy.copy(driver))
+        if driver.id is not None:
+            self._telegram_ids.set(driver.id, driver.telegram_id)
+
+
+# Singleton instance
+driver_cache = DriverCache()
@@ -1,8 +1,31 @@
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, List, Callable, TypeVar
+from ..core import codec
+from ..core.config import settings
 from ..core.log import logger
+from ..database.cache import cache
 from ..services.base import BaseService
+from ..services.driver_cache import driver_cache
 from ..services.types import DriverService, CarService, DriverTransactionService, convert_api_response_to_driver_service
 
+T = TypeVar('T')
+
+PAYMENT_KEY = "payment:charge:{}"  # pending:<ts> -> posted:<ts> -> natija JSON yoki failed:<stage>
+PAYMENT_FAILED_KEY = "payment:failed"  # hash: charge_id -> tekshirilishi kerak bo'lgan to'lov
+PAYMENT_PENDING = "pending"
+PAYMENT_POSTED = "posted"
+PAYMENT_FAILED = "failed:"
+
+# Holat o'zgarmagan bo'lsagina almashtirish (eskirgan to'lovni bitta redelivery yopadi)
+_REPLACE_STATE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+BALANCE_LOCK_KEY = "driver:balance-lock:{}"
+
 
 class DriverServiceAPI(BaseService):
     """Driver API bilan ishlash uchun service klassi"""
@@ -23,8 +46,13 @@ class DriverServiceAPI(BaseService):
             logger.error(f"Exception while fetching driver ID {driver_id}: {str(e)}")
             return None
 
-    async def get_driver_by_telegram_id(self, telegram_id: int) -> Optional[DriverService]:
-        """Get driver by telegram ID"""
+    async def get_driver_by_telegram_id(self, telegram_id: int, fresh: bool = False) -> Optional[DriverService]:
+        """Get driver by telegram ID; ``fresh=True`` keshni chetlab o'tadi (balans tekshiruvlari uchun)"""
+        if not fresh:
+            driver = await driver_cache.get(telegram_id)
+            if driver is not None:
+                return driver
+
         logger.info(f"Fetching driver by telegram_id: {telegram_id}")
         try:
             data = await self._request('GET', f'/drivers/by-telegram-id/{telegram_id}/')
@@ -39,7 +67,9 @@ class DriverServiceAPI(BaseService):
                 return None
 
             logger.debug(f"Successfully fetched driver with telegram_id {telegram_id}")
-            return self._dict_to_driver(data)
+            driver = self._dict_to_driver(data)
+            await driver_cache.set(driver)
+            return driver
         except Exception as e:
             logger.error(f"Exception while fetching driver by telegram_id {telegram_id}: {str(e)}")
             return None
@@ -52,12 +82,16 @@ class DriverServiceAPI(BaseService):
 
             if 'error' in data:
                 logger.warning(f"Failed to update driver ID {driver_id}: {data['error']}")
+                await driver_cache.invalidate_id(driver_id)
                 return None
 
             logger.info(f"Successfully updated driver ID {driver_id}")
-            return self._dict_to_driver(data)
+            driver = self._dict_to_driver(data)
+            await driver_cache.set(driver)
+            return driver
         except Exception as e:
             logger.error(f"Exception while updating driver ID {driver_id}: {str(e)}")
+            await driver_cache.invalidate_id(driver_id)
             return None
 
     async def list_drivers(self, filters: Optional[Dict[str, Any]] = None) -> dict:
@@ -79,14 +113,34 @@ class DriverServiceAPI(BaseService):
             logger.error(f"Exception while fetching drivers list: {str(e)}")
             return {}
 
-    async def change_direction(self, driver_id: int, route_id: str) -> None:
-        """Change driver direction"""
+    async def list_driver_infos(
+            self,
+            filters: Optional[Dict[str, Any]] = None,
+            convert: Callable[[Dict[str, Any]], T] = dict,
+    ) -> List[T]:
+        """Get only the ``driver_info`` part of each driver in the list, converted with ``convert``"""
+        logger.info(f"Fetching driver infos with {filters or 'no filters'}")
+        try:
+            return await self._request_list(
+                'GET', '/drivers/', lambda item: convert(item.get('driver_info') or {}), params=filters or {}
+            )
+        except Exception as e:
+            logger.error(f"Exception while fetching driver infos: {str(e)}")
+            return []
+
+    async def change_direction(self, driver_id: int, route_id: str) -> Optional[DriverService]:
+        """Change driver direction; javobda driver bo'lsa uni qaytaradi"""
         response = await self._request(
             'PATCH',
             f'/drivers/{driver_id}/update-route/',  # yoki /update-route/
             json={'route_id': route_id}
         )
-        print(response)
+        if isinstance(response, dict) and response.get('id') is not None:
+            driver = self._dict_to_driver(response)
+            await driver_cache.set(driver)
+            return driver
+        await driver_cache.invalidate_id(driver_id)
+        return None
     # Conversion methods
     def _dict_to_driver(self, data: Dict[str, Any]) -> DriverService:
         logger.debug("Converting API response to DriverService object")
@@ -98,61 +152,168 @@ class DriverServiceAPI(BaseService):
         logger.info(f"Adding balance to driver ID {driver_id}: amount={amount}, reason={reason}")
 
         try:
-            # Transaction yaratish
-            transaction_data = {
-                'driver': driver_id,
-                'amount': amount
-            }
-
-            # Transaction yaratish
-            transaction_result = await self._request(
-                'POST',
-                '/transactions/',
-                json=transaction_data
-            )
-
-            if 'error' in transaction_result:
-                logger.warning(f"Failed to create transaction for driver {driver_id}: {transaction_result['error']}")
+            transaction_result = await self._create_transaction(driver_id, amount)
+            if transaction_result is None:
                 return None
+            return await self._update_balance(driver_id, amount, transaction_result, added=amount)
 
-            # Haydovchining balansini yangilash
-            update_result = await self._request(
-                'PATCH',
-                f'/drivers/{driver_id}/',
-                json={'amount': amount}  # Bu amount ni qo'shib qo'yadi
-            )
+        except Exception as e:
+            logger.error(f"Exception while adding balance to driver {driver_id}: {str(e)}")
+            return None
 
-            if 'error' in update_result:
-                logger.warning(f"Failed to update driver balance for ID {driver_id}: {update_result['error']}")
-                return None
+    async def _create_transaction(self, driver_id: int, amount: float) -> Optional[Dict[str, Any]]:
+        """Transaction yaratish"""
+        transaction_result = await self._request(
+            'POST',
+            '/transactions/',
+            json={'driver': driver_id, 'amount': amount}
+        )
 
-            logger.info(f"Successfully added {amount} to driver ID {driver_id}")
+        if 'error' in transaction_result:
+            logger.warning(f"Failed to create transaction for driver {driver_id}: {transaction_result['error']}")
+            return None
+        return transaction_result
 
-            return {
-                'transaction': transaction_result,
-                'driver': update_result,
-                'amount_added': amount
-            }
+    async def _update_balance(self, driver_id: int, amount: float, transaction_result: Dict[str, Any],
+                              added: float) -> Optional[Dict[str, Any]]:
+        """Haydovchining balansini ``amount`` ga yangilash (transaction yaratilgandan keyin); ``added`` - to'langan summa"""
+        update_result = await self._request(
+            'PATCH',
+            f'/drivers/{driver_id}/',
+            json={'amount': amount}  # Bu amount ni qo'shib qo'yadi
+        )
 
-        except Exception as e:
-            logger.error(f"Exception while adding balance to driver {driver_id}: {str(e)}")
+        if 'error' in update_result:
+            logger.warning(f"Failed to update driver balance for ID {driver_id}: {update_result['error']}")
+            await driver_cache.invalidate_id(driver_id)
             return None
 
-    async def add_balance_by_telegram_id(self, telegram_id: int, amount: float, reason: str = None) -> Optional[
-        Dict[str, Any]]:
-        """Telegram ID bo'yicha haydovchining balansiga pul qo'shish"""
+        if update_result.get('telegram_id') is not None:
+            await driver_cache.set(self._dict_to_driver(update_result))
+        else:
+            await driver_cache.invalidate_id(driver_id)
+
+        logger.info(f"Successfully added {added} to driver ID {driver_id}, balance {amount}")
+
+        return {
+            'transaction': transaction_result,
+            'driver': update_result,
+            'amount_added': added
+        }
+
+    async def add_balance_by_telegram_id(self, telegram_id: int, amount: float, reason: str = None,
+                                         idempotency_key: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Telegram ID bo'yicha haydovchining balansiga pul qo'shish.
+
+        Backend mutlaq summani qabul qiladi, shuning uchun o'qish va yozish
+        haydovchi bo'yicha Redis lock ichida bajariladi. ``idempotency_key``
+        (masalan ``telegram_payment_charge_id``) berilsa, bir xil to'lov ikki
+        marta qo'shilmaydi: takroriy chaqiruv ``{'duplicate': True, ...}`` qaytaradi.
+
+        To'lov kaliti holatlari: ``pending:<ts>`` -> ``posted:<ts>``
+        (transaction yaratildi) -> natija JSON. Xato bo'lsa kalit
+        ``failed:<stage>`` holatida qoladi va to'lov ``payment:failed`` ga
+        yoziladi - qo'lda tekshiriladi, kalit hech qachon o'chirilmaydi.
+        ``PAYMENT_STALE_AFTER`` dan eski ``pending``/``posted`` (jarayon
+        o'lgan) keyingi redelivery'da xato deb yoziladi va None qaytadi.
+        """
         logger.info(f"Adding balance to driver by telegram_id {telegram_id}: amount={amount}")
 
-        try:
-            # Haydovchini telegram_id orqali topish
-            driver = await self.get_driver_by_telegram_id(telegram_id)
-            if not driver:
-                logger.warning(f"Driver not found with telegram_id {telegram_id}")
+        payment_key = PAYMENT_KEY.format(idempotency_key) if idempotency_key else None
+        if payment_key and not await cache.client.set(payment_key, f"{PAYMENT_PENDING}:{int(time.time())}", nx=True,
+                                                       ex=settings.PAYMENT_IDEMPOTENCY_TTL):
+            stored = await cache.client.get(payment_key)
+            if await self._fail_stale_payment(payment_key, stored, telegram_id, amount):
                 return None
+            logger.warning(f"Duplicate payment {idempotency_key} for telegram_id {telegram_id} ignored "
+                           f"(state: {stored if stored and not stored.startswith('{') else 'done'})")
+            result = codec.loads(stored) if stored and stored.startswith('{') else {}
+            return {**result, 'duplicate': True}
+
+        result, stage = None, "lock"
+        # Backend mutlaq summani yozadi: lock so'rovlar davomida tugab qolmasligi kerak
+        backend = DriverServiceAPI(timeout=settings.BALANCE_REQUEST_TIMEOUT)
+        try:
+            lock = cache.client.lock(BALANCE_LOCK_KEY.format(telegram_id), timeout=settings.BALANCE_LOCK_TIMEOUT,
+                                     blocking_timeout=15, thread_local=False)
+            async with lock:
+                # Haydovchini telegram_id orqali topish (balans keshdan olinmaydi)
+                stage = "driver"
+                driver = await backend.get_driver_by_telegram_id(telegram_id, fresh=True)
+                if not driver:
+                    logger.warning(f"Driver not found with telegram_id {telegram_id}")
+                    return None
 
-            # Balans qo'shish
-            return await self.add_driver_balance(driver.id, driver.amount + amount, reason)
+                # Balans qo'shish; har bir so'rovdan oldin lock muddati yangilanadi (egasi bo'lmasa - xato)
+                stage = "transaction"
+                await lock.reacquire()
+                transaction_result = await backend._create_transaction(driver.id, driver.amount + amount)
+                if transaction_result is None:
+                    return None
+                if payment_key:
+                    await self._set_payment_state(payment_key, f"{PAYMENT_POSTED}:{int(time.time())}")
 
+                stage = "balance"
+                await lock.reacquire()
+                result = await backend._update_balance(driver.id, driver.amount + amount, transaction_result,
+                                                       added=amount)
+
+        except Exception as e:
+            if result is None:
+                logger.error(f"Exception while adding balance to driver by telegram_id {telegram_id}: {str(e)}")
+            else:
+                # Balans yozilgan - lockni bo'shatishdagi xato natijani o'zgartirmaydi
+                logger.warning(f"Balance lock release failed for telegram_id {telegram_id}: {str(e)}")
+        finally:
+            if payment_key:
+                await self._finish_payment(payment_key, result, stage, telegram_id, amount)
+        return result
+
+    async def _finish_payment(self, payment_key: str, result: Optional[Dict[str, Any]], stage: str,
+                              telegram_id: int, amount: float) -> None:
+        """Muvaffaqiyatli to'lovni eslab qolish; xato bo'lsa ``failed:<stage>`` holati va tekshiruv yozuvi"""
+        if result is not None:
+            summary = {'driver': {'amount': result['driver'].get('amount', 0)},
+                       'amount_added': result['amount_added']}
+            await self._set_payment_state(payment_key, codec.dumps(summary))
+            return
+
+        await self._set_payment_state(payment_key, f"{PAYMENT_FAILED}{stage}")
+        await self._record_failed_payment(payment_key, stage, telegram_id, amount)
+
+    async def _fail_stale_payment(self, payment_key: str, stored: Optional[str], telegram_id: int,
+                                  amount: float) -> bool:
+        """Jarayon o'lib qolgan ``pending``/``posted`` to'lovni ``failed:<stage>`` qilish; shu chaqiruv yopgan bo'lsa True"""
+        state, _, started = (stored or "").partition(":")
+        if state not in (PAYMENT_PENDING, PAYMENT_POSTED):
+            return False
+        if time.time() - int(started or 0) < settings.PAYMENT_STALE_AFTER:
+            return False  # hali ishlanmoqda
+        try:
+            replaced = await cache.client.eval(_REPLACE_STATE, 1, payment_key, stored, f"{PAYMENT_FAILED}{state}",
+                                               settings.PAYMENT_IDEMPOTENCY_TTL)
+        except Exception as e:
+            logger.error(f"Failed to close stale payment {payment_key}: {e}")
+            return False
+        if not replaced:
+            return False
+        await self._record_failed_payment(payment_key, state, telegram_id, amount)
+        return True
+
+    async def _record_failed_payment(self, payment_key: str, stage: str, telegram_id: int, amount: float) -> None:
+        charge_id = payment_key[len(PAYMENT_KEY.format('')):]
+        logger.error(f"❌ Payment {charge_id} of telegram_id {telegram_id} ({amount}) failed at '{stage}' "
+                     f"- needs manual reconciliation")
+        try:
+            await cache.client.hset(PAYMENT_FAILED_KEY, charge_id, codec.dumps({
+                'telegram_id': telegram_id, 'amount': amount, 'stage': stage, 'at': int(time.time()),
+            }))
+        except Exception as e:
+            logger.error(f"Failed to record failed payment {charge_id}: {e}")
+
+    async def _set_payment_state(self, payment_key: str, state: str) -> None:
+        try:
+            await cache.client.set(payment_key, state, ex=settings.PAYMENT_IDEMPOTENCY_TTL)
         except Exception as e:
-            logger.error(f"Exception while adding balance to driver by telegram_id {telegram_id}: {str(e)}")
-            return None
\ No newline at end of file
+            logger.error(f"Failed to record payment state {payment_key}={state}: {e}")
\ No newline at end of file
@@ -0,0 +1,296 @@
+# application/services/driver_session.py
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core import codec
+from ..core.config import settings
+from ..core.log import logger
+from ..core.metrics import metrics
+from ..database.cache import cache
+from .order_service import OrderServiceAPI
+
+SESSION_KEY = "driver:session:{}"  # hash: order_id -> SessionOrder.to_compact() JSON
+ORDER_KEY = "driver:session:order:{}"  # order_id -> telegram_id (driver_details'siz yakunlanganda tozalash uchun)
+
+# Joy bo'lsa (yoki buyurtma allaqachon sessiyada bo'lsa) qo'shish
+_ADD = """
+if redis.call('hexists', KEYS[1], ARGV[1]) == 1 or redis.call('hlen', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('hset', KEYS[1], ARGV[1], ARGV[2])
+    redis.call('expire', KEYS[1], ARGV[4])
+    redis.call('set', KEYS[2], ARGV[5], 'EX', ARGV[4])
+    return 1
+end
+return 0
+"""
+
+# Sessiyadan chiqarish; indeks faqat shu haydovchiniki bo'lsa o'chiriladi
+_REMOVE = """
+for i = 2, #KEYS do
+    redis.call('hdel', KEYS[1], ARGV[i - 1])
+    if redis.call('get', KEYS[i]) == ARGV[#ARGV] then
+        redis.call('del', KEYS[i])
+    end
+end
+return 1
+"""
+
+# Faqat hali sessiyada turgan buyurtmalarni yangilash (parallel yakunlangani qayta tirilmasin)
+_REPLACE = """
+for i = 1, #ARGV, 2 do
+    if redis.call('hexists', KEYS[1], ARGV[i]) == 1 then
+        redis.call('hset', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+return 1
+"""
+
+# callback action -> (kutilgan status, yangi status, guruhlash shahri)
+TRANSITIONS: Dict[str, Tuple[str, str, str]] = {
+    "arrived": ("assigned", "arrived", "from"),
+    "picked": ("arrived", "started", "from"),
+    "finished": ("started", "ended", "to"),
+}
+FINAL_STATUSES = frozenset({"ended", "canceled", "rejected"})
+
+session_transitions_total = metrics.counter(
+    "driver_session_transitions_total", "Order status transitions by action, mode (single, bulk) and result"
+)
+session_taps_saved_total = metrics.counter(
+    "driver_session_taps_saved_total", "Orders advanced by a bulk action beyond the tapped one"
+)
+
+
+@dataclass(slots=True)
+class SessionOrder:
+    order_id: int
+    status: str = "assigned"
+    order_type: str = ""
+    from_city_id: Optional[int] = None
+    to_city_id: Optional[int] = None
+    from_name: Dict[str, str] = field(default_factory=dict)
+    to_name: Dict[str, str] = field(default_factory=dict)
+
+    def city_id(self, side: str) -> Optional[int]:
+        return self.from_city_id if side == "from" else self.to_city_id
+
+    def city_name(self, side: str, lang: str) -> str:
+        names = self.from_name if side == "from" else self.to_name
+        return names.get(lang) or names.get("uz", "")
+
+    def route(self, lang: str) -> str:
+        from_city, to_city = self.city_name("from", lang), self.city_name("to", lang)
+        return f"{from_city} → {to_city}" if from_city or to_city else ""
+
+    @classmethod
+    def from_order(cls, order: Any, status: str = "assigned") -> 'SessionOrder':
+        """``OrderTypes`` dan (yo'nalish shaharlari bilan)"""
+        route = order.content_object.route
+        from_city, to_city = route.from_city or {}, route.to_city or {}
+        return cls(
+            order_id=int(order.id),
+            status=status,
+            order_type=order.order_type,
+            from_city_id=from_city.get("city_id"),
+            to_city_id=to_city.get("city_id"),
+            from_name=from_city.get("translate") or {},
+            to_name=to_city.get("translate") or {},
+        )
+
+    def to_compact(self) -> Dict[str, Any]:
+        return {"id": self.order_id, "s": self.status, "t": self.order_type,
+                "fc": self.from_city_id, "tc": self.to_city_id, "fn": self.from_name, "tn": self.to_name}
+
+    @classmethod
+    def from_compact(cls, data: Dict[str, Any]) -> 'SessionOrder':
+        return cls(order_id=data["id"], status=data.get("s", "assigned"), order_type=data.get("t", ""),
+                   from_city_id=data.get("fc"), to_city_id=data.get("tc"),
+                   from_name=data.get("fn") or {}, to_name=data.get("tn") or {})
+
+
+def split_by_city(orders: Iterable[SessionOrder], action: str) -> List[List[SessionOrder]]:
+    """``action`` guruhlaydigan shahar bo'yicha bo'lish (shahri noma'lumlar alohida)"""
+    _, _, side = TRANSITIONS[action]
+    groups: Dict[Any, List[SessionOrder]] = {}
+    for order in orders:
+        city_id = order.city_id(side)
+        groups.setdefault(city_id if city_id is not None else ("order", order.order_id), []).append(order)
+    return list(groups.values())
+
+
+class DriverSessions:
+    """
+    Haydovchining aktiv buyurtmalari (ko'pi bilan ``max_orders`` ta).
+
+    Sessiya Redis hash'da turadi, shuning uchun barcha jarayonlar bir xil
+    ro'yxatni ko'radi. "Shu shahardagi barchasi" amali bitta bosishda mos
+    buyurtmalarning hammasini keyingi statusga o'tkazadi: backend PATCH'lari
+    parallel yuboriladi. Redis ishlamasa sessiya bo'sh deb hisoblanadi va
+    bot bitta-bitta rejimda ishlashda davom etadi.
+    """
+
+    def __init__(self, max_orders: int = settings.DRIVER_MAX_ACTIVE_ORDERS, ttl: int = settings.DRIVER_SESSION_TTL):
+        self.max_orders = max_orders
+        self.ttl = ttl
+
+    # ==================== READ ====================
+
+    async def orders(self, telegram_id: int) -> List[SessionOrder]:
+        try:
+            raw = await cache.client.hgetall(SESSION_KEY.format(telegram_id))
+        except Exception as e:
+            logger.warning(f"Driver session read failed for {telegram_id}: {e}")
+            return []
+        return sorted((SessionOrder.from_compact(codec.loads(v)) for v in raw.values()), key=lambda o: o.order_id)
+
+    async def group(self, telegram_id: int, order_id: int, action: str) -> List[SessionOrder]:
+        """``order_id`` bilan bir shahardagi, ``action`` ni kutayotgan buyurtmalar"""
+        expected, _, side = TRANSITIONS[action]
+        orders = await self.orders(telegram_id)
+        anchor = next((o for o in orders if o.order_id == order_id), None)
+        if anchor is None:
+            return []
+        city_id = anchor.city_id(side)
+        return [o for o in orders
+                if o.status == expected and (o.order_id == order_id or (city_id is not None and o.city_id(side) == city_id))]
+
+    # ==================== WRITE ====================
+
+    async def add(self, telegram_id: int, order: SessionOrder) -> bool:
+        """
+        Buyurtmani sessiyaga qo'shish; limit to'lgan bo'lsa False.
+
+        Limit to'lganda avval sessiya backend bilan solishtiriladi
+        (``reconcile``) - yo'qolgan webhook tufayli qolib ketgan joylar
+        bo'shatiladi va yana bir marta urinib ko'riladi.
+        """
+        try:
+            if await self._add(telegram_id, order):
+                return True
+            if not await self.reconcile(telegram_id):
+                return False
+            return await self._add(telegram_id, order)
+        except Exception as e:
+            logger.warning(f"Driver session write failed for {telegram_id}: {e}")
+            return True  # limitni tekshirib bo'lmadi - qabul qilishni to'xtatmaymiz
+
+    async def _add(self, telegram_id: int, order: SessionOrder) -> bool:
+        return bool(await cache.client.eval(
+            _ADD, 2, SESSION_KEY.format(telegram_id), ORDER_KEY.format(order.order_id),
+            order.order_id, codec.dumps(order.to_compact()), self.max_orders, self.ttl, telegram_id,
+        ))
+
+    async def remove(self, telegram_id: int, *order_ids: int) -> None:
+        if not order_ids:
+            return
+        try:
+            await cache.client.eval(_REMOVE, 1 + len(order_ids), SESSION_KEY.format(telegram_id),
+                                    *(ORDER_KEY.format(order_id) for order_id in order_ids), *order_ids, telegram_id)
+        except Exception as e:
+            logger.warning(f"Driver session cleanup failed for {telegram_id}: {e}")
+
+    async def release(self, order_id: int) -> None:
+        """Yakunlangan buyurtmani (haydovchisi noma'lum - ``driver_details`` yo'q) sessiyadan chiqarish"""
+        try:
+            telegram_id = await cache.client.get(ORDER_KEY.format(order_id))
+        except Exception as e:
+            logger.warning(f"Driver session index read failed for order {order_id}: {e}")
+            return
+        if telegram_id is not None:
+            await self.remove(int(telegram_id), order_id)
+
+    async def reconcile(self, telegram_id: int) -> int:
+        """Backendda yakunlangan yoki boshqa haydovchiga o'tgan buyurtmalarni chiqarish; nechtasi chiqarilganini qaytaradi"""
+        orders = await self.orders(telegram_id)
+        results = await asyncio.gather(*(OrderServiceAPI().get_order(o.order_id) for o in orders),
+                                       return_exceptions=True)
+        stale = []
+        for order, result in zip(orders, results):
+            if not isinstance(result, dict) or 'error' in result:
+                continue  # backend javob bermadi - joy saqlanadi
+            # Haydovchisiz "created" - parallel qabul qilinayotgan buyurtma, joyi saqlanadi
+            driver = result.get('driver_details') or {}
+            if ('detail' in result or result.get('status') in FINAL_STATUSES
+                    or (driver and str(driver.get('telegram_id')) != str(telegram_id))):
+                stale.append(order.order_id)
+        if stale:
+            logger.info(f"Driver {telegram_id} session: released stale orders {stale}")
+            await self.remove(telegram_id, *stale)
+        return len(stale)
+
+    async def set_status(self, telegram_id: int, orders: Iterable[SessionOrder], status: str) -> None:
+        """Statusni yozish; yakunlangan buyurtmalar sessiyadan chiqariladi"""
+        orders = list(orders)
+        for order in orders:
+            order.status = status
+        if status in FINAL_STATUSES:
+            return await self.remove(telegram_id, *(o.order_id for o in orders))
+        args = []
+        for order in orders:
+            args += [order.order_id, codec.dumps(order.to_compact())]
+        if not args:
+            return
+        try:
+            await cache.client.eval(_REPLACE, 1, SESSION_KEY.format(telegram_id), *args)
+        except Exception as e:
+            logger.warning(f"Driver session update failed for {telegram_id}: {e}")
+
+    async def sync(self, telegram_id: int, order_id: int, status: str) -> None:
+        """Backend hodisasidagi statusni sessiyaga qo'llash (``/driver`` webhook)"""
+        if status in FINAL_STATUSES:
+            return await self.remove(telegram_id, order_id)
+        try:
+            raw = await cache.client.hget(SESSION_KEY.format(telegram_id), order_id)
+        except Exception:
+            raw = None
+        if raw is not None:
+            await self.set_status(telegram_id, [SessionOrder.from_compact(codec.loads(raw))], status)
+
+    # ==================== TRANSITIONS ====================
+
+    async def advance(self, telegram_id: int, order_ids: List[int], action: str,
+                      bulk: bool = False) -> Tuple[List[SessionOrder], List[SessionOrder]]:
+        """
+        Buyurtmalarni ``action`` bo'yicha keyingi statusga o'tkazish.
+
+        Backendda bulk endpoint yo'q, shuning uchun PATCH'lar parallel
+        yuboriladi. (muvaffaqiyatli, xato) ro'yxatlarini qaytaradi.
+        """
+        _, status, _ = TRANSITIONS[action]
+        orders = await self._entries(telegram_id, order_ids)
+
+        # Har bir so'rov o'z client'i bilan: BaseService sessiyani so'rovdan keyin yopadi
+        results = await asyncio.gather(*(OrderServiceAPI().update_status(o.order_id, status) for o in orders),
+                                       return_exceptions=True)
+
+        done, failed = [], []
+        for order, result in zip(orders, results):
+            if isinstance(result, dict) and not ('error' in result or 'detail' in result):
+                done.append(order)
+            else:
+                failed.append(order)
+                logger.warning(f"⚠️ Order {order.order_id} -> {status} failed: {result}")
+
+        mode = "bulk" if bulk else "single"
+        if done:
+            session_transitions_total.inc(len(done), action=action, mode=mode, result="ok")
+            await self.set_status(telegram_id, done, status)
+        if failed:
+            session_transitions_total.inc(len(failed), action=action, mode=mode, result="failed")
+        if bulk and len(done) > 1:
+            session_taps_saved_total.inc(len(done) - 1, action=action)
+        return done, failed
+
+    async def _entries(self, telegram_id: int, order_ids: List[int]) -> List[SessionOrder]:
+        """Sessiyadagi yozuvlar; sessiyada yo'q buyurtmalar uchun faqat id"""
+        try:
+            raws = await cache.client.hmget(SESSION_KEY.format(telegram_id), order_ids)
+        except Exception:
+            raws = [None] * len(order_ids)
+        return [SessionOrder.from_compact(codec.loads(raw)) if raw else SessionOrder(order_id=order_id)
+                for order_id, raw in zip(order_ids, raws)]
+
+
+# Singleton instance
+driver_sessions = DriverSessions()
@@ -0,0 +1,227 @@
+# application/services/driver_status.py
+
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from ..core.config import settings
+from ..core.log import logger
+from ..core.metrics import metrics
+from ..core.scheduler import scheduler
+from ..database.cache import cache
+from .driver_service import DriverServiceAPI
+from .types import DriverService
+
+PENDING_KEY = "driver_status:pending:{}"  # hash: status, base (backenddagi ma'lum status), attempts
+FLUSH_JOB = "driver-status:{}"  # scheduler ishi: haydovchi uchun bittadan
+
+# Yuborilgan status hali oxirgisi bo'lsa - o'chirish (1); yo'qsa yuborilgani endi backenddagi status (0)
+_FINISH = """
+local status = redis.call('hget', KEYS[1], 'status')
+if not status or status == ARGV[1] then
+    redis.call('del', KEYS[1])
+    return 1
+end
+redis.call('hset', KEYS[1], 'base', ARGV[1], 'attempts', 0)
+return 0
+"""
+
+# Yuborilmagan status uchun urinishlar soni; yangi status kelgan bo'lsa 0, status yo'q bo'lsa -1
+_FAIL = """
+local status = redis.call('hget', KEYS[1], 'status')
+if not status then
+    return -1
+end
+if status ~= ARGV[1] then
+    redis.call('hset', KEYS[1], 'attempts', 0)
+    return 0
+end
+return redis.call('hincrby', KEYS[1], 'attempts', 1)
+"""
+
+# Qiymat o'zgarmagan bo'lsagina o'chirish (boshqa jarayon yangi status yozgan bo'lishi mumkin)
+_DELETE_IF_EQUAL = """
+if redis.call('hget', KEYS[1], 'status') == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+status_writes_total = metrics.counter(
+    "driver_status_writes_total", "Driver status changes by outcome (flushed, coalesced, skipped, retried, failed)"
+)
+status_pending = metrics.gauge("driver_status_pending", "Driver status changes written by this process, not yet flushed")
+
+
+class DriverStatusWriter:
+    """
+    Write-behind driver status.
+
+    ``set_status`` yangi statusni darhol Redis overlay'ga
+    (``driver_status:pending:{id}``) yozadi, backendga esa
+    ``driver_status.flush`` ishi ``delay`` soniyadan keyin yuboradi
+    (scheduler, haydovchi uchun bitta ish - qaysi jarayon olsa ham). Shu
+    oraliqdagi online/offline bosishlar oxirgi qiymatga yig'iladi; natija
+    backenddagi statusga teng bo'lsa so'rov umuman yuborilmaydi.
+
+    Yagona manba - Redis overlay: ``overlay`` va ``_flush_one`` har doim
+    undan o'qiydi. Lokal faqat yuborilayotgan (``_inflight``) haydovchilar
+    va shu jarayon yozgan qiymatlar (``stop`` uchun) saqlanadi.
+    """
+
+    def __init__(self, delay: float = settings.STATUS_FLUSH_DELAY, max_retries: int = settings.STATUS_FLUSH_RETRIES,
+                 pending_ttl: int = settings.STATUS_PENDING_TTL):
+        self.delay = delay
+        self.max_retries = max_retries
+        self.pending_ttl = pending_ttl
+        self._written: Dict[int, str] = {}  # shu jarayon yozgan, hali shu yerda yuborilmagan
+        self._inflight: Set[int] = set()
+
+    async def stop(self) -> None:
+        """
+        Shu jarayon yozgan statuslarni yuborish (scheduler to'xtatilgandan keyin).
+
+        Faqat Redis overlay'da hali shu qiymat turganlari yuboriladi - boshqa
+        jarayon yozgan yangiroq status eskisi bilan almashtirilmaydi.
+        """
+        written = list(self._written.items())
+        self._written.clear()
+        if not written:
+            return
+        try:
+            pipe = cache.client.pipeline(transaction=False)
+            for driver_id, _ in written:
+                pipe.hget(PENDING_KEY.format(driver_id), "status")
+            current = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ {len(written)} driver status changes not flushed on shutdown: {e}")
+            return
+
+        matching = [driver_id for (driver_id, status), now in zip(written, current) if now == status]
+        # Scheduler to'xtagan - uning ulanishlari bo'sh; bir vaqtda shuncha yuboriladi
+        limit = asyncio.Semaphore(settings.SCHEDULER_CONCURRENCY)
+
+        async def flush(driver_id: int) -> Optional[float]:
+            async with limit:
+                return await self._flush_one(driver_id)
+
+        results = await asyncio.gather(*(flush(driver_id) for driver_id in matching), return_exceptions=True)
+        unflushed = 0
+        for driver_id, again in zip(matching, results):
+            if again is None:
+                await scheduler.cancel(FLUSH_JOB.format(driver_id))
+            else:
+                unflushed += 1  # ishi Redis da qoladi
+        status_pending.set(0)
+        if unflushed:
+            logger.warning(f"⚠️ {unflushed} driver status changes not flushed on shutdown")
+
+    # ==================== WRITE ====================
+
+    async def set_status(self, driver_id: int, status: str, current: Optional[str] = None) -> None:
+        """Statusni navbatga qo'yish; ``current`` - haydovchining hozirgi (backenddagi) statusi"""
+        key = PENDING_KEY.format(driver_id)
+        try:
+            pipe = cache.client.pipeline(transaction=True)
+            pipe.hget(key, "status")
+            pipe.hset(key, "status", status)
+            if current:
+                pipe.hsetnx(key, "base", current)  # birinchi o'zgarishdagi backend statusi
+            pipe.expire(key, self.pending_ttl)
+            previous, *_ = await pipe.execute()
+        except Exception as e:
+            # Overlay'siz navbat yo'q - darhol backendga
+            logger.warning(f"Driver status overlay write failed for {driver_id}: {e}")
+            await DriverServiceAPI().update_driver(driver_id, {"status": status})
+            return
+        if previous is not None:
+            status_writes_total.inc(result="coalesced")
+        self._written[driver_id] = status
+        status_pending.set(len(self._written))
+
+        # Scheduler ishga tushmagan bo'lsa (masalan skriptlarda) - darhol yozish
+        if not scheduler.running:
+            await self._flush_one(driver_id)
+            return
+        try:
+            # Rejalashtirilgan ish suriladi (replace): bajarilayotgan bo'lsa ham oxirgi qiymat yo'qolmaydi
+            await scheduler.schedule("driver_status.flush", {"driver_id": driver_id}, delay=self.delay,
+                                     key=FLUSH_JOB.format(driver_id), replace=True)
+        except Exception as e:
+            logger.warning(f"Driver status flush not scheduled for {driver_id}: {e}")
+            await self._flush_one(driver_id)
+
+    # ==================== READ ====================
+
+    async def overlay(self, driver: Optional[DriverService]) -> Optional[DriverService]:
+        """Hali backendga yetmagan statusni driver obyektiga qo'llash"""
+        if driver is None:
+            return None
+        try:
+            pending = await cache.client.hget(PENDING_KEY.format(driver.id), "status")
+        except Exception:
+            return driver
+        if pending:
+            driver.status = pending
+        elif self._written.pop(driver.id, None) is not None:
+            status_pending.set(len(self._written))  # boshqa jarayon yuborib bo'lgan
+        return driver
+
+    # ==================== FLUSH ====================
+
+    async def _flush_one(self, driver_id: int) -> Optional[float]:
+        """Bitta haydovchi statusini yuborish; qayta urinish kerak bo'lsa kechikishni qaytaradi"""
+        if driver_id in self._inflight:
+            return self.delay
+        key = PENDING_KEY.format(driver_id)
+        pending = await cache.client.hgetall(key)
+        status = pending.get("status")
+        if not status:
+            self._forget(driver_id)
+            return None  # allaqachon yuborilgan
+
+        self._inflight.add(driver_id)
+        try:
+            if status == pending.get("base"):
+                ok = True
+                status_writes_total.inc(result="skipped")
+            else:
+                ok = await DriverServiceAPI().update_driver(driver_id, {"status": status}) is not None
+        finally:
+            self._inflight.discard(driver_id)
+
+        if ok:
+            if status != pending.get("base"):
+                status_writes_total.inc(result="flushed")
+            if await cache.client.eval(_FINISH, 1, key, status):
+                self._forget(driver_id, status)
+                return None
+            return self.delay  # yuborish paytida yangi qiymat kelgan
+
+        attempts = await cache.client.eval(_FAIL, 1, key, status)
+        if attempts < 0:
+            self._forget(driver_id)
+            return None
+        if attempts == 0:
+            return self.delay  # yangi qiymat o'z urinishlari bilan yuboriladi
+        if attempts > self.max_retries:
+            await cache.client.eval(_DELETE_IF_EQUAL, 1, key, status)
+            self._forget(driver_id, status)
+            status_writes_total.inc(result="failed")
+            logger.error(f"❌ Driver {driver_id} status '{status}' dropped after {self.max_retries} retries")
+            return None
+        status_writes_total.inc(result="retried")
+        return min(30.0, self.delay * 2 ** attempts)
+
+    def _forget(self, driver_id: int, status: Optional[str] = None) -> None:
+        if status is None or self._written.get(driver_id) == status:
+            self._written.pop(driver_id, None)
+            status_pending.set(len(self._written))
+
+
+# Singleton instance
+status_writer = DriverStatusWriter()
+
+
+@scheduler.job("driver_status.flush")
+async def _flush_job(payload: Dict[str, Any]) -> Optional[float]:
+    return await status_writer._flush_one(int(payload["driver_id"]))
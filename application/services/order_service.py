@@ -1,5 +1,8 @@
+from typing import Optional
+
 from ..services.base import BaseService
 from ..services.driver_service import DriverServiceAPI
+from ..services.types import DriverService
 
 
 class OrderServiceAPI(BaseService):
@@ -21,10 +24,10 @@ class OrderServiceAPI(BaseService):
             f"/orders/user/{telegram_id}/",
         )
 
-    async def add_new_driver(self, order_id, telegram_id):
+    async def add_new_driver(self, order_id, telegram_id, driver: Optional[DriverService] = None):
         try:
-            driver = await DriverServiceAPI().get_driver_by_telegram_id(telegram_id)
-            print(driver)
+            if driver is None:
+                driver = await DriverServiceAPI().get_driver_by_telegram_id(telegram_id)
             return await self._request(
                 "PATCH",
                 f"/orders/{order_id}/",
@@ -33,13 +36,3 @@ class OrderServiceAPI(BaseService):
         except Exception as e:
             print("Misatke is me: ", e)
 
-    async def get_active_orders(self, data):
-        try:
-            return await self._request(
-                "GET",
-                "/orders",
-                data=data,
-            )
-        except Exception as e:
-            print("Misatke is me: ", e)
-
@@ -1,45 +1,25 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Union
 
-from pydantic import BaseModel
+from ..core import codec
 
 
-class DriverService(BaseModel):
-    id: Optional[int] = None
-    telegram_id: Optional[int] = None
-    full_name: Optional[str] = None
-    total_rides: Optional[int] = None
-    phone: Optional[str] = None
-    from_location: dict = {}
-    to_location: dict = {}
-    route_id: Optional["RouteService"] = None
-    car_class: Optional[str] = None
-    rating: Optional[int] = None
-    status: str = 'offline'  # Default offline holati
-    amount: int = 150000  # Integer tipida
-    cars: List['CarService'] = []  # CarService obyektlar ro'yxati
-    full_profile_image_url: str = ""
-
-    class Config:
-        from_attributes = True
-
-
-@dataclass
+@dataclass(slots=True)
 class CityService:
     city_id: Optional[int] = None
     title: Optional[str] = None
     translate: Optional[dict] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RouteService:
     route_id: Optional[int] = None
     from_city: Optional[CityService] = None
     to_city: Optional[CityService] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TariffService:
     id: Optional[int] = None
     title: Optional[str] = None
@@ -48,7 +28,7 @@ class TariffService:
 
 
 
-@dataclass
+@dataclass(slots=True)
 class CarService:
     id: Optional[int] = None
     driver_id: Optional[int] = None
@@ -65,7 +45,99 @@ class CarService:
             self.tariff = TariffService(**self.tariff) if self.tariff else None
 
 
-@dataclass
+@dataclass(slots=True)
+class DriverService:
+    id: Optional[int] = None
+    telegram_id: Optional[int] = None
+    full_name: Optional[str] = None
+    total_rides: Optional[int] = None
+    phone: Optional[str] = None
+    from_location: dict = field(default_factory=dict)
+    to_location: dict = field(default_factory=dict)
+    route_id: Optional[RouteService] = None
+    car_class: Optional[str] = None
+    rating: Optional[int] = None
+    status: str = 'offline'  # Default offline holati
+    amount: int = 150000  # Integer tipida
+    cars: List[CarService] = field(default_factory=list)  # CarService obyektlar ro'yxati
+    full_profile_image_url: str = ""
+
+    @classmethod
+    def from_dict(cls, api_response: Dict[str, Any]) -> 'DriverService':
+        """API javobidan bir o'tishda DriverService yaratish"""
+        route = api_response.get('route_id')
+        if route:
+            route_id = RouteService(route_id=route.get("route_id"))
+            from_location = route.get('from_city') or {}
+            to_location = route.get('to_city') or {}
+        else:
+            route_id = RouteService(route_id=0)
+            from_location, to_location = {}, {}
+
+        cars = [
+            CarService(
+                id=car_data.get('id'),
+                car_number=car_data.get('car_number', ''),
+                car_model=car_data.get('car_model', ''),
+                car_color=car_data.get('car_color', ''),
+                tariff=car_data.get('tariff')
+            )
+            for car_data in api_response.get('cars', ())
+        ]
+
+        # Car class ni aniqlash (birinchi mashinaning tariffi asosida)
+        car_class = cars[0].tariff.title if cars and cars[0].tariff else None
+
+        return cls(
+            id=api_response.get('id'),
+            telegram_id=api_response.get('telegram_id'),
+            full_name=api_response.get('full_name'),
+            total_rides=api_response.get('total_rides', 0),
+            phone=api_response.get('phone'),
+            from_location=from_location,
+            to_location=to_location,
+            car_class=car_class,
+            route_id=route_id,
+            rating=api_response.get('rating', 5),
+            status=api_response.get('status', 'offline'),
+            amount=int(float(api_response.get('amount') or 0)) if 'amount' in api_response else 150000,
+            cars=cars,
+            full_profile_image_url=api_response.get('full_profile_image_url', '')
+        )
+
+    @classmethod
+    def from_json(cls, raw: Union[bytes, str]) -> 'DriverService':
+        """Raw JSON dan DriverService yaratish"""
+        return cls.from_dict(codec.loads(raw))
+
+    def to_compact(self) -> list:
+        """Kesh uchun ixcham ko'rinish: kalitlarsiz, maydonlar tartibida"""
+        return [
+            self.id, self.telegram_id, self.full_name, self.total_rides, self.phone,
+            self.from_location, self.to_location, self.route_id.route_id if self.route_id else None,
+            self.car_class, self.rating, self.status, self.amount,
+            [[car.id, car.car_number, car.car_model, car.car_color,
+              [car.tariff.id, car.tariff.title, car.tariff.translate, car.tariff.is_active] if car.tariff else None]
+             for car in self.cars],
+            self.full_profile_image_url,
+        ]
+
+    @classmethod
+    def from_compact(cls, data: list) -> 'DriverService':
+        (id_, telegram_id, full_name, total_rides, phone, from_location, to_location, route_id,
+         car_class, rating, status, amount, cars, image_url) = data
+        return cls(
+            id=id_, telegram_id=telegram_id, full_name=full_name, total_rides=total_rides, phone=phone,
+            from_location=from_location, to_location=to_location,
+            route_id=RouteService(route_id=route_id) if route_id is not None else None,
+            car_class=car_class, rating=rating, status=status, amount=amount,
+            cars=[CarService(id=c[0], car_number=c[1], car_model=c[2], car_color=c[3],
+                             tariff=TariffService(*c[4]) if c[4] else None) for c in cars],
+            full_profile_image_url=image_url,
+        )
+
+
+@dataclass(slots=True)
 class DriverTransactionService:
     id: Optional[int] = None
     driver_id: Optional[int] = None
@@ -77,53 +149,4 @@ class DriverTransactionService:
 # DriverService uchun konvertatsiya funksiyasi
 def convert_api_response_to_driver_service(api_response: dict) -> DriverService:
     """API javobini DriverService obyektiga aylantiradi"""
-
-    # Routedan shahar nomlarini olish
-    from_location = {}
-    to_location = {}
-
-    if api_response.get('route_id'):
-        route_id = RouteService(route_id=api_response.get('route_id', {}).get("route_id"))
-        route = api_response['route_id']
-        if route.get('from_city'):
-            from_location = route['from_city']
-        if route.get('to_city'):
-            to_location = route['to_city']
-    else:
-        route_id = RouteService(route_id=0)
-    # Mashinalarni konvertatsiya qilish
-    cars = []
-    for car_data in api_response.get('cars', []):
-        car = CarService(
-            id=car_data.get('id'),
-            car_number=car_data.get('car_number', ''),
-            car_model=car_data.get('car_model', ''),
-            car_color=car_data.get('car_color', ''),
-            tariff=car_data.get('tariff')
-        )
-        cars.append(car)
-
-    # Car class ni aniqlash (birinchi mashinaning tariffi asosida)
-    car_class = None
-    if cars and cars[0].tariff:
-        car_class = cars[0].tariff.title
-
-    # DriverService obyektini yaratish
-    driver = DriverService(
-        id=api_response.get('id'),
-        telegram_id=api_response.get('telegram_id'),
-        full_name=api_response.get('full_name'),
-        total_rides=api_response.get('total_rides', 0),
-        phone=api_response.get('phone'),
-        from_location=from_location,
-        to_location=to_location,
-        car_class=car_class,
-        route_id=route_id,
-        rating=api_response.get('rating', 5),
-        status=api_response.get('status', 'offline'),
-        amount=api_response.get('amount', 150000),
-        cars=cars,
-        full_profile_image_url=api_response.get('full_profile_image_url', '')
-    )
-
-    return driver
+    return DriverService.from_dict(api_response)
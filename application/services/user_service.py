@@ -5,6 +5,8 @@ from typing import Optional, Dict, Any
 
 from pydantic import BaseModel
 
+from ..core.async_cache import async_cached
+from ..core.config import settings
 from ..core.log import logger
 from ..services.base import BaseService
 
@@ -18,8 +20,25 @@ class UserService(BaseModel):
 
 
 class TelegramUserServiceAPI(BaseService):
-    async def get_user(self, telegram_id: int) -> Optional[UserService]:
-        """Get user by telegram ID"""
+    async def get_user(self, telegram_id: int, fresh: bool = False) -> Optional[UserService]:
+        """Get user by telegram ID; ``fresh=True`` keshni chetlab o'tadi (ban tekshiruvi uchun)"""
+        if not fresh:
+            return await self._cached_user(telegram_id)
+
+        user = await self._fetch_user(telegram_id)
+        if user is None:
+            self._cached_user.cache.invalidate(telegram_id)
+        else:
+            self._cached_user.cache.set(telegram_id, user)
+        return user
+
+    @async_cached(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL, name="users",
+                  key=lambda self, telegram_id: telegram_id, cache_if=lambda user: user is not None)
+    async def _cached_user(self, telegram_id: int) -> Optional[UserService]:
+        """Keshlangan user (topilmagan foydalanuvchi keshlanmaydi)"""
+        return await self._fetch_user(telegram_id)
+
+    async def _fetch_user(self, telegram_id: int) -> Optional[UserService]:
         try:
             data = await self._request('GET', f'/clients/by-telegram-id/{telegram_id}/')
 
@@ -45,7 +64,9 @@ class TelegramUserServiceAPI(BaseService):
                 logger.warning(f"Error creating user: {data['error']}")
                 return None
 
-            return self._dict_to_user(data)
+            user = self._dict_to_user(data)
+            self._cached_user.cache.set(user.telegram_id, user)
+            return user
         except Exception as e:
             logger.error(f"Error creating user: {str(e)}")
             return None
@@ -61,8 +82,8 @@ class TelegramUserServiceAPI(BaseService):
         return user.language
 
     async def is_ban_user(self, telegram_id: int) -> bool:
-        """Check if user is banned."""
-        user = await self.get_user(telegram_id)
+        """Check if user is banned (keshsiz - ban darhol kuchga kiradi)."""
+        user = await self.get_user(telegram_id, fresh=True)
         if user is None:
             return False
         return user.is_banned
\ No newline at end of file
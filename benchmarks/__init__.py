@@ -0,0 +1,5 @@
+"""
+Benchmarks and load tests.
+
+Run from the repository root, e.g. ``python -m benchmarks.loadtest --help``.
+"""
@@ -0,0 +1,132 @@
+"""
+Callback dispatch cost: one ``startswith`` filter per handler (the old
+telebot registration) versus the prefix-trie ``CallbackRouter``.
+
+Registers the bot's real patterns plus N synthetic ones, some of them
+state-bound, and dispatches a mix of callback data through both:
+
+    python -m benchmarks.bench_callback_router --patterns 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("BOT_TOKEN_PROD", "123456:stub")
+os.environ.setdefault("BOT_PAYMENT_TOKEN_DEMO", "stub")
+os.environ.setdefault("BOT_PAYMENT_TOKEN_PROD", "stub")
+os.environ.setdefault("FRONTEND_URL", "http://127.0.0.1")
+os.environ.setdefault("AUTH_TOKEN", "stub")
+os.environ.setdefault("API_HOST", "127.0.0.1")
+os.environ.setdefault("API_PORT", "8000")
+os.environ.setdefault("API_HOST_PROD", "127.0.0.1")
+
+from application.bot_app.handler.router import CallbackRouter  # noqa: E402
+from benchmarks.report import print_table  # noqa: E402
+
+BOT_PATTERNS = ["offline", "online", "balance", "back", "top_up_balance", "settings", "accept_", "chat",
+                "arrived_", "picked", "finished", "direction", "help", "cancel", "delete"]
+STATES = ["BalanceState:upload", "BotStates:details"]
+
+
+class StateStore:
+    """Stands in for telebot's state storage; counts lookups"""
+
+    def __init__(self, value: Optional[str]):
+        self.value = value
+        self.lookups = 0
+
+    async def get(self) -> Optional[str]:
+        self.lookups += 1
+        return self.value
+
+
+def build_routes(count: int, state_share: float) -> List[Tuple[str, Optional[str]]]:
+    routes = [(p, None) for p in BOT_PATTERNS]
+    for i in range(count):
+        state = random.choice(STATES) if random.random() < state_share else None
+        routes.append((f"action{i}_", state))
+    return routes
+
+
+def build_data(routes: List[Tuple[str, Optional[str]]], count: int) -> List[str]:
+    data = []
+    for _ in range(count):
+        pattern = random.choice(routes)[0]
+        data.append(pattern + str(random.randint(1, 10 ** 6)) if pattern.endswith("_") else pattern)
+    return data
+
+
+class LinearDispatch:
+    """The previous behaviour: filters evaluated in registration order"""
+
+    def __init__(self, routes, states):
+        self.handlers: List[Tuple[Callable, Optional[str], object]] = []
+        for i, (pattern, state) in enumerate(routes):
+            self.handlers.append((lambda c, p=pattern: c.startswith(p) if p else True, state, i))
+        for state in states:
+            self.handlers.append((lambda c: c, state, state))
+
+    async def resolve(self, data: str, get_state) -> Optional[object]:
+        for func, state, handler in self.handlers:
+            if not func(data):
+                continue
+            if state is not None and await get_state() != state:
+                continue
+            return handler
+        return None
+
+
+async def measure(dispatch, data: List[str], store: StateStore, repeat: int = 5) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        store.lookups = 0
+        started = time.perf_counter()
+        for item in data:
+            await dispatch.resolve(item, store.get)
+        best = min(best, time.perf_counter() - started)
+    return {
+        "us_per_call": round(best / len(data) * 1e6, 2),
+        "state_reads": round(store.lookups / len(data), 2),
+    }
+
+
+async def run(patterns: int, calls: int, state_share: float) -> Dict[str, dict]:
+    routes = build_routes(patterns, state_share)
+    data = build_data(routes, calls)
+
+    linear = LinearDispatch(routes, STATES)
+    router = CallbackRouter()
+    for i, (pattern, state) in enumerate(routes):
+        router.add(pattern, i, state)
+    for state in STATES:
+        router.add_state(state, state)
+
+    rows = {}
+    for label, user_state in (("no state", None), ("in state", STATES[0])):
+        store = StateStore(user_state)
+        for item in data[:1000]:
+            expected = await linear.resolve(item, store.get)
+            assert await router.resolve(item, store.get) == expected, item
+        rows[f"linear ({label})"] = await measure(linear, data, store)
+        rows[f"trie ({label})"] = await measure(router, data, store)
+    return rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patterns", type=int, default=500, help="synthetic patterns on top of the bot's own")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--state-share", type=float, default=0.1, help="fraction of patterns bound to a state")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+    rows = asyncio.run(run(args.patterns, args.calls, args.state_share))
+    print_table(f"Callback dispatch ({args.patterns + len(BOT_PATTERNS)} patterns)", rows)
+
+
+if __name__ == "__main__":
+    main()
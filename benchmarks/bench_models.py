@@ -0,0 +1,145 @@
+"""
+Construction cost and memory per object of the order and driver models.
+
+Compares the models in ``api_types`` / ``services.types`` with the
+baseline versions of the same modules, loaded from git (``--baseline``,
+default the ``baseline`` commit), on the payload shapes the bot receives:
+
+    python -m benchmarks.bench_models --count 2000 --repeat 50
+"""
+
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("BOT_TOKEN_PROD", "123456:stub")
+os.environ.setdefault("BOT_PAYMENT_TOKEN_DEMO", "stub")
+os.environ.setdefault("BOT_PAYMENT_TOKEN_PROD", "stub")
+os.environ.setdefault("FRONTEND_URL", "http://127.0.0.1")
+os.environ.setdefault("AUTH_TOKEN", "stub")
+os.environ.setdefault("API_HOST", "127.0.0.1")
+os.environ.setdefault("API_PORT", "8000")
+os.environ.setdefault("API_HOST_PROD", "127.0.0.1")
+
+from application.api.api_types import OrderTypes, DriverInfo  # noqa: E402
+from application.core import codec  # noqa: E402
+from application.services.types import DriverService  # noqa: E402
+from benchmarks import fixtures  # noqa: E402
+from benchmarks.report import print_table  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = "9fd8433"
+
+
+# ==================== BASELINE MODELS ====================
+
+def load_baseline(path: str, rev: str = BASELINE) -> ModuleType:
+    """``rev`` dagi ``path`` modulini (git show) alohida nom bilan yuklash"""
+    source = subprocess.run(["git", "show", f"{rev}:{path}"], cwd=ROOT, capture_output=True, text=True,
+                            check=True).stdout
+    package = path[:-3].replace("/", ".").rsplit(".", 1)[0]
+    name = f"baseline_{rev}.{path[:-3].replace('/', '.')}"
+    module = ModuleType(name)
+    module.__file__ = f"{rev}:{path}"
+    module.__package__ = package  # nisbiy importlar joriy paketdan
+    sys.modules[name] = module  # dataclass'lar modulni sys.modules dan qidiradi
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+# ==================== MEASUREMENT ====================
+
+def time_per_object(cases: Dict[str, tuple], repeat: int = 5) -> Dict[str, float]:
+    """
+    Best of ``repeat`` rounds; each round runs every case, so machine noise
+    hits them alike. GC is paused while timing - a collection landing in one
+    case's loop would otherwise dominate the difference.
+    """
+    best = {name: float("inf") for name in cases}
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            for name, (build, payloads) in cases.items():
+                started = time.perf_counter()
+                for payload in payloads:
+                    build(payload)
+                best[name] = min(best[name], (time.perf_counter() - started) / len(payloads))
+        finally:
+            gc.enable()
+    return best
+
+
+def bytes_per_object(build: Callable, payloads: List[Any]) -> float:
+    """Memory retained by the built objects, excluding the input payloads"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(payload) for payload in payloads]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / len(payloads)
+
+
+def order_with_route(order_cls) -> Callable[[Dict[str, Any]], Any]:
+    """Build an order and touch its route (baseline builds it eagerly, current lazily)"""
+    def build(data: Dict[str, Any]):
+        order = order_cls.from_dict(data)
+        order.content_object.route
+        return order
+
+    return build
+
+
+def run(count: int, rev: str = BASELINE, repeat: int = 50) -> Dict[str, dict]:
+    old_api = load_baseline("application/api/api_types.py", rev)
+    old_types = load_baseline("application/services/types.py", rev)
+
+    routes = fixtures.make_routes()
+    orders = [fixtures.make_order(i, routes[i % len(routes)], 1) for i in range(count)]
+    drivers = fixtures.make_drivers(count, routes)
+    order_bytes = [codec.dumps(o) for o in orders]
+    driver_infos = [d["driver_info"] for d in drivers]
+
+    cases = {
+        "order baseline": (old_api.OrderTypes.from_dict, orders),
+        "order current": (OrderTypes.from_dict, orders),
+        "order current from_json": (OrderTypes.from_json, order_bytes),
+        "order baseline + route": (order_with_route(old_api.OrderTypes), orders),
+        "order current + route": (order_with_route(OrderTypes), orders),
+        "driver baseline": (old_types.convert_api_response_to_driver_service, drivers),
+        "driver current": (DriverService.from_dict, drivers),
+        "driver_info baseline": (old_api.DriverInfo.from_dict, driver_infos),
+        "driver_info current": (DriverInfo.from_dict, driver_infos),
+    }
+
+    times = time_per_object(cases, repeat)
+    return {
+        name: {
+            "us_per_obj": round(times[name] * 1e6, 2),
+            "bytes_per_obj": round(bytes_per_object(build, payloads)),
+        }
+        for name, (build, payloads) in cases.items()
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--baseline", default=BASELINE, help="git revision to compare against")
+    parser.add_argument("--repeat", type=int, default=50, help="rounds over all cases, best is reported")
+    args = parser.parse_args(argv)
+    print_table(f"Model construction ({args.count} objects, baseline={args.baseline}, codec={codec.codec.name})",
+                run(args.count, args.baseline, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
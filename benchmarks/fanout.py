@@ -0,0 +1,281 @@
+"""
+Order fan-out simulator for the ``/driver`` dispatch path.
+
+Generates N online drivers across routes and tariffs, fires M orders per
+second straight into ``OrderResponse.control`` (matching -> message
+rendering -> offer dispatcher) and measures, per order, the time from receipt
+until the first, median and last driver gets the offer, and until one of
+the simulated drivers claims it through the real ``accept_`` handler.
+
+Everything runs in this process against the stub Bot API and backend;
+only a local Redis is needed, as for the app itself:
+
+    python -m benchmarks.fanout --drivers 2000 --orders-per-second 5 --duration 20 --workers 3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import re
+import socket
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks import fixtures, updates
+from benchmarks.report import print_table, summarize, write_json
+from benchmarks.stubs import StubBackendAPI, StubTelegramAPI
+
+OFFER_PATTERN = re.compile(r"accept_(travel|delivery)_(\d+)")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _configure_environment(args, backend_port: int) -> None:
+    """Settings are read at import time, so the environment is prepared first"""
+    os.environ.update({
+        "DEBUG": "true",
+        "BOT_TOKEN_DEMO": "123456:stub",
+        "BOT_TOKEN_PROD": "123456:stub",
+        "BOT_PAYMENT_TOKEN_DEMO": "stub",
+        "BOT_PAYMENT_TOKEN_PROD": "stub",
+        "FRONTEND_URL": "http://127.0.0.1",
+        "AUTH_TOKEN": "stub",
+        "API_HOST": "127.0.0.1",
+        "API_PORT": str(backend_port),
+        "API_HOST_PROD": f"127.0.0.1:{backend_port}",
+        "OFFER_QUEUE_WORKERS": str(args.workers),
+        "OFFER_QUEUE_BATCH_SIZE": str(args.batch_size),
+        "LOOP_MONITOR_ENABLED": "false",
+        "REDIS_URL_DEMO": args.redis_url,
+    })
+    if args.wave_size is not None:
+        os.environ["OFFER_WAVES"] = json.dumps({"default": {
+            "size": args.wave_size, "interval": args.wave_interval, "max_waves": args.max_waves,
+        }})
+
+
+class FakeRequest:
+    """Minimal stand-in for ``starlette.requests.Request``"""
+
+    def __init__(self, payload: dict):
+        self._body = json.dumps(payload).encode()
+
+    async def body(self) -> bytes:
+        return self._body
+
+
+class FanoutSimulation:
+
+    def __init__(self, args):
+        self.args = args
+        self.routes = fixtures.make_routes()[:args.routes]
+        self.drivers = fixtures.make_drivers(args.drivers, self.routes)
+        self.telegram = StubTelegramAPI(latency=args.tg_latency, rate_429=args.tg_429_rate)
+        self.backend = StubBackendAPI(self.drivers, latency=args.backend_latency)
+        self.received_at: Dict[int, float] = {}
+        self.offers: Dict[int, List[float]] = defaultdict(list)
+        self.late_offers = 0
+        self.claim_tasks: List[asyncio.Task] = []
+
+    async def start(self, backend_port: int) -> None:
+        await self.telegram.start()
+        await self.backend.start(backend_port)
+
+        from telebot import asyncio_helper
+        asyncio_helper.API_URL = self.telegram.api_url
+        self.telegram.listeners.append(self._on_telegram_call)
+
+        from application.bot_app.handler import setup_handlers
+        from application.core.i18n import init_translations
+        from application.database.cache import cache
+
+        from application.api.offers import CLOSED_KEY, MESSAGES_KEY, RETRACT_KEY, offer_dispatcher
+        from application.core.scheduler import DUE_KEY, JOBS_KEY, scheduler
+        from application.services.driver_session import SESSION_KEY
+
+        await cache.connect()
+        await init_translations(cache.client)
+        # State left over from earlier runs: sessions would hit the active-order
+        # limit and order ids are reused, so their offers would look closed
+        total = int(self.args.orders_per_second * self.args.duration)
+        await cache.client.delete(*(SESSION_KEY.format(d["telegram_id"]) for d in self.drivers),
+                                  *(CLOSED_KEY.format(i + 1) for i in range(total)),
+                                  *(MESSAGES_KEY.format(i + 1) for i in range(total)), RETRACT_KEY, DUE_KEY, JOBS_KEY)
+        done = [key async for key in cache.client.scan_iter("scheduler:done:*")]
+        if done:
+            await cache.client.delete(*done)
+        await setup_handlers()
+        await offer_dispatcher.start(cache.client)
+        await scheduler.start()
+        logging.getLogger("application").setLevel(self.args.log_level)
+        logging.getLogger("TeleBot").setLevel(self.args.log_level)
+
+    async def stop(self) -> None:
+        from application.core.bot import bot
+        from application.database.cache import cache
+
+        from application.api.offers import offer_dispatcher
+        from application.core.scheduler import scheduler
+
+        await scheduler.stop()
+        await offer_dispatcher.stop()
+        await bot.close_session()
+        await cache.disconnect()
+        await self.telegram.stop()
+        await self.backend.stop()
+
+    def _on_telegram_call(self, method: str, params: dict, now: float) -> None:
+        if method != "sendMessage":
+            return
+        match = OFFER_PATTERN.search(str(params.get("reply_markup", "")))
+        if not match:
+            return
+
+        order_id = int(match.group(2))
+        self.offers[order_id].append(now)
+        if order_id in self.backend.assigned_at:
+            self.late_offers += 1
+        elif random.random() < self.args.accept_probability:
+            chat_id = int(params["chat_id"])
+            data = f"accept_{match.group(1)}_{order_id}"
+            self.claim_tasks.append(asyncio.create_task(self._claim(chat_id, data)))
+
+    async def _claim(self, telegram_id: int, data: str) -> None:
+        """A driver taps accept after a human reaction delay"""
+        from telebot.types import Update
+        from application.core.bot import bot
+
+        await asyncio.sleep(random.uniform(*self.args.reaction))
+        await bot.process_new_updates([Update.de_json(updates.callback(telegram_id, data))])
+
+    async def _dispatch(self, order: dict) -> None:
+        from application.api.order_service import OrderResponse
+
+        self.backend.add_order(order)
+        response = OrderResponse(FakeRequest(order))
+        self.received_at[order["id"]] = time.perf_counter()
+        await response.control()
+
+    async def run(self) -> float:
+        total = int(self.args.orders_per_second * self.args.duration)
+        interval = 1.0 / self.args.orders_per_second
+        tasks = []
+        started = time.perf_counter()
+        for i in range(total):
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            route = random.choice(self.routes)
+            order = fixtures.make_order(i + 1, route, random.choice((1, 2, 3, 4)))
+            tasks.append(asyncio.create_task(self._dispatch(order)))
+        await asyncio.gather(*tasks)
+        await asyncio.sleep(self.args.drain)
+        await asyncio.gather(*self.claim_tasks, return_exceptions=True)
+        return time.perf_counter() - started
+
+    @staticmethod
+    def _offers_avoided() -> int:
+        from application.api.offers import offer_sends_avoided_total
+        return int(offer_sends_avoided_total.total())
+
+    @staticmethod
+    def _offers_retracted() -> int:
+        from application.api.offers import offer_retractions_total
+        return int(offer_retractions_total.value(result="edited"))
+
+    def report(self, wall_time: float) -> dict:
+        first, median, last, claim = [], [], [], []
+        for order_id, received in self.received_at.items():
+            times = sorted(self.offers.get(order_id, ()))
+            if times:
+                first.append(times[0] - received)
+                median.append(statistics.median(times) - received)
+                last.append(times[-1] - received)
+            if order_id in self.backend.assigned_at:
+                claim.append(self.backend.assigned_at[order_id] - received)
+
+        total_offers = sum(len(v) for v in self.offers.values())
+        return {
+            "config": {k: v for k, v in vars(self.args).items()},
+            "wall_time_s": round(wall_time, 2),
+            "orders": len(self.received_at),
+            "orders_claimed": len(claim),
+            "offers_sent": total_offers,
+            "offers_after_claim": self.late_offers,
+            "offers_avoided": self._offers_avoided(),
+            "offers_retracted": self._offers_retracted(),
+            "latency": {
+                "first_offer": summarize(first),
+                "median_offer": summarize(median),
+                "last_offer": summarize(last),
+                "time_to_claim": summarize(claim),
+            },
+            "telegram": self.telegram.summary(),
+            "backend": self.backend.summary(),
+        }
+
+
+async def main(args) -> None:
+    random.seed(args.seed)
+    backend_port = _free_port()
+    _configure_environment(args, backend_port)
+
+    simulation = FanoutSimulation(args)
+    # The dispatch path prints per message; keep that cost but not the noise
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    with quiet:
+        await simulation.start(backend_port)
+        try:
+            wall_time = await simulation.run()
+        finally:
+            await simulation.stop()
+
+    report = simulation.report(wall_time)
+    print_table("Order fan-out (from order receipt)", report["latency"])
+    print(f"\norders={report['orders']} claimed={report['orders_claimed']} "
+          f"offers_sent={report['offers_sent']} offers_after_claim={report['offers_after_claim']} "
+          f"offers_avoided={report['offers_avoided']} offers_retracted={report['offers_retracted']}")
+    if args.json:
+        write_json(args.json, report)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drivers", type=int, default=1000, help="online drivers")
+    parser.add_argument("--routes", type=int, default=4, help="routes the drivers are spread over")
+    parser.add_argument("--orders-per-second", type=float, default=2)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=3, help="offer dispatcher workers")
+    parser.add_argument("--batch-size", type=int, default=5, help="offer dispatcher batch size")
+    parser.add_argument("--wave-size", type=int, default=None,
+                        help="drivers per offer wave (0 = everyone at once; default: the app's OFFER_WAVES)")
+    parser.add_argument("--wave-interval", type=float, default=10.0, help="seconds between waves")
+    parser.add_argument("--max-waves", type=int, default=4)
+    parser.add_argument("--accept-probability", type=float, default=0.2,
+                        help="chance that a driver taps accept on an offer")
+    parser.add_argument("--reaction", type=float, nargs=2, default=(1.0, 4.0),
+                        metavar=("MIN", "MAX"), help="driver reaction time range (s)")
+    parser.add_argument("--drain", type=float, default=5.0, help="seconds to wait for queued offers")
+    parser.add_argument("--tg-latency", type=float, default=0.03)
+    parser.add_argument("--tg-429-rate", type=float, default=0.0)
+    parser.add_argument("--backend-latency", type=float, default=0.02)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's stdout")
+    parser.add_argument("--json", help="write the report to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,143 @@
+"""
+Synthetic data shared by the stub services and the load generators.
+
+Shapes follow what the bot reads from the backend: drivers as returned by
+``/drivers/by-telegram-id/`` (plus ``driver_info`` in list results), clients
+as returned by ``/clients/by-telegram-id/`` and orders as posted to ``/driver``.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+CITIES = [
+    ("tashkent", {"uz": "Toshkent", "ru": "Ташкент", "en": "Tashkent"}),
+    ("qoqon", {"uz": "Qo'qon", "ru": "Коканд", "en": "Kokand"}),
+    ("andijan", {"uz": "Andijon", "ru": "Андижан", "en": "Andijan"}),
+    ("namangan", {"uz": "Namangan", "ru": "Наманган", "en": "Namangan"}),
+    ("fargona", {"uz": "Farg'ona", "ru": "Фергана", "en": "Fergana"}),
+]
+
+TARIFFS = [
+    {"id": 1, "title": "economy", "translate": {"uz": "Ekonom", "ru": "Эконом", "en": "Economy"}, "is_active": True},
+    {"id": 2, "title": "comfort", "translate": {"uz": "Komfort", "ru": "Комфорт", "en": "Comfort"}, "is_active": True},
+    {"id": 3, "title": "business", "translate": {"uz": "Biznes", "ru": "Бизнес", "en": "Business"}, "is_active": True},
+]
+
+LANGUAGES = ("uz", "ru", "en")
+
+# Telegram ids of synthetic users start here so they never clash with real ones
+TELEGRAM_ID_BASE = 9_000_000_000
+
+
+def make_cities() -> List[Dict[str, Any]]:
+    return [
+        {"id": i + 1, "city_id": i + 1, "title": title, "translate": translate,
+         "is_allowed": True, "subcategory": None}
+        for i, (title, translate) in enumerate(CITIES)
+    ]
+
+
+def make_routes() -> List[Dict[str, Any]]:
+    """Every ordered pair of cities is a route"""
+    cities = make_cities()
+    routes = []
+    for a in cities:
+        for b in cities:
+            if a["id"] != b["id"]:
+                routes.append({
+                    "route_id": len(routes) + 1,
+                    "from_city": {"city_id": a["id"], "title": a["title"], "translate": a["translate"]},
+                    "to_city": {"city_id": b["id"], "title": b["title"], "translate": b["translate"]},
+                })
+    return routes
+
+
+def make_driver(index: int, route: Dict[str, Any], tariff: Dict[str, Any], status: str = "online",
+                amount: int = 500_000) -> Dict[str, Any]:
+    telegram_id = TELEGRAM_ID_BASE + index
+    language = LANGUAGES[index % len(LANGUAGES)]
+    return {
+        "id": index + 1,
+        "telegram_id": telegram_id,
+        "full_name": f"Driver {index}",
+        "total_rides": index % 50,
+        "phone": f"99890{index:07d}",
+        "route_id": route,
+        "rating": 5,
+        "status": status,
+        "amount": amount,
+        "is_busy": False,
+        "cars": [{
+            "id": index + 1,
+            "car_number": f"01A{index:03d}AA",
+            "car_model": "Cobalt",
+            "car_color": "white",
+            "tariff": tariff,
+        }],
+        "full_profile_image_url": "",
+        "driver_info": {
+            "id": index + 1,
+            "telegram_id": telegram_id,
+            "username": f"driver{index}",
+            "full_name": f"Driver {index}",
+            "language": language,
+            "is_banned": False,
+            "created_at": "2025-11-30T20:48:46Z",
+            "updated_at": "2025-11-30T22:45:15Z",
+        },
+    }
+
+
+def make_drivers(count: int, routes: List[Dict[str, Any]], route_count: int = None) -> List[Dict[str, Any]]:
+    """Spread drivers round-robin over the first ``route_count`` routes and all tariffs"""
+    routes = routes[:route_count] if route_count else routes
+    return [
+        make_driver(i, routes[i % len(routes)], TARIFFS[(i // len(routes)) % len(TARIFFS)])
+        for i in range(count)
+    ]
+
+
+def make_client(telegram_id: int, language: str = "uz") -> Dict[str, Any]:
+    return {
+        "user_id": telegram_id - TELEGRAM_ID_BASE + 1,
+        "telegram_id": telegram_id,
+        "full_name": f"User {telegram_id}",
+        "language": language,
+        "is_banned": False,
+        "username": None,
+    }
+
+
+def make_order(order_id: int, route: Dict[str, Any], tariff_id: int, order_type: str = "travel",
+               status: str = "created") -> Dict[str, Any]:
+    start_time = datetime.now(timezone.utc) + timedelta(minutes=random.randint(10, 240))
+    return {
+        "id": order_id,
+        "user": TELEGRAM_ID_BASE - order_id,
+        "creator": {
+            "id": order_id,
+            "telegram_id": TELEGRAM_ID_BASE - order_id,
+            "language": "uz",
+            "full_name": f"Passenger {order_id}",
+            "total_rides": 0,
+            "phone": f"99833{order_id:07d}",
+            "rating": 5,
+        },
+        "driver_details": None,
+        "status": status,
+        "order_type": order_type,
+        "content_object": {
+            "price": random.choice((100_000, 120_000, 150_000)),
+            "route": route,
+            "from_location": {"city": route["from_city"]["title"], "location": None},
+            "to_location": {"city": route["to_city"]["title"], "location": None},
+            "cashback": 5_000,
+            "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "tariff_id": tariff_id,
+            "comment": "",
+            "start_time": start_time.isoformat().replace("+00:00", "Z"),
+            "passenger": random.randint(1, 4),
+            "has_woman": random.random() < 0.3,
+        },
+    }
@@ -0,0 +1,222 @@
+"""
+Load test for the webhook and ``/driver`` endpoints.
+
+Starts a stub Telegram Bot API and a stub backend in this process, the
+FastAPI app in a subprocess pointed at both, then replays a synthetic mix
+of updates (start, callbacks, location, payments) and order events at a
+fixed arrival rate. Latency is measured from the scheduled send time, so
+a slow app cannot hide behind a slower arrival rate.
+
+The app still needs Redis:
+
+    python -m benchmarks.loadtest --rate 100 --duration 30 --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict
+
+import aiohttp
+
+from benchmarks import fixtures, updates
+from benchmarks.report import LatencyRecorder, print_table, write_json
+from benchmarks.stubs import StubBackendAPI, StubTelegramAPI
+
+DEFAULT_MIX = "start=1,callback=6,accept=1,location=1,payment=1,order=1"
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class LoadTest:
+
+    def __init__(self, args):
+        self.args = args
+        self.routes = fixtures.make_routes()
+        self.drivers = fixtures.make_drivers(args.drivers, self.routes, route_count=args.routes)
+        self.telegram = StubTelegramAPI(latency=args.tg_latency, rate_429=args.tg_429_rate)
+        self.backend = StubBackendAPI(self.drivers, latency=args.backend_latency)
+        self.recorder = LatencyRecorder()
+        self.order_ids = itertools.count(1)
+        self.open_orders = []
+        self.app_process = None
+        self.app_url = f"http://127.0.0.1:{args.app_port}"
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self) -> None:
+        await self.telegram.start()
+        await self.backend.start()
+
+        env = dict(os.environ)
+        env.update({
+            "DEBUG": "true",
+            "PORT": str(self.args.app_port),
+            "TELEGRAM_API_URL": self.telegram.api_url,
+            "APP_LOG_LEVEL": self.args.app_log_level,
+            "BOT_TOKEN_DEMO": "123456:stub",
+            "BOT_TOKEN_PROD": "123456:stub",
+            "BOT_PAYMENT_TOKEN_DEMO": "stub",
+            "BOT_PAYMENT_TOKEN_PROD": "stub",
+            "FRONTEND_URL": "http://127.0.0.1",
+            "AUTH_TOKEN": "stub",
+            "API_HOST": self.backend.host,
+            "API_PORT": str(self.backend.port),
+            "API_HOST_PROD": f"{self.backend.host}:{self.backend.port}",
+            "REDIS_URL_DEMO": self.args.redis_url,
+        })
+        self.app_process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serve_app"],
+            env=env,
+            stdout=None if self.args.app_output else subprocess.DEVNULL,
+            stderr=None if self.args.app_output else subprocess.DEVNULL,
+        )
+        await self._wait_ready()
+
+    async def _wait_ready(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        async with aiohttp.ClientSession() as session:
+            while time.monotonic() < deadline:
+                if self.app_process.poll() is not None:
+                    raise RuntimeError("App process exited during startup (rerun with --app-output)")
+                try:
+                    async with session.get(self.app_url + "/") as response:
+                        if response.status == 200:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError("App did not become ready")
+
+    async def stop(self) -> None:
+        if self.app_process and self.app_process.poll() is None:
+            self.app_process.terminate()
+            try:
+                self.app_process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.app_process.kill()
+        await self.telegram.stop()
+        await self.backend.stop()
+
+    # ==================== TRAFFIC ====================
+
+    def _random_driver(self) -> dict:
+        return random.choice(self.drivers)
+
+    def _build(self, kind: str):
+        """Return (path, payload) for one synthetic request"""
+        driver = self._random_driver()
+        telegram_id = driver["telegram_id"]
+
+        if kind == "order":
+            route = random.choice(self.routes[:self.args.routes])
+            order = fixtures.make_order(next(self.order_ids), route, random.choice((1, 2, 3, 4)))
+            self.backend.add_order(order)
+            self.open_orders.append(order["id"])
+            return "/driver", order
+        if kind == "accept" and self.open_orders:
+            order_id = random.choice(self.open_orders)
+            return "/webhook", updates.callback(telegram_id, f"accept_travel_{order_id}")
+        if kind == "start":
+            return "/webhook", updates.start(telegram_id)
+        if kind == "location":
+            return "/webhook", updates.location(telegram_id)
+        if kind == "payment":
+            return "/webhook", updates.payment(telegram_id)
+        return "/webhook", updates.callback(telegram_id)
+
+    async def _fire(self, session: aiohttp.ClientSession, kind: str, scheduled: float) -> None:
+        path, payload = self._build(kind)
+        ok = True
+        try:
+            async with session.post(self.app_url + path, json=payload) as response:
+                body = await response.read()
+                ok = response.status == 200 and b'"status":"error"' not in body
+        except Exception:
+            ok = False
+        self.recorder.record(kind, time.perf_counter() - scheduled, ok)
+
+    async def run(self) -> float:
+        """Open-loop arrival process; returns the wall time"""
+        mix = parse_mix(self.args.mix)
+        kinds, weights = list(mix), list(mix.values())
+        total = int(self.args.rate * self.args.duration)
+        interval = 1.0 / self.args.rate
+
+        connector = aiohttp.TCPConnector(limit=self.args.connections)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            # Warm up connections, handler registration and caches
+            for _ in range(self.args.warmup):
+                await self._fire(session, "callback", time.perf_counter())
+            self.recorder = LatencyRecorder()
+
+            tasks = []
+            started = time.perf_counter()
+            for i in range(total):
+                scheduled = started + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                kind = random.choices(kinds, weights)[0]
+                tasks.append(asyncio.create_task(self._fire(session, kind, scheduled)))
+            await asyncio.gather(*tasks)
+            return time.perf_counter() - started
+
+
+async def main(args) -> None:
+    random.seed(args.seed)
+    test = LoadTest(args)
+    await test.start()
+    try:
+        wall_time = await test.run()
+    finally:
+        await test.stop()
+
+    report = {
+        "config": vars(args),
+        "wall_time_s": round(wall_time, 2),
+        "requests": test.recorder.report(wall_time),
+        "telegram": test.telegram.summary(),
+        "backend": test.backend.summary(),
+    }
+    print_table(f"Latency from scheduled send ({wall_time:.1f}s wall)", report["requests"])
+    print_table("Telegram API calls", {k: {"calls": v} for k, v in report["telegram"]["calls"].items()})
+    print_table("Backend calls", {k: {"calls": v} for k, v in report["backend"]["calls"].items()})
+    if args.json:
+        write_json(args.json, report)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=50, help="requests per second")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted request mix")
+    parser.add_argument("--drivers", type=int, default=500)
+    parser.add_argument("--routes", type=int, default=4, help="number of routes drivers are spread over")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--tg-latency", type=float, default=0.03, help="stub Bot API latency (s)")
+    parser.add_argument("--tg-429-rate", type=float, default=0.0, help="fraction of Bot API calls answered 429")
+    parser.add_argument("--backend-latency", type=float, default=0.02, help="stub backend latency (s)")
+    parser.add_argument("--app-port", type=int, default=18000)
+    parser.add_argument("--app-log-level", default="WARNING")
+    parser.add_argument("--app-output", action="store_true", help="show app stdout/stderr")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the report to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
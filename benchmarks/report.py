@@ -0,0 +1,71 @@
+"""
+Latency recording and report formatting shared by the benchmarks.
+"""
+
+import json
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """p50/p95/p99/max in milliseconds"""
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else float("nan"),
+    }
+
+
+class LatencyRecorder:
+    """Collects latencies and errors per operation name"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, seconds: float, ok: bool = True) -> None:
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self, wall_time: Optional[float] = None) -> Dict[str, dict]:
+        result = {}
+        for name, values in sorted(self.latencies.items()):
+            row = summarize(values)
+            row["errors"] = self.errors.get(name, 0)
+            row["error_rate"] = round(row["errors"] / row["count"], 4) if row["count"] else 0.0
+            if wall_time:
+                row["throughput_rps"] = round(row["count"] / wall_time, 2)
+            result[name] = row
+        return result
+
+
+def print_table(title: str, rows: Dict[str, dict]) -> None:
+    """Print a report as an aligned text table"""
+    print(f"\n== {title} ==")
+    if not rows:
+        print("(no data)")
+        return
+    columns = list(next(iter(rows.values())).keys())
+    width = max(len(name) for name in rows) + 2
+    widths = [max(12, len(c)) + 2 for c in columns]
+    print("".ljust(width) + "".join(c.rjust(w) for c, w in zip(columns, widths)))
+    for name, row in rows.items():
+        print(name.ljust(width) + "".join(str(row.get(c, "")).rjust(w) for c, w in zip(columns, widths)))
+
+
+def write_json(path: str, data: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,22 @@
+"""
+Run the FastAPI app against the stub Telegram Bot API.
+
+Started as a subprocess by ``benchmarks.loadtest`` so the app gets its own
+event loop; configuration comes from the environment.
+"""
+
+import logging
+import os
+
+import uvicorn
+from telebot import asyncio_helper
+
+asyncio_helper.API_URL = os.environ["TELEGRAM_API_URL"]
+
+from application.core.app import app  # noqa: E402
+
+if __name__ == "__main__":
+    level = os.environ.get("APP_LOG_LEVEL", "WARNING")
+    logging.getLogger("application").setLevel(level)
+    logging.getLogger("TeleBot").setLevel(level)
+    uvicorn.run(app, host="127.0.0.1", port=int(os.environ["PORT"]), log_level=level.lower(), access_log=False)
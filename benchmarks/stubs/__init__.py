@@ -0,0 +1,8 @@
+"""
+Local stand-ins for the Telegram Bot API and the DRF backend
+"""
+
+from .telegram import StubTelegramAPI
+from .backend import StubBackendAPI
+
+__all__ = ['StubTelegramAPI', 'StubBackendAPI']
@@ -0,0 +1,170 @@
+"""
+Stub DRF backend serving ``/drivers/``, ``/clients/``, ``/orders/``,
+``/cities/`` and ``/transactions/`` from in-memory fixtures.
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from benchmarks import fixtures
+
+
+class StubBackendAPI:
+
+    def __init__(self, drivers: List[Dict[str, Any]], latency: float = 0.02, jitter: float = 0.005,
+                 prefix: str = "/api/v1"):
+        self.latency = latency
+        self.jitter = jitter
+        self.prefix = prefix
+        self.routes = fixtures.make_routes()
+        self.cities = fixtures.make_cities()
+        self.drivers_by_id: Dict[int, Dict[str, Any]] = {d["id"]: d for d in drivers}
+        self.drivers_by_tg: Dict[int, Dict[str, Any]] = {d["telegram_id"]: d for d in drivers}
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.assigned_at: Dict[int, float] = {}
+        self.calls: Counter = Counter()
+        self._runner: Optional[web.AppRunner] = None
+        self.host = "127.0.0.1"
+        self.port: Optional[int] = None
+
+    def add_order(self, order: Dict[str, Any]) -> None:
+        self.orders[order["id"]] = order
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._latency_middleware])
+        p = self.prefix
+        app.router.add_get(p + "/drivers/", self.list_drivers)
+        app.router.add_get(p + "/drivers/by-telegram-id/{telegram_id}/", self.driver_by_telegram_id)
+        app.router.add_get(p + "/drivers/{driver_id}/", self.get_driver)
+        app.router.add_patch(p + "/drivers/{driver_id}/", self.update_driver)
+        app.router.add_patch(p + "/drivers/{driver_id}/update-route/", self.update_route)
+        app.router.add_get(p + "/clients/by-telegram-id/{telegram_id}/", self.client_by_telegram_id)
+        app.router.add_post(p + "/clients/", self.create_client)
+        app.router.add_get(p + "/orders/{order_id}/driver", self.get_order)
+        app.router.add_patch(p + "/orders/{order_id}/", self.update_order)
+        app.router.add_get(p + "/cities/", self.list_cities)
+        app.router.add_post(p + "/transactions/", self.create_transaction)
+        return app
+
+    async def start(self, port: int = 0) -> None:
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _latency_middleware(self, request: web.Request, handler):
+        self.calls[f"{request.method} {request.match_info.route.resource.canonical}"] += 1
+        if self.latency:
+            await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        return await handler(request)
+
+    # ==================== DRIVERS ====================
+
+    async def list_drivers(self, request: web.Request) -> web.Response:
+        q = request.query
+        results = list(self.drivers_by_id.values())
+        if "route_id" in q:
+            route_id = int(q["route_id"])
+            results = [d for d in results if d["route_id"]["route_id"] == route_id]
+        if "status" in q:
+            results = [d for d in results if d["status"] == q["status"]]
+        if "tariff_id" in q:
+            tariff_id = int(q["tariff_id"])
+            results = [d for d in results if d["cars"] and d["cars"][0]["tariff"]["id"] == tariff_id]
+        if "min_amount" in q:
+            min_amount = int(q["min_amount"])
+            results = [d for d in results if d["amount"] >= min_amount]
+        if q.get("exclude_busy") == "true":
+            results = [d for d in results if not d.get("is_busy")]
+        if q.get("ordering") == "-amount":
+            results.sort(key=lambda d: -d["amount"])
+        return web.json_response({"count": len(results), "next": None, "previous": None, "results": results})
+
+    async def driver_by_telegram_id(self, request: web.Request) -> web.Response:
+        driver = self.drivers_by_tg.get(int(request.match_info["telegram_id"]))
+        if driver is None:
+            return web.json_response({"detail": "Not found."}, status=404)
+        return web.json_response(driver)
+
+    async def get_driver(self, request: web.Request) -> web.Response:
+        driver = self.drivers_by_id.get(int(request.match_info["driver_id"]))
+        if driver is None:
+            return web.json_response({"detail": "Not found."}, status=404)
+        return web.json_response(driver)
+
+    async def update_driver(self, request: web.Request) -> web.Response:
+        driver = self.drivers_by_id.get(int(request.match_info["driver_id"]))
+        if driver is None:
+            return web.json_response({"detail": "Not found."}, status=404)
+        driver.update(await request.json())
+        return web.json_response(driver)
+
+    async def update_route(self, request: web.Request) -> web.Response:
+        driver = self.drivers_by_id.get(int(request.match_info["driver_id"]))
+        if driver is None:
+            return web.json_response({"detail": "Not found."}, status=404)
+        route = driver["route_id"]
+        reverse = next((r for r in self.routes
+                        if r["from_city"]["city_id"] == route["to_city"]["city_id"]
+                        and r["to_city"]["city_id"] == route["from_city"]["city_id"]), route)
+        driver["route_id"] = reverse
+        return web.json_response(driver)
+
+    # ==================== CLIENTS ====================
+
+    async def client_by_telegram_id(self, request: web.Request) -> web.Response:
+        telegram_id = int(request.match_info["telegram_id"])
+        driver = self.drivers_by_tg.get(telegram_id)
+        language = driver["driver_info"]["language"] if driver else "uz"
+        return web.json_response(fixtures.make_client(telegram_id, language))
+
+    async def create_client(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        return web.json_response(fixtures.make_client(int(data["telegram_id"])), status=201)
+
+    # ==================== ORDERS ====================
+
+    async def get_order(self, request: web.Request) -> web.Response:
+        order = self.orders.get(int(request.match_info["order_id"]))
+        if order is None:
+            return web.json_response({"detail": "Not found."}, status=404)
+        return web.json_response(order)
+
+    async def update_order(self, request: web.Request) -> web.Response:
+        order = self.orders.get(int(request.match_info["order_id"]))
+        if order is None:
+            return web.json_response({"detail": "Not found."}, status=404)
+        data = await request.json()
+
+        if data.get("status") == "assigned":
+            if order["status"] != "created":
+                return web.json_response({"detail": "Order already taken."}, status=400)
+            self.assigned_at[order["id"]] = time.perf_counter()
+            driver = self.drivers_by_id.get(data.get("driver"))
+            order["driver_details"] = driver and {"id": driver["id"], "telegram_id": driver["telegram_id"]}
+
+        order.update({k: v for k, v in data.items() if k != "driver"})
+        return web.json_response(order)
+
+    # ==================== MISC ====================
+
+    async def list_cities(self, request: web.Request) -> web.Response:
+        return web.json_response({"count": len(self.cities), "next": None, "previous": None, "results": self.cities})
+
+    async def create_transaction(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        return web.json_response({"id": random.randint(1, 10 ** 9), **data}, status=201)
+
+    def summary(self) -> dict:
+        return {"calls": dict(self.calls)}
@@ -0,0 +1,118 @@
+"""
+Stub Telegram Bot API server.
+
+Answers the methods the bot uses (send/edit/answer/delete/setWebhook...)
+with realistic payloads, optional latency and 429 injection, and records
+every call so scenarios can measure delivery times.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+MESSAGE_METHODS = {"sendMessage", "editMessageText", "sendLocation", "sendInvoice", "editMessageReplyMarkup"}
+
+
+class StubTelegramAPI:
+
+    def __init__(self, latency: float = 0.03, jitter: float = 0.01, rate_429: float = 0.0, retry_after: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.calls: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self.sent: Dict[int, List[float]] = defaultdict(list)
+        self.listeners: List[Callable[[str, dict, float], None]] = []
+        self._message_ids = itertools.count(1000)
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+    @property
+    def api_url(self) -> str:
+        """Value for ``telebot.asyncio_helper.API_URL``"""
+        return f"http://127.0.0.1:{self.port}/bot{{0}}/{{1}}"
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self._handle)
+        return app
+
+    async def start(self, port: int = 0) -> None:
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _params(self, request: web.Request) -> dict:
+        params = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                params.update(await request.json())
+            else:
+                params.update(await request.post())
+        return params
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._params(request)
+
+        if self.latency:
+            await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+
+        if self.rate_429 and random.random() < self.rate_429:
+            self.throttled[method] += 1
+            return web.json_response({
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }, status=429)
+
+        now = time.perf_counter()
+        self.calls[method] += 1
+        if method in MESSAGE_METHODS and "chat_id" in params:
+            self.sent[int(params["chat_id"])].append(now)
+        for listener in self.listeners:
+            listener(method, params, now)
+
+        return web.json_response({"ok": True, "result": self._result(method, params)})
+
+    def _result(self, method: str, params: dict):
+        if method in MESSAGE_METHODS:
+            chat_id = int(params.get("chat_id", 0))
+            message_id = int(params.get("message_id") or next(self._message_ids))
+            result = {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": 1, "is_bot": True, "first_name": "stub"},
+            }
+            if "text" in params:
+                result["text"] = params["text"]
+            if "reply_markup" in params:
+                markup = params["reply_markup"]
+                result["reply_markup"] = json.loads(markup) if isinstance(markup, str) else markup
+            return result
+        if method == "getWebhookInfo":
+            return {"url": "", "has_custom_certificate": False, "pending_update_count": 0}
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "stub", "username": "stub_bot"}
+        return True
+
+    def summary(self) -> dict:
+        return {
+            "calls": dict(self.calls),
+            "throttled_429": dict(self.throttled),
+        }
@@ -0,0 +1,75 @@
+"""
+Synthetic Telegram updates for the webhook.
+"""
+
+import itertools
+import random
+import time
+from typing import Any, Dict
+
+_update_ids = itertools.count(1)
+_message_ids = itertools.count(1)
+_callback_ids = itertools.count(1)
+
+# Callback data a driver taps from the main menu
+MENU_CALLBACKS = ("balance", "settings", "back", "help", "online", "offline", "top_up_balance", "direction")
+
+
+def _user(telegram_id: int) -> Dict[str, Any]:
+    return {"id": telegram_id, "is_bot": False, "first_name": f"User{telegram_id}", "username": f"u{telegram_id}"}
+
+
+def _chat(telegram_id: int) -> Dict[str, Any]:
+    return {"id": telegram_id, "type": "private", "first_name": f"User{telegram_id}"}
+
+
+def _message(telegram_id: int, **fields) -> Dict[str, Any]:
+    return {
+        "message_id": next(_message_ids),
+        "from": _user(telegram_id),
+        "chat": _chat(telegram_id),
+        "date": int(time.time()),
+        **fields,
+    }
+
+
+def start(telegram_id: int) -> Dict[str, Any]:
+    message = _message(telegram_id, text="/start", entities=[{"type": "bot_command", "offset": 0, "length": 6}])
+    return {"update_id": next(_update_ids), "message": message}
+
+
+def callback(telegram_id: int, data: str = None) -> Dict[str, Any]:
+    bot_message = {
+        "message_id": next(_message_ids),
+        "from": {"id": 1, "is_bot": True, "first_name": "stub"},
+        "chat": _chat(telegram_id),
+        "date": int(time.time()),
+        "text": "menu",
+    }
+    return {
+        "update_id": next(_update_ids),
+        "callback_query": {
+            "id": str(next(_callback_ids)),
+            "from": _user(telegram_id),
+            "message": bot_message,
+            "chat_instance": str(telegram_id),
+            "data": data or random.choice(MENU_CALLBACKS),
+        },
+    }
+
+
+def location(telegram_id: int) -> Dict[str, Any]:
+    coords = {"latitude": 41.31 + random.random() / 10, "longitude": 69.24 + random.random() / 10}
+    return {"update_id": next(_update_ids), "message": _message(telegram_id, location=coords)}
+
+
+def payment(telegram_id: int, amount: int = 70_000) -> Dict[str, Any]:
+    charge_id = f"stub-{next(_update_ids)}-{random.getrandbits(32):x}"
+    successful_payment = {
+        "currency": "UZS",
+        "total_amount": amount * 100,
+        "invoice_payload": f"driver:{telegram_id}:amount:{amount}",
+        "telegram_payment_charge_id": charge_id,
+        "provider_payment_charge_id": charge_id,
+    }
+    return {"update_id": next(_update_ids), "message": _message(telegram_id, successful_payment=successful_payment)}
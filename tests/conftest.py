@@ -0,0 +1,42 @@
+# tests/conftest.py
+
+import asyncio
+import os
+
+import pytest
+
+# Settings are read at import time; the app needs these even when nothing is sent
+for _name, _value in {
+    "DEBUG": "true",
+    "BOT_TOKEN_DEMO": "123456:test",
+    "BOT_TOKEN_PROD": "123456:test",
+    "BOT_PAYMENT_TOKEN_DEMO": "test",
+    "BOT_PAYMENT_TOKEN_PROD": "test",
+    "FRONTEND_URL": "http://127.0.0.1",
+    "AUTH_TOKEN": "test",
+    "API_HOST": "127.0.0.1",
+    "API_PORT": "1",
+    "API_HOST_PROD": "127.0.0.1:1",
+    "LOOP_MONITOR_ENABLED": "false",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine function against a fresh in-memory Redis (fakeredis, with Lua)"""
+    import fakeredis
+    from application.database.cache import cache
+
+    def _run(test):
+        async def main():
+            cache._client = fakeredis.FakeAsyncRedis(decode_responses=True)
+            try:
+                return await test()
+            finally:
+                await cache._client.aclose()
+                cache._client = None
+
+        return asyncio.run(main())
+
+    return _run
@@ -0,0 +1,22 @@
+# tests/test_api_types.py
+
+from datetime import datetime, timezone
+
+from application.api.api_types import ContentObjectTypes, _parse_datetime
+
+
+def test_parse_datetime_accepts_iso_and_z_suffix():
+    assert _parse_datetime("2026-01-02T03:04:05Z") == datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert _parse_datetime("2026-01-02T03:04:05") == datetime(2026, 1, 2, 3, 4, 5)
+
+
+def test_parse_datetime_rejects_garbage_instead_of_now():
+    assert _parse_datetime("tomorrow") is None
+    assert _parse_datetime(12345) is None
+    assert _parse_datetime(None) is None
+
+
+def test_unknown_start_time_renders_empty():
+    content = ContentObjectTypes.from_dict({"price": 1, "start_time": "soon"})
+    assert content.start_time_local == ""
+    assert ContentObjectTypes.from_dict({"price": 1}).start_time_local == ""
@@ -0,0 +1,77 @@
+# tests/test_driver_session.py
+
+import pytest
+
+from application.database.cache import cache
+from application.services.driver_session import ORDER_KEY, DriverSessions, SessionOrder
+from application.services.order_service import OrderServiceAPI
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """GET /orders/{id}/driver answers from ``backend.orders`` (order_id -> response)"""
+    async def get_order(self, order_id):
+        return backend.orders.get(order_id, {"detail": "Not found"})
+
+    backend = type("Backend", (), {"orders": {}})
+    monkeypatch.setattr(OrderServiceAPI, "get_order", get_order)
+    return backend
+
+
+def _assigned(telegram_id, status="assigned"):
+    return {"status": status, "driver_details": {"telegram_id": telegram_id}}
+
+
+def test_release_without_driver_details_uses_index(run):
+    async def test():
+        sessions = DriverSessions(max_orders=2)
+        assert await sessions.add(42, SessionOrder(order_id=1))
+        assert await cache.client.get(ORDER_KEY.format(1)) == "42"
+
+        await sessions.release(1)
+        assert await sessions.orders(42) == []
+        assert await cache.client.get(ORDER_KEY.format(1)) is None
+
+    run(test)
+
+
+def test_limit_reconciles_stale_orders_with_backend(run, backend):
+    async def test():
+        sessions = DriverSessions(max_orders=2)
+        assert await sessions.add(42, SessionOrder(order_id=1))
+        assert await sessions.add(42, SessionOrder(order_id=2))
+
+        # Both still held on the backend: the limit stands
+        backend.orders = {1: _assigned(42), 2: _assigned(42, "started")}
+        assert not await sessions.add(42, SessionOrder(order_id=3))
+
+        # Order 1 ended while its webhook was lost
+        backend.orders[1] = _assigned(42, "ended")
+        assert await sessions.add(42, SessionOrder(order_id=3))
+        assert [o.order_id for o in await sessions.orders(42)] == [2, 3]
+
+    run(test)
+
+
+def test_reconcile_keeps_orders_being_accepted(run, backend):
+    async def test():
+        sessions = DriverSessions(max_orders=1)
+        assert await sessions.add(42, SessionOrder(order_id=1))
+        backend.orders = {1: {"status": "created", "driver_details": None}}
+
+        assert await sessions.reconcile(42) == 0
+        assert not await sessions.add(42, SessionOrder(order_id=2))
+
+    run(test)
+
+
+def test_index_is_kept_when_another_driver_holds_the_order(run):
+    async def test():
+        sessions = DriverSessions()
+        await sessions.add(42, SessionOrder(order_id=1))
+        await sessions.add(43, SessionOrder(order_id=1))  # reassigned
+
+        await sessions.remove(42, 1)
+        assert await cache.client.get(ORDER_KEY.format(1)) == "43"
+
+    run(test)
@@ -0,0 +1,127 @@
+# tests/test_driver_status.py
+
+import asyncio
+
+import pytest
+
+from application.services import driver_status
+from application.services.driver_service import DriverServiceAPI
+from application.services.driver_status import PENDING_KEY, DriverStatusWriter
+from application.services.types import DriverService
+from application.database.cache import cache
+
+
+class RunningScheduler:
+    """Scheduler that is "running" elsewhere: jobs are recorded, never run here"""
+
+    running = True
+
+    def __init__(self):
+        self.scheduled, self.cancelled = [], []
+
+    async def schedule(self, name, payload, delay=0.0, key=None, replace=False, done_ttl=0):
+        self.scheduled.append(key)
+        return True
+
+    async def cancel(self, key):
+        self.cancelled.append(key)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Records PATCH /drivers/{id}/ calls; ``backend.during`` runs inside the request"""
+    calls = []
+
+    async def update_driver(self, driver_id, data):
+        calls.append((driver_id, data["status"]))
+        if backend.during:
+            await backend.during()
+        return None if backend.fail else DriverService(id=driver_id, status=data["status"])
+
+    backend = type("Backend", (), {"calls": calls, "during": None, "fail": False})
+    monkeypatch.setattr(DriverServiceAPI, "update_driver", update_driver)
+    return backend
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = RunningScheduler()
+    monkeypatch.setattr(driver_status, "scheduler", scheduler)
+    return scheduler
+
+
+def test_flush_on_another_worker_leaves_no_stale_overlay(run, backend, scheduler):
+    async def test():
+        worker_a, worker_b = DriverStatusWriter(), DriverStatusWriter()
+        await worker_a.set_status(1, "online", current="offline")
+        assert scheduler.scheduled == ["driver-status:1"]
+
+        # Worker B's scheduler claims the job
+        assert await worker_b._flush_one(1) is None
+        assert backend.calls == [(1, "online")]
+
+        # Backend moved on since (e.g. went offline through worker B again and flushed)
+        driver = await worker_a.overlay(DriverService(id=1, status="offline"))
+        assert driver.status == "offline"
+        await worker_a.stop()
+        assert backend.calls == [(1, "online")]
+
+    run(test)
+
+
+def test_stop_flushes_only_matching_overlay(run, backend, scheduler):
+    async def test():
+        worker_a, worker_b = DriverStatusWriter(), DriverStatusWriter()
+        await worker_a.set_status(1, "online", current="offline")
+        await worker_a.set_status(2, "online", current="offline")
+        await worker_b.set_status(2, "offline")  # newer change through another worker
+
+        await worker_a.stop()
+        # Driver 2 belongs to worker B's value now: not reverted to "online"
+        assert backend.calls == [(1, "online")]
+        assert scheduler.cancelled == ["driver-status:1"]
+        assert await cache.client.hget(PENDING_KEY.format(2), "status") == "offline"
+
+    run(test)
+
+
+def test_coalesced_back_to_base_is_skipped(run, backend, scheduler):
+    async def test():
+        writer = DriverStatusWriter()
+        await writer.set_status(1, "online", current="offline")
+        await writer.set_status(1, "offline", current="online")  # base stays the first known status
+
+        assert await writer._flush_one(1) is None
+        assert backend.calls == []
+        assert not await cache.client.exists(PENDING_KEY.format(1))
+
+    run(test)
+
+
+def test_change_during_patch_is_flushed_next(run, backend, scheduler):
+    async def test():
+        writer = DriverStatusWriter(delay=0.5)
+        await writer.set_status(1, "online", current="offline")
+        backend.during = lambda: writer.set_status(1, "offline")
+
+        assert await writer._flush_one(1) == 0.5
+        backend.during = None
+        # "online" is now the backend status, so "offline" is sent
+        assert await writer._flush_one(1) is None
+        assert backend.calls == [(1, "online"), (1, "offline")]
+
+    run(test)
+
+
+def test_failed_flush_retries_then_drops(run, backend, scheduler):
+    async def test():
+        writer = DriverStatusWriter(delay=0.5, max_retries=2)
+        await writer.set_status(1, "online", current="offline")
+        backend.fail = True
+
+        assert await writer._flush_one(1) == 1.0
+        assert await writer._flush_one(1) == 2.0
+        assert await writer._flush_one(1) is None
+        assert not await cache.client.exists(PENDING_KEY.format(1))
+
+    run(test)
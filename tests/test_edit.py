@@ -0,0 +1,40 @@
+# tests/test_edit.py
+
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
+
+from application.bot_app.handler.decorator import _unchanged
+from application.core import codec
+
+
+def _message(text, entities=None, keyboard=None):
+    data = {"message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}, "text": text}
+    if entities:
+        data["entities"] = entities
+    if keyboard:
+        data["reply_markup"] = {"inline_keyboard": keyboard}
+    return Message.de_json(codec.dumps_str(data))
+
+
+def _markup(*buttons):
+    markup = InlineKeyboardMarkup()
+    markup.add(*(InlineKeyboardButton(text, callback_data=data) for text, data in buttons))
+    return markup
+
+
+def test_same_text_and_keyboard_is_unchanged():
+    message = _message("Settings", keyboard=[[{"text": "Back", "callback_data": "back"}]])
+    assert _unchanged(message, "Settings", _markup(("Back", "back")))
+    assert not _unchanged(message, "Settings", _markup(("Back", "home")))
+    assert not _unchanged(message, "Balance", _markup(("Back", "back")))
+    assert not _unchanged(message, "Settings", None)
+
+
+def test_formatted_text_is_compared_as_html():
+    message = _message("Balance: 5", entities=[{"type": "bold", "offset": 0, "length": 8}])
+    assert _unchanged(message, "<b>Balance:</b> 5", None)
+    # Same characters, but the edit would drop the formatting
+    assert not _unchanged(message, "Balance: 5", None)
+
+
+def test_no_message_is_never_unchanged():
+    assert not _unchanged(None, "Settings", None)
@@ -0,0 +1,61 @@
+# tests/test_i18n_bundle.py
+
+import gzip
+
+import pytest
+
+from application.core import codec, i18n_bundle
+from application.core.i18n_bundle import TranslationBundles
+
+TRANSLATIONS = {"en": {"menu.back": "Back", "menu.settings": "Settings", "order.accept": "Accept"}}
+
+
+@pytest.fixture(autouse=True)
+def translations(monkeypatch):
+    monkeypatch.setattr(i18n_bundle, "get_available_languages", lambda: list(TRANSLATIONS))
+    monkeypatch.setattr(i18n_bundle, "get_slugs_by_pattern", lambda pattern, lang: dict(TRANSLATIONS[lang]))
+    monkeypatch.setattr(i18n_bundle, "get_version", lambda: 3)
+
+
+def _bundles(maxsize=256):
+    bundles = TranslationBundles(maxsize=maxsize)
+    bundles.rebuild()
+    return bundles
+
+
+def test_prefix_bundle_holds_only_matching_keys():
+    bundle = _bundles().get("en", "menu.")
+    data = codec.loads(gzip.decompress(bundle.gzipped))
+    assert data == {"lang": "en", "version": 3, "translations": {"menu.back": "Back", "menu.settings": "Settings"}}
+    assert codec.loads(bundle.body) == data
+
+
+def test_unmatched_prefix_and_unknown_language_are_not_cached():
+    bundles = _bundles(maxsize=2)
+    full = bundles.get("en")
+    assert bundles.get("en", "nothing.") is None
+    assert bundles.get("xx") is None
+    assert bundles.get("xx", "menu.") is None
+    assert list(bundles._prefixed) == []
+    assert bundles.get("en") is full
+
+
+def test_prefix_bundles_do_not_evict_full_ones():
+    bundles = _bundles(maxsize=1)
+    full = bundles.get("en")
+    bundles.get("en", "menu.")
+    bundles.get("en", "order.")
+    assert list(bundles._prefixed) == [("en", "order.")]
+    assert bundles.get("en") is full
+
+
+def test_if_none_match_is_parsed_as_a_list():
+    bundle = _bundles().get("en")
+    opaque = bundle.etag.removeprefix("W/")
+    assert bundle.matches(bundle.etag)
+    assert bundle.matches(f'"other", {opaque}')
+    assert bundle.matches("*")
+    assert not bundle.matches(None)
+    assert not bundle.matches('W/"other"')
+    # A substring of the header is not a match
+    assert not bundle.matches(f'W/"x{opaque[1:]}')
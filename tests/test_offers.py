@@ -0,0 +1,69 @@
+# tests/test_offers.py
+
+import pytest
+
+from application.api import offers
+from application.api.offers import CLOSED_KEY, RETRACT_KEY, OfferDispatcher
+from application.database.cache import cache
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    """Open-orders feed holding order 5; records removals"""
+    removed = []
+
+    async def remove(order_id):
+        removed.append(order_id)
+        return ("1", "2") if removed.count(order_id) == 1 else None
+
+    async def cancel(key):
+        return None
+
+    monkeypatch.setattr(offers.open_orders, "remove", remove)
+    monkeypatch.setattr(offers.scheduler, "cancel", cancel)
+    return removed
+
+
+def test_claim_after_expiry_is_broadcast_and_leaves_feed(run, feed):
+    async def test():
+        dispatcher = OfferDispatcher()
+        await dispatcher.close(5, "expired")
+        assert feed == []  # expired orders stay open in the backend
+        assert dispatcher.closed_reason(5) == "expired"
+
+        await dispatcher.close(5, "assigned", keep_chat=42)
+        assert feed == [5]
+        assert dispatcher.closed_reason(5) == "claimed"
+        assert await cache.client.get(CLOSED_KEY.format(5)) == "claimed"
+        assert await cache.client.lrange(RETRACT_KEY, 0, -1) == ["5:expired", "5:claimed"]
+
+    run(test)
+
+
+def test_close_known_from_pubsub_still_removes_feed(run, feed):
+    async def test():
+        dispatcher = OfferDispatcher()
+        dispatcher._closed.set(5, "claimed")  # another worker closed it first
+
+        await dispatcher.close(5, "assigned")
+        assert feed == [5]
+        assert await cache.client.llen(RETRACT_KEY) == 0
+
+    run(test)
+
+
+def test_only_closing_statuses_close_and_final_close_runs_once(run, feed):
+    async def test():
+        dispatcher = OfferDispatcher()
+        await dispatcher.close(5, "searched")
+        assert not dispatcher.is_closed(5) and feed == []
+
+        await dispatcher.close(5, "assigned", keep_chat=42)
+        await dispatcher.close(5, "started")
+        await dispatcher.close(5, "ended")
+        await dispatcher.close(5, "expired")
+        assert feed == [5]
+        assert dispatcher.closed_reason(5) == "claimed"
+        assert await cache.client.lrange(RETRACT_KEY, 0, -1) == ["5:claimed"]
+
+    run(test)
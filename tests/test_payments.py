@@ -0,0 +1,116 @@
+# tests/test_payments.py
+
+import time
+
+import pytest
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockNotOwnedError
+
+from application.core import codec
+from application.core.config import settings
+from application.database.cache import cache
+from application.services.driver_service import PAYMENT_FAILED_KEY, PAYMENT_KEY, DriverServiceAPI
+from application.services.types import DriverService
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Fake backend: records requests; ``backend.fail`` = {method: error} makes that call fail"""
+    calls = []
+
+    async def get_driver_by_telegram_id(self, telegram_id, fresh=False):
+        return DriverService(id=7, telegram_id=telegram_id, amount=1000)
+
+    async def _request(self, method, path, **kwargs):
+        calls.append(method)
+        backend.timeouts.append(self.timeout.total if self.timeout else None)
+        if method in backend.fail:
+            return {"error": backend.fail[method]}
+        if method == "PATCH":
+            return {"id": 7, "amount": kwargs["json"]["amount"]}
+        return {"id": 1}
+
+    backend = type("Backend", (), {"calls": calls, "fail": {}, "timeouts": []})
+    monkeypatch.setattr(DriverServiceAPI, "get_driver_by_telegram_id", get_driver_by_telegram_id)
+    monkeypatch.setattr(DriverServiceAPI, "_request", _request)
+    return backend
+
+
+def test_payment_is_credited_once(run, backend):
+    async def test():
+        service = DriverServiceAPI()
+        result = await service.add_balance_by_telegram_id(42, 500, idempotency_key="charge-1")
+        assert result["driver"]["amount"] == 1500
+
+        again = await service.add_balance_by_telegram_id(42, 500, idempotency_key="charge-1")
+        assert again == {"driver": {"amount": 1500}, "amount_added": 500, "duplicate": True}
+        assert backend.calls == ["POST", "PATCH"]
+
+    run(test)
+
+
+def test_failure_after_transaction_is_terminal(run, backend):
+    async def test():
+        service = DriverServiceAPI()
+        backend.fail["PATCH"] = "boom"
+        assert await service.add_balance_by_telegram_id(42, 500, idempotency_key="charge-2") is None
+
+        # The key stays: a redelivered update must not post a second transaction
+        assert await cache.client.get(PAYMENT_KEY.format("charge-2")) == "failed:balance"
+        failed = codec.loads(await cache.client.hget(PAYMENT_FAILED_KEY, "charge-2"))
+        assert failed["telegram_id"] == 42 and failed["stage"] == "balance"
+
+        backend.fail.clear()
+        assert await service.add_balance_by_telegram_id(42, 500, idempotency_key="charge-2") == {"duplicate": True}
+        assert backend.calls == ["POST", "PATCH"]
+
+    run(test)
+
+
+def test_transaction_failure_is_recorded(run, backend):
+    async def test():
+        backend.fail["POST"] = "down"
+        assert await DriverServiceAPI().add_balance_by_telegram_id(42, 500, idempotency_key="charge-3") is None
+        assert await cache.client.get(PAYMENT_KEY.format("charge-3")) == "failed:transaction"
+        assert await cache.client.hexists(PAYMENT_FAILED_KEY, "charge-3")
+        assert backend.calls == ["POST"]
+
+    run(test)
+
+
+def test_lock_release_error_keeps_the_credit(run, backend, monkeypatch):
+    async def release(self):
+        raise LockNotOwnedError("expired")
+
+    monkeypatch.setattr(Lock, "release", release)
+
+    async def test():
+        result = await DriverServiceAPI().add_balance_by_telegram_id(42, 500, idempotency_key="charge-4")
+        assert result["driver"]["amount"] == 1500
+        assert codec.loads(await cache.client.get(PAYMENT_KEY.format("charge-4")))["driver"]["amount"] == 1500
+        assert not await cache.client.hexists(PAYMENT_FAILED_KEY, "charge-4")
+        # Requests inside the lock time out before the lock does
+        assert backend.timeouts == [settings.BALANCE_REQUEST_TIMEOUT] * 2
+        assert settings.BALANCE_REQUEST_TIMEOUT < settings.BALANCE_LOCK_TIMEOUT
+
+    run(test)
+
+
+def test_stale_pending_payment_is_failed_on_redelivery(run, backend):
+    async def test():
+        service = DriverServiceAPI()
+        key = PAYMENT_KEY.format("charge-5")
+        # The process died right after taking the key
+        await cache.client.set(key, f"pending:{int(time.time())}")
+        assert (await service.add_balance_by_telegram_id(42, 500, idempotency_key="charge-5"))["duplicate"]
+
+        await cache.client.set(key, f"pending:{int(time.time()) - settings.PAYMENT_STALE_AFTER - 1}")
+        assert await service.add_balance_by_telegram_id(42, 500, idempotency_key="charge-5") is None
+        assert await cache.client.get(key) == "failed:pending"
+        assert codec.loads(await cache.client.hget(PAYMENT_FAILED_KEY, "charge-5"))["stage"] == "pending"
+
+        # Recorded once; later redeliveries are plain duplicates
+        assert await service.add_balance_by_telegram_id(42, 500, idempotency_key="charge-5") == {"duplicate": True}
+        assert backend.calls == []
+
+    run(test)
@@ -0,0 +1,38 @@
+# tests/test_push_auth.py
+
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+from application.api import push
+from application.api.push import InitDataAuth
+from application.core.config import settings
+
+
+def _init_data(auth_date: int, user_id: int = 42) -> str:
+    fields = {"auth_date": str(auth_date), "user": json.dumps({"id": user_id})}
+    check_string = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
+    secret = hmac.new(b"WebAppData", settings.BOT_TOKEN.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+def test_valid_init_data_is_cached():
+    auth = InitDataAuth(ttl=3600, max_age=600)
+    init_data = _init_data(int(time.time()))
+    assert auth.user(init_data) == {"id": 42}
+    assert auth.user(init_data) == {"id": 42}
+    assert auth.user(init_data + "x") is None
+
+
+def test_cached_session_expires_with_auth_date(monkeypatch):
+    auth = InitDataAuth(ttl=3600, max_age=600)
+    now = time.time()
+    init_data = _init_data(int(now) - 590)
+    assert auth.user(init_data) == {"id": 42}
+
+    # Still inside the cache TTL, but past auth_date + max_age
+    monkeypatch.setattr(push.time, "time", lambda: now + 20)
+    assert auth.user(init_data) is None
@@ -0,0 +1,126 @@
+# tests/test_router.py
+
+import re
+
+from application.bot_app.handler.router import CallbackRouter, RegexRouter
+
+
+def _state(value):
+    """State getter that counts its calls"""
+    async def get_state():
+        get_state.calls += 1
+        return value
+
+    get_state.calls = 0
+    return get_state
+
+
+def test_first_registered_match_wins(run):
+    async def test():
+        router = CallbackRouter()
+        router.add("order_", "order")
+        router.add("order_accept_", "accept")
+        router.add("", "any")
+
+        assert await router.resolve("order_accept_5", _state(None)) == "order"
+        assert await router.resolve("balance", _state(None)) == "any"
+
+        router = CallbackRouter()
+        router.add("order_accept_", "accept")
+        router.add("order_", "order")
+        assert await router.resolve("order_accept_5", _state(None)) == "accept"
+        assert await router.resolve("order_5", _state(None)) == "order"
+        assert await router.resolve("ord", _state(None)) is None
+
+    run(test)
+
+
+def test_state_routes_are_skipped_when_state_differs(run):
+    async def test():
+        router = CallbackRouter()
+        router.add("back", "back_upload", state="BalanceState:upload")
+        router.add("back", "back_menu")
+
+        assert await router.resolve("back", _state("BalanceState:upload")) == "back_upload"
+        assert await router.resolve("back", _state("BotStates:details")) == "back_menu"
+        assert await router.resolve("back", _state(None)) == "back_menu"
+
+    run(test)
+
+
+def test_state_handler_is_the_fallback(run):
+    async def test():
+        router = CallbackRouter()
+        router.add("city_", "city", state="BotStates:from_location")
+        router.add_state("BotStates:from_location", "from_location")
+
+        assert await router.resolve("city_1", _state("BotStates:from_location")) == "city"
+        assert await router.resolve("page_2", _state("BotStates:from_location")) == "from_location"
+        assert await router.resolve("page_2", _state("BotStates:details")) is None
+        # Empty callback data never reaches a state handler
+        assert await router.resolve(None, _state("BotStates:from_location")) is None
+
+    run(test)
+
+
+def test_state_is_read_at_most_once(run):
+    async def test():
+        router = CallbackRouter()
+        router.add("pay_", "pay_upload", state="BalanceState:upload")
+        router.add("pay_", "pay_details", state="BotStates:details")
+        router.add_state("BotStates:to_location", "to_location")
+
+        # Two state routes and the fallback share one read
+        get_state = _state("BotStates:to_location")
+        assert await router.resolve("pay_1", get_state) == "to_location"
+        assert get_state.calls == 1
+
+        # Stateless match: the state is not read at all
+        router.add("menu", "menu")
+        get_state = _state("BotStates:to_location")
+        assert await router.resolve("menu", get_state) == "menu"
+        assert get_state.calls == 0
+
+    run(test)
+
+
+def _sequential(patterns, text):
+    """Reference: the first registered pattern that ``re.match``es"""
+    for pattern in patterns:
+        if re.match(pattern, text):
+            return pattern
+    return None
+
+
+def _check(patterns, texts):
+    router = RegexRouter()
+    for pattern in patterns:
+        router.add(pattern, pattern)
+    for text in texts:
+        assert router.match(text) == _sequential(patterns, text), text
+
+
+def test_regex_router_matches_like_sequential_re_match():
+    _check(
+        [r"^/start", r"(?P<amount>\d+) so'm$", r"^(?:uz|ru)$", r"^(?P<city>\w+)-(?P=city)$", r"(?i)^balance",
+         r"^(yes|no)$", r".*@.*"],
+        ["/start", "/start 5", "500 so'm", "5000", "uz", "ru", "en", "tosh-tosh", "tosh-samq", "BALANCE",
+         "Balance 5", "yes", "no", "maybe", "a@b", "", "\n"],
+    )
+
+
+def test_literal_fast_path():
+    _check([r"^/help$", r"^Orders$", r"^\+998$", r"^/help now$"],
+           ["/help", "/help now", "Orders", "orders", "+998", "/helpx", "Orders\n"])
+
+
+def test_literals_after_a_regex_keep_registration_order():
+    patterns = [r"^/help$", r"^/\w+$", r"^/start$", r"^Orders$"]
+    _check(patterns, ["/help", "/start", "Orders", "/orders"])
+
+    router = RegexRouter()
+    for pattern in patterns:
+        router.add(pattern, pattern)
+    # "/start" is registered after a regex that already matches it
+    assert router.match("/start") == r"^/\w+$"
+    assert router.match("/help") == r"^/help$"
@@ -0,0 +1,170 @@
+# tests/test_scheduler.py
+
+import asyncio
+import time
+
+import pytest
+
+from application.core import codec, scheduler as scheduler_module
+from application.core.scheduler import _CLAIM, _COMPLETE, DUE_KEY, JOBS_KEY, Scheduler, TimingWheel
+from application.database.cache import cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler_module.time, "monotonic", clock)
+    return clock
+
+
+async def _claim(now: float, lease: float, limit: int = 10):
+    claimed = await cache.client.eval(_CLAIM, 2, DUE_KEY, JOBS_KEY, now, limit, now + lease)
+    return list(zip(claimed[::2], claimed[1::2]))
+
+
+# ==================== TIMING WHEEL ====================
+
+def test_wheel_fires_on_its_tick(clock):
+    wheel = TimingWheel(tick=0.1, slots=8)
+    wheel.add(0.25, "a")
+
+    clock.now += 0.2
+    assert wheel.advance() == []
+    clock.now += 0.1
+    assert wheel.advance() == ["a"]
+    assert len(wheel) == 0
+
+
+def test_wheel_counts_rounds_past_one_revolution(clock):
+    wheel = TimingWheel(tick=0.1, slots=8)  # one revolution = 0.8s
+    wheel.add(2.0, "far")
+    wheel.add(0.3, "near")
+
+    clock.now += 0.3
+    assert wheel.advance() == ["near"]
+    clock.now += 1.6  # passes the far item's slot twice
+    assert wheel.advance() == []
+    clock.now += 0.1
+    assert wheel.advance() == ["far"]
+
+
+def test_wheel_idle_time_does_not_fire_early(clock):
+    wheel = TimingWheel(tick=0.1, slots=8)
+    clock.now += 5.0  # sat idle: wheel clock lags behind
+    wheel.add(0.5, "a")
+
+    clock.now += 0.4
+    assert wheel.advance() == []
+    clock.now += 0.1
+    assert wheel.advance() == ["a"]
+
+
+def test_wheel_discard_and_next_delay(clock):
+    wheel = TimingWheel(tick=0.1, slots=8)
+    assert wheel.next_delay() is None
+    wheel.add(0.3, "a")
+    wheel.add(2.0, "far")
+    assert wheel.next_delay() == pytest.approx(0.3)
+
+    wheel.discard("a")
+    assert len(wheel) == 1
+    clock.now += 0.3
+    assert wheel.advance() == []
+    # Only a later-round item left: wait at most one revolution
+    assert wheel.next_delay() == pytest.approx(0.8)
+
+
+# ==================== REDIS SCRIPTS ====================
+
+def test_claim_leases_and_reclaims_after_lease(run):
+    async def test():
+        scheduler = Scheduler(lease=30)
+        await scheduler.schedule("job", {"n": 1}, key="k")
+        now = time.time() + 0.01
+
+        [(job_id, raw)] = await _claim(now, lease=30)
+        assert job_id == "k" and codec.loads(raw)["payload"] == {"n": 1}
+        # Leased: not claimable again until the lease runs out
+        assert await _claim(now + 1, lease=30) == []
+        # The worker died: after the lease another one gets it
+        assert await _claim(now + 31, lease=30) == [("k", raw)]
+
+        assert await cache.client.eval(_COMPLETE, 3, DUE_KEY, JOBS_KEY, "scheduler:done:k", "k", raw, 0) == 1
+        assert await _claim(now + 100, lease=30) == []
+        assert await cache.client.hlen(JOBS_KEY) == 0
+
+    run(test)
+
+
+def test_replace_while_running_is_not_completed_away(run):
+    async def test():
+        scheduler = Scheduler(lease=30)
+        await scheduler.schedule("job", {"v": 1}, key="k")
+        [(_, raw)] = await _claim(time.time() + 0.01, lease=30)
+
+        # A newer value arrives while the first run is in progress
+        assert await scheduler.schedule("job", {"v": 2}, delay=5, key="k", replace=True)
+        assert await cache.client.eval(_COMPLETE, 3, DUE_KEY, JOBS_KEY, "scheduler:done:k", "k", raw, 0) == 0
+
+        [(_, newer)] = await _claim(time.time() + 6, lease=30)
+        assert codec.loads(newer)["payload"] == {"v": 2}
+
+    run(test)
+
+
+def test_pending_and_done_keys_are_idempotent(run):
+    async def test():
+        scheduler = Scheduler()
+        assert await scheduler.schedule("job", {}, key="k", done_ttl=60)
+        assert not await scheduler.schedule("job", {}, key="k", done_ttl=60)
+
+        [(_, raw)] = await _claim(time.time() + 0.01, lease=30)
+        await cache.client.eval(_COMPLETE, 3, DUE_KEY, JOBS_KEY, "scheduler:done:k", "k", raw, 60)
+        assert not await scheduler.schedule("job", {}, key="k", done_ttl=60)
+
+    run(test)
+
+
+# ==================== RUN LOOP ====================
+
+def test_handler_delay_and_failure_are_rescheduled(run):
+    async def test():
+        scheduler = Scheduler(poll_interval=0.05, tick=0.01, slots=64, drain_timeout=1)
+        calls = []
+
+        @scheduler.job("again")
+        async def again(payload):
+            calls.append("again")
+            return 0.05 if calls.count("again") == 1 else None
+
+        @scheduler.job("flaky")
+        async def flaky(payload):
+            calls.append("flaky")
+            if calls.count("flaky") == 1:
+                raise RuntimeError("boom")
+
+        scheduler.max_attempts = 3
+        await scheduler.start()
+        try:
+            await scheduler.schedule("again", {}, key="a")
+            await scheduler.schedule("flaky", {}, key="f")
+            for _ in range(200):
+                if calls.count("again") == 2 and calls.count("flaky") == 2:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await scheduler.stop()
+
+        assert calls.count("again") == 2
+        assert calls.count("flaky") == 2  # retried after 2s backoff
+        assert await cache.client.hlen(JOBS_KEY) == 0
+
+    run(test)
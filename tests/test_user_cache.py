@@ -0,0 +1,37 @@
+# tests/test_user_cache.py
+
+import pytest
+
+from application.services.user_service import TelegramUserServiceAPI
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """GET /clients/by-telegram-id/ answers with ``backend.user``; counts requests"""
+    async def _request(self, method, path, **kwargs):
+        backend.requests += 1
+        return dict(backend.user)
+
+    backend = type("Backend", (), {"requests": 0, "user": {
+        "user_id": 1, "telegram_id": 42, "full_name": "Ali", "language": "uz", "is_banned": False,
+    }})
+    monkeypatch.setattr(TelegramUserServiceAPI, "_request", _request)
+    TelegramUserServiceAPI._cached_user.cache_clear()
+    yield backend
+    TelegramUserServiceAPI._cached_user.cache_clear()
+
+
+def test_ban_check_bypasses_user_cache(run, backend):
+    async def test():
+        service = TelegramUserServiceAPI()
+        assert not (await service.get_user(42)).is_banned
+
+        # Banned in the admin panel while the user is cached
+        backend.user["is_banned"] = True
+        assert not (await service.get_user(42)).is_banned
+        assert await service.is_ban_user(42)
+        # The fresh read also refreshes the cache
+        assert (await service.get_user(42)).is_banned
+        assert backend.requests == 2
+
+    run(test)